@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adapticus.settings')
+# serve the public read endpoints from core.async_views / content.async_views
+os.environ.setdefault('API_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+if settings.DEBUG:
+    # WhiteNoise is left out of MIDDLEWARE under ASGI (settings.py)
+    application = ASGIStaticFilesHandler(application)
@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
 
+from core.db import databases_from_env
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # --- Security / Debug
@@ -24,14 +26,30 @@ INSTALLED_APPS = [
     "core","taxonomy","content","portfolio","salon",
 ]
 
+# Hosts that belong to a site; core.middleware.RedirectMiddleware applies that
+# site's core.Redirect rules to requests on these hosts
+SITE_HOSTS = {
+    "amareteklay.com": "amare",
+    "www.amareteklay.com": "amare",
+    "homoadapticus.com": "adapticus",
+    "www.homoadapticus.com": "adapticus",
+}
+
 # --- Middleware (CORS first)
 MIDDLEWARE = [
+    # opt-in timing/query instrumentation; removes itself unless METRICS_ENABLED
+    "core.metrics.MetricsMiddleware",
+    # gzip/brotli for /api/ responses; above everything that touches the body
+    "core.compression.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware", 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "core.middleware.RedirectMiddleware",
+    # read-your-writes with a replica (core.db); removes itself without one
+    "core.db.PrimaryPinMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -42,7 +60,14 @@ if not DEBUG:
     STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 
-ROOT_URLCONF = "adapticus.urls"
+# async read path for the public API (core.async_views); asgi.py turns it on
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "0") == "1"
+ROOT_URLCONF = "adapticus.urls_async" if API_ASYNC_VIEWS else "adapticus.urls"
+if API_ASYNC_VIEWS:
+    # WhiteNoise's middleware is the only sync-only one above: left in, it would
+    # send every ASGI request through a thread and back. Under ASGI, STATIC_ROOT
+    # is served by the front proxy (asgi.py serves it itself under DEBUG)
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
 
 TEMPLATES = [{
     "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -58,13 +83,46 @@ TEMPLATES = [{
 
 WSGI_APPLICATION = "adapticus.wsgi.application"
 
-# --- DB
-DATABASES = {
+# --- DB (core.db): SQLite by default (run `manage.py sqlite_wal` once on deploy
+# to switch the file to the WAL journal); DB_ENGINE=postgres reads
+# DB_NAME/USER/PASSWORD/HOST/PORT, DB_CONN_MAX_AGE and DB_POOL (psycopg or
+# pgbouncer). DB_REPLICA_HOST (postgres) or DB_REPLICA_NAME (sqlite) adds a
+# read replica for the public read-only endpoints.
+DATABASES = databases_from_env(BASE_DIR)
+DATABASE_ROUTERS = ["core.db.PrimaryReplicaRouter"]
+# after a client writes one of these apps' models, its public reads stay on
+# the primary this long (replica lag; core.db.PrimaryPinMiddleware)
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", "10"))
+DATABASE_REPLICA_PIN_APPS = ("content", "taxonomy", "core")
+
+# --- Cache (local memory by default; point at a shared backend when running
+# several worker processes so signal invalidation reaches all of them)
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": os.environ.get(
+            "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "adapticus"),
     }
 }
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", "3600"))
+# the posts archive is also invalidated by manage.py publish_scheduled from its
+# own process, which only reaches the web workers through a shared cache
+# (DJANGO_CACHE_BACKEND=...RedisCache / PyMemcacheCache); with the per-process
+# LocMem default, scheduled posts show up in the archive after this many seconds
+API_ARCHIVE_CACHE_TIMEOUT = int(os.environ.get("API_ARCHIVE_CACHE_TIMEOUT", "300"))
+
+# core.redirects: how often a process checks the redirect version in the cache,
+# and the age after which it rebuilds its table anyway (the only way a change
+# reaches other processes when the cache is per-process, like LocMem)
+REDIRECTS_RECHECK_SECONDS = float(os.environ.get("REDIRECTS_RECHECK_SECONDS", "5"))
+REDIRECTS_MAX_AGE = float(os.environ.get("REDIRECTS_MAX_AGE", "300"))
+
+# API response compression (core.compression); brotli needs `pip install brotli`
+API_COMPRESSION_PATHS = ("/api/",)
+API_COMPRESSION_MIN_SIZE = int(os.environ.get("API_COMPRESSION_MIN_SIZE", "1024"))
+API_COMPRESSION_STREAM_SIZE = int(os.environ.get("API_COMPRESSION_STREAM_SIZE", str(512 * 1024)))
 
 # --- Auth
 AUTH_PASSWORD_VALIDATORS = [
@@ -104,18 +162,40 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"       
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# responsive image variants (core.images); workers = 0 renders inline
+IMAGE_DERIVATIVES = {
+    "widths": (320, 640, 960, 1280, 1920),
+    "formats": ("avif", "webp", "jpeg"),
+    "workers": int(os.environ.get("IMAGE_DERIVATIVE_WORKERS", "2")),
+}
+# static JSON export of the public API (manage.py build_snapshot)
+SNAPSHOT_ROOT = Path(os.environ.get("SNAPSHOT_ROOT", BASE_DIR / "snapshot"))
+# full-text search (content.search): "auto" uses SQLite FTS5 when available,
+# otherwise the on-disk Python index at SEARCH_INDEX_PATH
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "auto")
+SEARCH_INDEX_PATH = Path(os.environ.get("SEARCH_INDEX_PATH", BASE_DIR / "search_index.pickle"))
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # --- DRF
+# --- Metrics (core.metrics): Server-Timing, JSON log lines, /api/v1/_metrics
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "0") == "1"
+METRICS_WINDOW = int(os.environ.get("METRICS_WINDOW", "1024"))
+
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 12,
 }
+# public post/page list & detail through content.fast (False: DRF serializers)
+API_FAST_SERIALIZERS = os.environ.get("API_FAST_SERIALIZERS", "1") == "1"
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Adapticus API",
@@ -7,19 +7,27 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
-from content.views import PublicPostViewSet, PublicPageViewSet
-from core.views import NavigationViewSet, SettingsViewSet
+from content.views import PublicPostViewSet, PublicPageViewSet, SearchViewSet
+from core.async_views import SiteView
+from core.views import NavigationViewSet, SettingsViewSet, RedirectViewSet, MetricsView
+from taxonomy.views import TagViewSet, CategoryViewSet
 
 router = DefaultRouter()
 router.register(r"content/posts", PublicPostViewSet, basename="posts")
 router.register(r"content/pages", PublicPageViewSet, basename="pages")
+router.register(r"content/search", SearchViewSet, basename="search")
+router.register(r"taxonomy/tags", TagViewSet, basename="tags")
+router.register(r"taxonomy/categories", CategoryViewSet, basename="categories")
 router.register(r"navigation", NavigationViewSet, basename="navigation")
 router.register(r"settings", SettingsViewSet, basename="settings")
+router.register(r"redirects", RedirectViewSet, basename="redirects")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
+    path("api/v1/_metrics", MetricsView.as_view(), name="metrics"),
+    path("api/v1/site/", SiteView.as_view(), name="site"),
     path("api/v1/", include(router.urls)),
 ]
 
@@ -0,0 +1,26 @@
+# adapticus/urls_async.py
+"""
+ROOT_URLCONF when API_ASYNC_VIEWS is on (asgi.py): the async read path of
+core.async_views / content.async_views in front of adapticus.urls. Anything
+not listed here, including the posts/archive/ action, falls through to the
+DRF routes.
+"""
+from django.urls import include, re_path
+
+from content.async_views import AsyncPageView, AsyncPostView
+from core.async_views import AsyncNavigationView, AsyncSettingsView
+from .urls import urlpatterns as sync_urlpatterns
+
+async_api = [
+    re_path(r"^content/posts/$", AsyncPostView.as_view(action="list")),
+    re_path(r"^content/posts/(?!archive/$)(?P<slug>[^/.]+)/$", AsyncPostView.as_view(action="retrieve")),
+    re_path(r"^content/pages/$", AsyncPageView.as_view(action="list")),
+    re_path(r"^content/pages/(?P<slug>[^/.]+)/$", AsyncPageView.as_view(action="retrieve")),
+    re_path(r"^navigation/$", AsyncNavigationView.as_view()),
+    re_path(r"^settings/$", AsyncSettingsView.as_view()),
+]
+
+urlpatterns = [
+    re_path(r"^api/v1/", include(async_api)),
+    *sync_urlpatterns,
+]
@@ -16,7 +16,7 @@ class PostAdmin(TranslatableAdmin):
     date_hierarchy = "published_at"
     ordering = ("-published_at",)
     autocomplete_fields = ("author", "hero_image", "tags", "categories")
-    readonly_fields = ("created_at", "updated_at", "word_count")
+    readonly_fields = ("created_at", "updated_at", "reading_time_min", "word_count")
     fieldsets = (
         ("Publishing", {
             "fields": ("site", "slug", "status", "published_at", "unlisted")
@@ -0,0 +1,92 @@
+# content/async_views.py
+"""
+Async (ASGI) list/detail for public posts and pages; see core.async_views.
+
+The querysets, filters and serializer come from the DRF viewset itself
+(AsyncAPIView.shadow), the rows and related data from the async ORM, and the
+payload from content.fast. Keyset cursors, ?category= (which resolves
+category paths while filtering) and ?page=last go to the DRF view, as does
+everything when API_FAST_SERIALIZERS is off.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.async_views import AsyncAPIView
+from .conditional import aqueryset_state, state_validators
+from .fast import alist
+from .utils import request_lang
+from .views import PublicPageViewSet, PublicPostViewSet
+
+
+class AsyncContentView(AsyncAPIView):
+    delegated_params = ("format", "cursor", "category")
+
+    async def read(self, request, **kwargs):
+        view = self.shadow(request, kwargs)
+        fast = view._fast()
+        if fast is None:
+            return None
+        state = await aqueryset_state(view.conditional_queryset(), view.conditional_related)
+        validators = state_validators(request, state, last_modified=self.action in view.last_modified_actions)
+        not_modified = self.not_modified(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        lang = request_lang(request)
+        queryset = fast.values(view.filter_queryset(view.get_queryset()))
+        if self.action == "retrieve":
+            try:
+                row = await queryset.aget(**{view.lookup_field: kwargs[view.lookup_field]})
+            except ObjectDoesNotExist:
+                raise NotFound(f"No {queryset.model._meta.object_name} matches the given query.")
+            data = (await fast.aserialize([row], lang))[0]
+        else:
+            data = await self.paginate(request, view.paginator, queryset, fast, lang)
+            if data is None:
+                return None
+        return self.respond(data, validators=validators)
+
+    async def paginate(self, request, paginator, queryset, fast, lang):
+        """PageNumberPagination's response, with the count and the page queried together."""
+        size = paginator.get_page_size(request)
+        if size is None:
+            return await fast.aserialize(await alist(queryset), lang)
+        raw = request.query_params.get(paginator.page_query_param) or 1
+        if raw in paginator.last_page_strings:
+            return None
+        try:
+            number = int(raw)
+        except ValueError:
+            raise NotFound(paginator.invalid_page_message)
+        start = (number - 1) * size
+        count, rows = await asyncio.gather(queryset.acount(), alist(queryset[max(start, 0):start + size]))
+        if not 1 <= number <= max(1, math.ceil(count / size)):
+            raise NotFound(paginator.invalid_page_message)
+
+        url = request.build_absolute_uri()
+        param = paginator.page_query_param
+        return {
+            "count": count,
+            "next": replace_query_param(url, param, number + 1) if start + size < count else None,
+            "previous": (
+                None if number == 1
+                else remove_query_param(url, param) if number == 2
+                else replace_query_param(url, param, number - 1)
+            ),
+            "results": await fast.aserialize(rows, lang),
+        }
+
+
+class AsyncPostView(AsyncContentView):
+    viewset = PublicPostViewSet
+
+
+class AsyncPageView(AsyncContentView):
+    viewset = PublicPageViewSet
+
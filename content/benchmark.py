@@ -0,0 +1,378 @@
+# content/benchmark.py
+"""
+Benchmark harness for the public API hot paths (manage.py benchmark_api).
+
+seed_corpus() bulk-inserts a deterministic synthetic corpus (posts x every
+language, tags, a category tree, authors, media rows, pages, menus and
+settings); run_benchmarks() drives the endpoints through the Django test
+client and md_to_html() directly, recording latency percentiles, SQL
+queries per request and peak Python memory (tracemalloc, separate pass so
+it does not skew the timings). compare() checks a run against a saved
+JSON baseline. run_throughput() compares requests per second through the
+WSGI handler and the ASGI handler with the async views.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import platform
+import random
+import sqlite3
+import statistics
+import time
+import threading
+import tracemalloc
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from asgiref.sync import ThreadSensitiveContext
+
+import django
+from django.conf import settings
+from django.db import connection, reset_queries
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.cache import archive_cache, navigation_cache, settings_cache
+from core.models import Author, MediaAsset, NavigationItem, NavigationMenu, Setting
+from taxonomy.models import Category, Tag
+from . import fast
+from .markdown import md_hash, md_to_html
+from .models import Page, Post, PublishStatus
+from .reading import count_words, reading_time_min
+from .serializers import PublicPostListSerializer
+from .utils import DEFAULT_LANG, SUPPORTED_LANGS
+
+SITE = "amare"
+_WORDS = (
+    "adapt climate river field season harvest soil water village market school "
+    "health road bridge story people network data model change risk future"
+).split()
+
+
+def _paragraphs(rng: random.Random, n: int) -> str:
+    return "\n\n".join(
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 90))).capitalize() + "."
+        for _ in range(n)
+    )
+
+
+def _markdown(rng: random.Random, title: str) -> str:
+    return (
+        f"# {title}\n\n{_paragraphs(rng, 3)}\n\n## Details\n\n"
+        f"- *{rng.choice(_WORDS)}* item\n- **{rng.choice(_WORDS)}** item\n\n"
+        f"[link](https://example.org/{rng.choice(_WORDS)})\n\n{_paragraphs(rng, 3)}\n"
+    )
+
+
+def _translation_rows(model, master, lang, title, body_md, **extra):
+    html = md_to_html(body_md)
+    return model._parler_meta.root_model(
+        master=master, language_code=lang, title=title, body_md=body_md,
+        body_html=html, body_hash=md_hash(body_md), **extra,
+    )
+
+
+def seed_corpus(posts: int = 1000, tags: int = 40, categories: int = 12, authors: int = 8,
+                pages: int = 20, seed: int = 1) -> dict:
+    """Bulk-insert the corpus (no signals fire); returns slugs worth requesting."""
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    media = MediaAsset.objects.bulk_create([
+        MediaAsset(file=f"media/bench-{i}.jpg", width=1600, height=900, checksum=f"{i:064x}",
+                   alt_text=f"Image {i}")
+        for i in range(max(4, authors))
+    ])
+    author_rows = Author.objects.bulk_create([
+        Author(name=f"Author {i}", slug=f"author-{i}", avatar=media[i % len(media)]) for i in range(authors)
+    ])
+    tag_rows = Tag.objects.bulk_create([
+        Tag(site=SITE, name=f"Tag {i}", slug=f"tag-{i}") for i in range(tags)
+    ])
+    category_rows = []
+    for i in range(categories):
+        # a shallow tree: every third category starts a new root
+        parent = None if i % 3 == 0 else category_rows[i - i % 3]
+        pk = uuid.uuid4()
+        path = f"{parent.path if parent else ''}{pk.hex}/"
+        category_rows.append(Category(id=pk, site=SITE, name=f"Category {i}", slug=f"category-{i}",
+                                      parent=parent, path=path, depth=path.count("/") - 1))
+    Category.objects.bulk_create(category_rows)
+
+    post_rows = [
+        Post(site=SITE, slug=f"post-{i}", status=PublishStatus.PUBL, author=rng.choice(author_rows),
+             hero_image=rng.choice(media), published_at=now - timedelta(hours=i),
+             unlisted=(i % 50 == 49))
+        for i in range(posts)
+    ]
+    translations = []
+    for post in post_rows:
+        for lang in SUPPORTED_LANGS:
+            title = f"{post.slug} {lang} {rng.choice(_WORDS)}"
+            body_md = _markdown(rng, title)
+            row = _translation_rows(Post, post, lang, title, body_md, summary=_paragraphs(rng, 1)[:300])
+            row.body_word_count = words = count_words(row.body_html)
+            row.body_reading_time_min = reading_time_min(words, lang)
+            translations.append(row)
+            if lang == DEFAULT_LANG:
+                post.word_count, post.reading_time_min = words, row.body_reading_time_min
+    Post.objects.bulk_create(post_rows, batch_size=500)
+    Post._parler_meta.root_model.objects.bulk_create(translations, batch_size=500)
+    Post.tags.through.objects.bulk_create([
+        Post.tags.through(post_id=post.pk, tag_id=tag.pk)
+        for post in post_rows for tag in rng.sample(tag_rows, min(3, len(tag_rows)))
+    ], batch_size=1000)
+    Post.categories.through.objects.bulk_create([
+        Post.categories.through(post_id=post.pk, category_id=rng.choice(category_rows).pk)
+        for post in post_rows
+    ], batch_size=1000)
+
+    page_rows = Page.objects.bulk_create([
+        Page(site=SITE, slug=f"page-{i}", is_home=(i == 0), hero_image=rng.choice(media)) for i in range(pages)
+    ])
+    Page._parler_meta.root_model.objects.bulk_create([
+        _translation_rows(Page, page, lang, f"{page.slug} {lang}", _markdown(rng, page.slug))
+        for page in page_rows for lang in SUPPORTED_LANGS
+    ], batch_size=500)
+
+    for slug, size in (("main", 6), ("footer", 12)):
+        menu = NavigationMenu.objects.create(site=SITE, slug=slug)
+        top = NavigationItem.objects.bulk_create([
+            NavigationItem(menu=menu, label=f"{slug} {i}", url=f"/{slug}/{i}", order=i) for i in range(size)
+        ])
+        NavigationItem.objects.bulk_create([
+            NavigationItem(menu=menu, parent=parent, label=f"{parent.label}.{j}", url=f"{parent.url}/{j}", order=j)
+            for parent in top[:3] for j in range(4)
+        ])
+    Setting.objects.bulk_create([
+        Setting(site=SITE, key="site_title", value="Bench"),
+        Setting(site=SITE, key="social", value={"links": [f"https://example.org/{w}" for w in _WORDS[:5]]}),
+    ])
+    return {
+        "post_slug": post_rows[len(post_rows) // 2].slug,
+        "page_slug": page_rows[-1].slug,
+        "tag_slug": tag_rows[0].slug,
+        "category_slug": category_rows[0].slug,
+        "sample_md": [t.body_md for t in translations[:20]],
+    }
+
+
+def endpoints(corpus: dict) -> list[tuple[str, str]]:
+    return [
+        ("posts list", f"/api/v1/content/posts/?site={SITE}&lang=sv"),
+        ("posts list p2", f"/api/v1/content/posts/?site={SITE}&lang=sv&page=2"),
+        ("posts cursor", f"/api/v1/content/posts/?site={SITE}&cursor="),
+        ("posts by tag", f"/api/v1/content/posts/?site={SITE}&tag={corpus['tag_slug']}"),
+        ("posts by category", f"/api/v1/content/posts/?site={SITE}&category={corpus['category_slug']}"),
+        ("post detail", f"/api/v1/content/posts/{corpus['post_slug']}/?site={SITE}&lang=ti-et"),
+        ("pages list", f"/api/v1/content/pages/?site={SITE}"),
+        ("page detail", f"/api/v1/content/pages/{corpus['page_slug']}/?site={SITE}&lang=sv"),
+        ("navigation", f"/api/v1/navigation/?site={SITE}"),
+        ("settings", f"/api/v1/settings/?site={SITE}"),
+        ("site bootstrap", f"/api/v1/site/?site={SITE}&lang=sv"),
+    ]
+
+
+def _summary(samples_ms: list[float]) -> dict:
+    ordered = sorted(samples_ms)
+    last = len(ordered) - 1
+
+    def pct(q):
+        return round(ordered[min(last, round(q * last))], 3)
+
+    return {
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+def _peak_kib(func) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def _bench(func, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {**_summary(samples), "peak_kib": _peak_kib(func)}
+
+
+def run_benchmarks(corpus: dict, iterations: int = 50, warmup: int = 5) -> dict:
+    """
+    Per endpoint: latency over `iterations` warm requests (response caches
+    included, as in production) and the SQL query count of a cold request.
+    """
+    for cache in (navigation_cache, settings_cache, archive_cache):
+        cache.invalidate(SITE)
+    client = Client()
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        for name, url in endpoints(corpus):
+            def request(url=url):
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url}: HTTP {response.status_code}")
+                response.content  # noqa: B018 - render fully
+
+            reset_queries()  # a full queries_log (DEBUG) would make the capture come back empty
+            with CaptureQueriesContext(connection) as ctx:
+                request()
+            queries = len(ctx.captured_queries)  # read now; later requests rotate queries_log
+            results[name] = {**_bench(request, iterations, warmup), "queries": queries}
+
+    # one list page through each serializer, HTTP left out (content.fast vs DRF)
+    feed = (
+        Post.objects.filter(site=SITE, status=PublishStatus.PUBL, unlisted=False)
+        .select_related("author", "hero_image", "author__avatar")
+        .prefetch_related("tags", "categories")
+        .order_by("-published_at")
+    )
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 12)
+    compiled = fast.compiled(PublicPostListSerializer)
+    serializers = {
+        "serialize page (drf)": lambda: PublicPostListSerializer(
+            list(feed.defer("meta")[:page_size]), many=True, context={"lang": "sv"}
+        ).data,
+        "serialize page (fast)": lambda: compiled.serialize(compiled.values(feed)[:page_size], "sv"),
+    }
+    for name, func in serializers.items():
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        queries = len(ctx.captured_queries)
+        results[name] = {**_bench(func, iterations, warmup), "queries": queries}
+
+    samples = corpus["sample_md"]
+    results["md_to_html"] = {
+        **_bench(lambda: [md_to_html(md) for md in samples], iterations, warmup),
+        "queries": 0,
+    }
+    return results
+
+
+# endpoints served by the async views (adapticus.urls_async)
+THROUGHPUT_ENDPOINTS = ("posts list", "post detail", "pages list", "navigation", "settings", "site bootstrap")
+
+
+@contextmanager
+def _db_latency(ms: float):
+    """Delay every query by `ms` on every connection, standing in for a database server's round trip."""
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(ms / 1000)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wrapper)
+
+    if ms <= 0:
+        yield
+        return
+    connection_created.connect(install)
+    connection.execute_wrappers.append(wrapper)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        connection.execute_wrappers.remove(wrapper)
+
+
+def _check(response, url):
+    if response.status_code != 200:
+        raise RuntimeError(f"{url}: HTTP {response.status_code}")
+
+
+def _wsgi_rps(url: str, requests: int, threads: int) -> float:
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, "client"):
+            local.client = Client()
+        _check(local.client.get(url), url)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(requests)))
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+async def _asgi_rps(url: str, requests: int, concurrency: int) -> float:
+    client = AsyncClient()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            # per request, as ASGIHandler does: its sync_to_async calls get their own thread
+            async with ThreadSensitiveContext():
+                _check(await client.get(url), url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return round(requests / (time.perf_counter() - start), 1)
+
+
+def run_throughput(corpus: dict, requests: int = 400, concurrency: int = 32,
+                   wsgi_threads: int = 4, db_latency_ms: float = 10.0) -> dict:
+    """
+    Requests per second per endpoint, in one process: the DRF views under
+    WSGI with `wsgi_threads` worker threads (a threaded WSGI worker) against
+    the async views under ASGI with `concurrency` requests in flight. Every
+    query waits `db_latency_ms`, the wait async I/O overlaps; with it at 0
+    on in-memory SQLite both sides are CPU bound.
+    """
+    for cache in (navigation_cache, settings_cache, archive_cache):
+        cache.invalidate(SITE)
+    urls = dict(endpoints(corpus))
+    results = {}
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]), _db_latency(db_latency_ms):
+        for name in THROUGHPUT_ENDPOINTS:
+            wsgi = _wsgi_rps(urls[name], requests, wsgi_threads)
+            with override_settings(ROOT_URLCONF="adapticus.urls_async"):
+                asgi = asyncio.run(_asgi_rps(urls[name], requests, concurrency))
+            results[name] = {"wsgi_rps": wsgi, "asgi_rps": asgi}
+    return results
+
+
+def environment(**options) -> dict:
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "sqlite": sqlite3.sqlite_version if connection.vendor == "sqlite" else None,
+        "machine": platform.machine(),
+        **options,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, metric: str = "p50_ms") -> list[str]:
+    """Regressions of `results` against `baseline["results"]`, as readable lines."""
+    problems = []
+    for name, current in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before[metric] > 0 and current[metric] > before[metric] * (1 + threshold):
+            problems.append(
+                f"{name}: {metric} {before[metric]:.3f} -> {current[metric]:.3f} "
+                f"(+{(current[metric] / before[metric] - 1) * 100:.0f}%)"
+            )
+        if current["queries"] > before["queries"]:
+            problems.append(f"{name}: queries {before['queries']} -> {current['queries']}")
+    return problems
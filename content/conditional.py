@@ -0,0 +1,148 @@
+# content/conditional.py
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Optional, Tuple
+
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .utils import request_lang
+
+# (row count, max(updated_at)) of everything a response is built from
+ConditionalState = Tuple[int, Optional[datetime]]
+
+
+def _state_aggregates(related) -> dict:
+    # forward foreign keys only: one joined row per row, so Count("pk") holds
+    aggregates = {"n": Count("pk"), "last": Max("updated_at")}
+    for i, path in enumerate(related):
+        aggregates[f"last_{i}"] = Max(f"{path}__updated_at")
+    return aggregates
+
+
+def _state(agg: dict) -> ConditionalState:
+    stamps = [value for key, value in agg.items() if key != "n" and value]
+    return agg["n"], max(stamps) if stamps else None
+
+
+def queryset_state(qs, related: tuple[str, ...] = ()) -> ConditionalState:
+    """
+    One aggregate query: row count and latest updated_at of the rows and of
+    the `related` rows they are serialized with (author, hero image, ...).
+    """
+    return _state(qs.order_by().aggregate(**_state_aggregates(related)))
+
+
+async def aqueryset_state(qs, related: tuple[str, ...] = ()) -> ConditionalState:
+    return _state(await qs.order_by().aaggregate(**_state_aggregates(related)))
+
+
+def row_stamp(related: tuple[str, ...] = ()):
+    """Per-row counterpart of queryset_state(): the row's or a `related` row's updated_at, whichever is later."""
+    if not related:
+        return F("updated_at")
+    return Greatest("updated_at", *(Coalesce(f"{path}__updated_at", "updated_at") for path in related))
+
+
+def merge_states(*states: ConditionalState) -> ConditionalState:
+    """One state for a response built from several querysets."""
+    stamps = [last for _, last in states if last]
+    return sum(count for count, _ in states), max(stamps) if stamps else None
+
+
+def state_validators(request, state: ConditionalState, last_modified: bool = True) -> tuple[str, int | None]:
+    """
+    (ETag, Last-Modified timestamp): the state hashed with the language and
+    the full request path. Lists pass last_modified=False: removing a row
+    changes the count (so the ETag) but cannot move max(updated_at) forward,
+    so If-Modified-Since alone would keep answering 304.
+    """
+    count, last = state
+    raw = "|".join([
+        request.get_full_path(),
+        request_lang(request),
+        str(count),
+        last.isoformat() if last else "",
+    ])
+    etag = quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+    return etag, int(last.timestamp()) if last and last_modified else None
+
+
+def combine_validators(request, *parts) -> tuple[str, int | None]:
+    """
+    One ETag / Last-Modified for a response assembled from parts that each
+    have validators. Last-Modified only if every part has one: a part
+    without it (a list) can change without its timestamp moving.
+    """
+    parts = [part for part in parts if part]
+    raw = "|".join([request.get_full_path(), request_lang(request), *(etag for etag, _ in parts)])
+    etag = quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+    stamps = [last_ts for _, last_ts in parts]
+    return etag, max(stamps) if stamps and None not in stamps else None
+
+
+def set_validators(response, validators) -> None:
+    etag, last_ts = validators
+    response["ETag"] = etag
+    if last_ts is not None:
+        response["Last-Modified"] = http_date(last_ts)
+    patch_vary_headers(response, ("Accept-Language",))
+
+
+class _NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / Last-Modified to list/retrieve responses and answers a
+    matching If-None-Match / If-Modified-Since with 304 from initial(), i.e.
+    before the handler runs and anything is serialized.
+
+    Views implement get_conditional_state(); the ETag hashes that state with
+    the resolved language and the full request path (site, page, filters).
+    Related rows outside the state (m2m terms) must bump the master's
+    updated_at when they change (content.signals). Only
+    last_modified_actions send Last-Modified (see state_validators()).
+    """
+    conditional_actions = ("list", "retrieve")
+    last_modified_actions = ("retrieve",)
+
+    def get_conditional_state(self) -> ConditionalState | None:
+        raise NotImplementedError
+
+    def get_validators(self, request) -> tuple[str, int | None] | None:
+        state = self.get_conditional_state()
+        if state is None:
+            return None
+        return state_validators(request, state, last_modified=self.action in self.last_modified_actions)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional_validators = None
+        if request.method not in ("GET", "HEAD") or self.action not in self.conditional_actions:
+            return
+        self._conditional_validators = self.get_validators(request)
+        if self._conditional_validators is None:
+            return
+        etag, last_ts = self._conditional_validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_ts)
+        if response is not None:
+            raise _NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, "_conditional_validators", None)
+        if validators and response.status_code in (200, 304):
+            set_validators(response, validators)
+        return response
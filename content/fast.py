@@ -0,0 +1,268 @@
+# content/fast.py
+"""
+Fast read path for the public post/page endpoints.
+
+Produces exactly what the DRF serializers in content.serializers produce
+(checked by ContentFastPathTests), without ModelSerializer field
+introspection, per-field SerializerMethodField dispatch or a nested
+MediaAssetMini instance per post:
+
+  - rows:         one .values() query for the page (master + author +
+                  avatar + hero image columns), one for the translations
+                  (as attach_translations) and one per m2m for tag/category
+                  slugs (the same query shape prefetch_related runs, so the
+                  order matches)
+  - assembly:     FastSerializer compiles a serializer's field list into
+                  (key, getter) pairs once; each row is then one dict
+                  comprehension over it
+
+Views opt in via FastSerializerMixin; API_FAST_SERIALIZERS=False falls back
+to the DRF serializers. aserialize() runs the same queries on the async ORM
+(content.async_views).
+"""
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+
+from django.conf import settings
+from parler.appsettings import PARLER_LANGUAGES
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+from core.metrics import timed
+from core.models import MediaAsset
+from .serializers import (
+    PublicPageListSerializer,
+    PublicPageSerializer,
+    PublicPostListSerializer,
+    PublicPostSerializer,
+)
+from .utils import DEFAULT_LANG
+
+_datetime = serializers.DateTimeField()  # DRF's own ISO 8601 / time zone formatting
+
+_MEDIA_COLUMNS = (
+    "id", "kind", "file", "derivatives", "lqip", "width", "height",
+    "duration_ms", "alt_text", "caption", "meta",
+)
+# serializer field -> (relation path, columns) it is built from
+_RELATED = {
+    "author": (("author", ("id", "name", "slug", "url")), ("author__avatar", _MEDIA_COLUMNS)),
+    "hero_image_data": (("hero_image", _MEDIA_COLUMNS),),
+}
+
+
+def _storage():
+    return MediaAsset._meta.get_field("file").storage
+
+
+def _media(row: dict, prefix: str) -> dict | None:
+    if row[f"{prefix}id"] is None:
+        return None
+    name = row[f"{prefix}file"]
+    storage = _storage()
+    derivatives = row[f"{prefix}derivatives"] or []
+    return {
+        "id": str(row[f"{prefix}id"]),
+        "kind": row[f"{prefix}kind"],
+        "url": storage.url(name) if name else None,
+        "srcset": [
+            {"url": storage.url(d["path"]), "width": d["width"], "height": d["height"], "format": d["format"]}
+            for d in derivatives
+        ],
+        "lqip": row[f"{prefix}lqip"],
+        "width": row[f"{prefix}width"],
+        "height": row[f"{prefix}height"],
+        "duration_ms": row[f"{prefix}duration_ms"],
+        "alt_text": row[f"{prefix}alt_text"],
+        "caption": row[f"{prefix}caption"],
+        "meta": row[f"{prefix}meta"],
+    }
+
+
+def _author(row: dict) -> dict | None:
+    if row["author__id"] is None:
+        return None
+    avatar = _media(row, "author__avatar__")
+    return {
+        "id": str(row["author__id"]),
+        "name": row["author__name"],
+        "slug": row["author__slug"],
+        "url": row["author__url"],
+        "avatar_url": avatar["url"] if avatar else None,
+        "avatar_srcset": avatar["srcset"] if avatar else [],
+        "avatar_lqip": (avatar["lqip"] or None) if avatar else None,
+    }
+
+
+def _translated(field: str):
+    return lambda row: (row["_tr"] or {}).get(field) or ""
+
+
+def _title(row: dict) -> str:
+    return (row["_tr"] or {}).get("title") or row["slug"]
+
+
+# key -> getter over a master row carrying "_tr" (the active translation),
+# "_langs", "_lang" and the m2m slug lists
+_GETTERS = {
+    "id": lambda row: str(row["id"]),
+    "site": lambda row: row["site"],
+    "slug": lambda row: row["slug"],
+    "status": lambda row: row["status"],
+    "published_at": lambda row: _datetime.to_representation(row["published_at"]),
+    "unlisted": lambda row: row["unlisted"],
+    "is_home": lambda row: row["is_home"],
+    "meta": lambda row: row["meta"],
+    "author": _author,
+    "reading_time_min": lambda row: row["_tr"]["body_reading_time_min"] if row["_tr"] else row["reading_time_min"],
+    "word_count": lambda row: row["_tr"]["body_word_count"] if row["_tr"] else row["word_count"],
+    "tags": lambda row: row["tags"],
+    "categories": lambda row: row["categories"],
+    "active_locale": lambda row: row["_lang"],
+    "available_locales": lambda row: row["_langs"],
+    "title": _title,
+    "summary": _translated("summary"),
+    "body_html": _translated("body_html"),
+    "seo_title": lambda row: (row["_tr"] or {}).get("seo_title") or _title(row),
+    "seo_desc": _translated("seo_desc"),
+    "hero_image_data": lambda row: _media(row, "hero_image__"),
+}
+
+
+class FastSerializer:
+    """A DRF serializer class compiled to getters; serialize() takes values() rows."""
+
+    def __init__(self, serializer_class):
+        self.model = serializer_class.Meta.model
+        fields = tuple(serializer_class.Meta.fields)
+        self.translation_fields = tuple(serializer_class.translation_fields)
+        self.getters = [(name, _GETTERS[name]) for name in fields]
+        opts = self.model._meta
+        self.columns = tuple(f.name for f in opts.concrete_fields if f.name in fields) + tuple(
+            f"{path}__{column}"
+            for name in fields
+            for path, columns in _RELATED.get(name, ())
+            for column in columns
+        )
+        # (field, related model, lookup back to this model)
+        self.m2m = [
+            (f.name, f.related_model, f.related_query_name())
+            for f in opts.many_to_many if f.name in fields
+        ]
+
+    def values(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def serialize(self, rows, lang: str = DEFAULT_LANG) -> list[dict]:
+        with timed("serialize"):
+            rows = list(rows)
+            if not rows:
+                return []
+            ids = [row["id"] for row in rows]
+            translations = list(self._translations(ids))
+            related = {name: list(qs) for name, qs in self._related(ids)}
+            return self._assemble(rows, translations, related, lang)
+
+    async def aserialize(self, rows: list[dict], lang: str = DEFAULT_LANG) -> list[dict]:
+        """serialize() with the translation and m2m queries run concurrently on the async ORM."""
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        m2m = self._related(ids)
+        translations, *slugs = await asyncio.gather(
+            alist(self._translations(ids)), *(alist(qs) for _, qs in m2m)
+        )
+        related = {name: pairs for (name, _), pairs in zip(m2m, slugs)}
+        with timed("serialize"):
+            return self._assemble(rows, translations, related, lang)
+
+    def _translations(self, ids):
+        tr_model = self.model._parler_meta.root_model
+        return tr_model.objects.filter(master_id__in=ids).values(
+            "master_id", "language_code", *self.translation_fields
+        )
+
+    def _related(self, ids):
+        # the query prefetch_related("<name>") runs, so slugs come in the same order
+        return [
+            (name, model.objects.filter(**{f"{back}__in": ids}).values_list(f"{back}__id", "slug"))
+            for name, model, back in self.m2m
+        ]
+
+    def _assemble(self, rows, translations, related, lang) -> list[dict]:
+        by_master = {row["id"]: {} for row in rows}
+        for tr in translations:
+            by_master[tr["master_id"]][tr["language_code"]] = tr
+        slugs = {}
+        for name, pairs in related.items():
+            slugs[name] = {pk: [] for pk in by_master}
+            for pk, slug in pairs:
+                slugs[name][pk].append(slug)
+        codes = _language_order(lang)
+        out = []
+        for row in rows:
+            by_lang = by_master[row["id"]]
+            row["_lang"] = lang
+            row["_langs"] = sorted(by_lang)
+            row["_tr"] = next((by_lang[c] for c in codes if c in by_lang), None)
+            for name, per_post in slugs.items():
+                row[name] = per_post[row["id"]]
+            out.append({key: getter(row) for key, getter in self.getters})
+        return out
+
+
+async def alist(queryset) -> list:
+    """list() for the async ORM."""
+    return [row async for row in queryset]
+
+
+@lru_cache(maxsize=None)
+def _language_order(lang: str) -> tuple[str, ...]:
+    # active language first, then the parler fallbacks (as BaseTranslatedSerializer)
+    return (lang, *PARLER_LANGUAGES.get_fallback_languages(lang))
+
+
+_COMPILED = {
+    cls: FastSerializer(cls)
+    for cls in (PublicPostSerializer, PublicPostListSerializer, PublicPageSerializer, PublicPageListSerializer)
+}
+
+
+def compiled(serializer_class) -> FastSerializer | None:
+    return _COMPILED.get(serializer_class)
+
+
+class FastSerializerMixin:
+    """
+    list() / retrieve() through the compiled serializer of
+    get_serializer_class(), with the view's own queryset, filters and
+    pagination. Other actions and uncompiled serializers use DRF as usual.
+    """
+
+    def _fast(self) -> FastSerializer | None:
+        if not getattr(settings, "API_FAST_SERIALIZERS", True):
+            return None
+        return compiled(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        fast = self._fast()
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+        lang = self.get_serializer_context()["lang"]
+        queryset = fast.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page, lang))
+        return Response(fast.serialize(queryset, lang))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast = self._fast()
+        if fast is None:
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = fast.values(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(fast.serialize([row], self.get_serializer_context()["lang"])[0])
@@ -0,0 +1,121 @@
+# content/filters.py
+"""
+Query-string filters for the public posts endpoint:
+
+    ?tag=a,b&match=any|all   posts with any / all of the tags (slugs)
+    ?category=x,y            posts in any of the categories or their subcategories
+    ?author=slug
+    ?year=2025&month=3       published in that year / month (site time zone)
+
+Every taxonomy filter is a single `pk IN (SELECT post_id ...)` semi-join over
+content_post_tags / content_post_categories, so no filter multiplies rows
+(no DISTINCT needed) and each runs on the join tables' indexes. Match-all
+groups the join rows per post instead of chaining one join per tag.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from taxonomy.models import Category
+from .models import Post
+from .utils import request_site
+
+MATCH_ANY, MATCH_ALL = "any", "all"
+
+
+def _slugs(request, name) -> list[str]:
+    raw = request.query_params.get(name) or ""
+    return sorted({s.strip() for s in raw.split(",") if s.strip()})
+
+
+def _int_param(request, name, lo, hi) -> int | None:
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValidationError({name: "Must be an integer."})
+    if not lo <= value <= hi:
+        raise ValidationError({name: f"Must be between {lo} and {hi}."})
+    return value
+
+
+def month_bounds(year: int, month: int | None):
+    """[start, end) of a year or a month in the current time zone."""
+    tz = timezone.get_current_timezone()
+    if month is None:
+        return datetime(year, 1, 1, tzinfo=tz), datetime(year + 1, 1, 1, tzinfo=tz)
+    end = datetime(year + 1, 1, 1, tzinfo=tz) if month == 12 else datetime(year, month + 1, 1, tzinfo=tz)
+    return datetime(year, month, 1, tzinfo=tz), end
+
+
+def tagged_post_ids(site, slugs: list[str], match: str = MATCH_ANY):
+    links = Post.tags.through.objects.filter(tag__site=site, tag__slug__in=slugs)
+    if match == MATCH_ALL and len(slugs) > 1:
+        # (site, slug) is unique, so a post has all tags iff it has len(slugs) rows
+        links = links.values("post_id").annotate(n=Count("tag_id")).filter(n=len(slugs))
+    return links.values("post_id")
+
+
+def categorized_post_ids(site, slugs: list[str]):
+    paths = Category.objects.filter(site=site, slug__in=slugs).values_list("path", flat=True)
+    in_subtrees = Q(pk__in=[])
+    for path in paths:
+        in_subtrees |= Category.subtree_q(path, "category__path")
+    return Post.categories.through.objects.filter(in_subtrees).values("post_id")
+
+
+class PostFilterBackend(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, "action", None) != "list":
+            return queryset
+        site = request_site(request)
+
+        tags = _slugs(request, "tag")
+        if tags:
+            match = request.query_params.get("match") or MATCH_ANY
+            if match not in (MATCH_ANY, MATCH_ALL):
+                raise ValidationError({"match": f"Must be '{MATCH_ANY}' or '{MATCH_ALL}'."})
+            queryset = queryset.filter(pk__in=tagged_post_ids(site, tags, match))
+
+        categories = _slugs(request, "category")
+        if categories:
+            queryset = queryset.filter(pk__in=categorized_post_ids(site, categories))
+
+        author = request.query_params.get("author")
+        if author:
+            queryset = queryset.filter(author__slug=author)
+
+        year = _int_param(request, "year", 1, 9998)
+        month = _int_param(request, "month", 1, 12)
+        if month is not None and year is None:
+            raise ValidationError({"month": "Requires year."})
+        if year is not None:
+            start, end = month_bounds(year, month)
+            queryset = queryset.filter(published_at__gte=start, published_at__lt=end)
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        def param(name, description, schema_type="string"):
+            return {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": schema_type},
+            }
+
+        return [
+            param("tag", "Comma-separated tag slugs."),
+            param("match", "'any' (default) or 'all' of the tags."),
+            param("category", "Comma-separated category slugs; subcategories are included."),
+            param("author", "Author slug."),
+            param("year", "Publication year.", "integer"),
+            param("month", "Publication month (1-12); requires year.", "integer"),
+        ]
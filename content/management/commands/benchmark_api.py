@@ -0,0 +1,107 @@
+# content/management/commands/benchmark_api.py
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from content.benchmark import compare, environment, run_benchmarks, run_throughput, seed_corpus
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic corpus into a throwaway test database, benchmark the public "
+        "endpoints and md_to_html, and compare against (or write) a JSON baseline. "
+        "Also compares WSGI and ASGI throughput unless --no-throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=40)
+        parser.add_argument("--categories", type=int, default=12)
+        parser.add_argument("--pages", type=int, default=20)
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--baseline", default="benchmark-baseline.json", help="Baseline JSON file.")
+        parser.add_argument("--write-baseline", action="store_true", help="Save this run as the baseline.")
+        parser.add_argument("--output", help="Also write this run's JSON here.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Allowed p50 slowdown vs. the baseline, as a fraction (default 0.25 = 25%%).",
+        )
+        parser.add_argument("--no-throughput", action="store_true", help="Skip the WSGI/ASGI throughput run.")
+        parser.add_argument("--throughput-requests", type=int, default=400, help="Requests per endpoint and server.")
+        parser.add_argument("--concurrency", type=int, default=32, help="ASGI requests in flight.")
+        parser.add_argument("--wsgi-threads", type=int, default=4, help="WSGI worker threads.")
+        parser.add_argument(
+            "--db-latency-ms", type=float, default=10.0,
+            help="Added to every query in the throughput run, standing in for a database server.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = {k: options[k] for k in ("posts", "tags", "categories", "pages", "seed")}
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={"default"})
+        try:
+            corpus = seed_corpus(**sizes)
+            results = run_benchmarks(corpus, iterations=options["iterations"], warmup=options["warmup"])
+            throughput = None
+            if not options["no_throughput"]:
+                throughput = run_throughput(
+                    corpus, requests=options["throughput_requests"], concurrency=options["concurrency"],
+                    wsgi_threads=options["wsgi_threads"], db_latency_ms=options["db_latency_ms"],
+                )
+            meta = environment(**sizes, iterations=options["iterations"])
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
+
+        self.report(results)
+        run = {"meta": meta, "results": results}
+        if throughput is not None:
+            self.report_throughput(throughput, options)
+            run["throughput"] = throughput
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(run, indent=2) + "\n")
+
+        baseline_path = Path(options["baseline"])
+        if options["write_baseline"]:
+            baseline_path.write_text(json.dumps(run, indent=2) + "\n")
+            self.stdout.write(f"Baseline written to {baseline_path}.")
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --write-baseline to create one.")
+            return
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("meta", {}).get("posts") != sizes["posts"]:
+            self.stderr.write("warning: baseline was recorded with a different corpus size")
+        problems = compare(results, baseline, options["threshold"])
+        for line in problems:
+            self.stderr.write(line)
+        if problems:
+            raise CommandError(f"{len(problems)} regression(s) against {baseline_path}")
+        self.stdout.write(f"No regressions against {baseline_path}.")
+
+    def report(self, results: dict) -> None:
+        self.stdout.write(f"{'benchmark':<24}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'peak KiB':>10}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<24}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+                f"{r['queries']:>9}{r['peak_kib']:>10.1f}"
+            )
+        drf, fast = results.get("serialize page (drf)"), results.get("serialize page (fast)")
+        if drf and fast and fast["p50_ms"]:
+            self.stdout.write(f"fast serializer: {drf['p50_ms'] / fast['p50_ms']:.1f}x the DRF serializer (p50)")
+
+    def report_throughput(self, throughput: dict, options: dict) -> None:
+        self.stdout.write(
+            f"\nthroughput, req/s ({options['wsgi_threads']} WSGI threads, {options['concurrency']} ASGI "
+            f"in flight, +{options['db_latency_ms']:g} ms per query)"
+        )
+        self.stdout.write(f"{'endpoint':<24}{'wsgi':>9}{'asgi':>9}{'asgi/wsgi':>11}")
+        for name, r in throughput.items():
+            ratio = r["asgi_rps"] / r["wsgi_rps"] if r["wsgi_rps"] else 0.0
+            self.stdout.write(f"{name:<24}{r['wsgi_rps']:>9.1f}{r['asgi_rps']:>9.1f}{ratio:>10.1f}x")
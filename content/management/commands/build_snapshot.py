@@ -0,0 +1,28 @@
+# content/management/commands/build_snapshot.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from content.snapshot import SnapshotBuilder
+from content.utils import SUPPORTED_SITES
+
+
+class Command(BaseCommand):
+    help = "Write the public API as static (pre-compressed) JSON files to SNAPSHOT_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", action="append", choices=SUPPORTED_SITES)
+        parser.add_argument("--output", help="Directory to write to (default: SNAPSHOT_ROOT).")
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the manifest and re-render everything.",
+        )
+
+    def handle(self, *args, site=None, output=None, full=False, **options):
+        builder = SnapshotBuilder(root=output, full=full)
+        builder.build(sites=site or SUPPORTED_SITES)
+        self.stdout.write(
+            f"{len(builder.written)} file(s) written, {len(builder.removed)} removed, "
+            f"{len(builder.manifest)} in snapshot at {builder.root}"
+        )
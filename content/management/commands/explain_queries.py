@@ -0,0 +1,105 @@
+# content/management/commands/explain_queries.py
+from __future__ import annotations
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.cache import archive_cache, navigation_cache, settings_cache
+from content.utils import SUPPORTED_SITES, internal_request
+
+# (label, url); "{site}" is filled in per site
+PUBLIC_ENDPOINTS = (
+    ("posts", "/api/v1/content/posts/?site={site}&lang=sv"),
+    ("posts (cursor)", "/api/v1/content/posts/?site={site}&cursor="),
+    ("posts (any tag)", "/api/v1/content/posts/?site={site}&tag=a,b"),
+    ("posts (all tags)", "/api/v1/content/posts/?site={site}&tag=a,b&match=all"),
+    ("posts (category)", "/api/v1/content/posts/?site={site}&category={category_slug}"),
+    ("posts (author, month)", "/api/v1/content/posts/?site={site}&author=a&year=2025&month=3"),
+    ("posts archive", "/api/v1/content/posts/archive/?site={site}"),
+    ("post detail", "/api/v1/content/posts/{post_slug}/?site={site}"),
+    ("pages", "/api/v1/content/pages/?site={site}"),
+    ("page detail", "/api/v1/content/pages/{page_slug}/?site={site}"),
+    ("navigation", "/api/v1/navigation/?site={site}"),
+    ("settings", "/api/v1/settings/?site={site}"),
+    ("tags", "/api/v1/taxonomy/tags/?site={site}"),
+    ("categories", "/api/v1/taxonomy/categories/?site={site}"),
+)
+
+
+def full_scans(sql: str) -> list[str]:
+    """Plan lines of `sql` that read a whole table."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+            return [
+                d for d in details
+                if d.startswith("SCAN ") and not d.startswith(("SCAN CONSTANT", "SCAN (subquery"))
+            ]
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN " + sql)
+            return [row[0].strip() for row in cursor.fetchall() if "Seq Scan" in row[0]]
+    raise CommandError(f"EXPLAIN check not implemented for {connection.vendor}")
+
+
+def _capture(statements: list):
+    """execute_wrapper that records each statement with its parameters filled in."""
+    def wrapper(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        statements.append(connection.ops.last_executed_query(context["cursor"], sql, params))
+        return result
+    return wrapper
+
+
+def check_public_endpoints(sites=SUPPORTED_SITES, post_slug=None, page_slug=None):
+    """
+    Request every public endpoint and EXPLAIN each SQL statement it runs.
+    Returns [(label, sql, [scan lines]), ...] for the offending statements.
+    """
+    from content.models import Page, Post
+    from taxonomy.models import Category
+
+    # the full middleware stack, without the request_started/finished signals
+    handler = BaseHandler()
+    handler.load_middleware()
+    problems = []
+    for site in sites:
+        # the response caches would hide the navigation/settings queries
+        navigation_cache.invalidate(site)
+        settings_cache.invalidate(site)
+        archive_cache.invalidate(site)
+        slugs = {
+            "post_slug": post_slug
+            or Post.objects.filter(site=site).values_list("slug", flat=True).first()
+            or "missing",
+            "page_slug": page_slug
+            or Page.objects.filter(site=site).values_list("slug", flat=True).first()
+            or "missing",
+            "category_slug": Category.objects.filter(site=site).values_list("slug", flat=True).first()
+            or "missing",
+        }
+        for label, url in PUBLIC_ENDPOINTS:
+            statements = []
+            with connection.execute_wrapper(_capture(statements)):
+                handler.get_response(internal_request(url.format(site=site, **slugs)))
+            for sql in statements:
+                scans = full_scans(sql)
+                if scans:
+                    problems.append((f"{label} [{site}]", sql, scans))
+    return problems
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the SQL of every public API endpoint and fail on full table scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--site", action="append", choices=SUPPORTED_SITES)
+
+    def handle(self, *args, site=None, **options):
+        problems = check_public_endpoints(sites=site or SUPPORTED_SITES)
+        for label, sql, scans in problems:
+            self.stderr.write(f"{label}: {'; '.join(scans)}\n  {sql}")
+        if problems:
+            raise CommandError(f"{len(problems)} quer{'y' if len(problems) == 1 else 'ies'} with full table scans")
+        self.stdout.write("No full table scans in public endpoint queries.")
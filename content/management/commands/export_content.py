@@ -0,0 +1,42 @@
+# content/management/commands/export_content.py
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from content.transfer import export_records
+from content.utils import SUPPORTED_SITES
+
+
+def _default(value):
+    return str(value)  # UUIDs in JSON columns
+
+
+class Command(BaseCommand):
+    help = "Stream posts, pages, taxonomy, authors and media records as JSONL (see content.transfer)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", nargs="?", default="-", help="File to write (.gz compresses); - for stdout.")
+        parser.add_argument("--site", action="append", choices=SUPPORTED_SITES)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, output="-", site=None, batch_size=500, **options):
+        if output == "-":
+            out, close = sys.stdout, False
+        elif output.endswith(".gz"):
+            out, close = gzip.open(output, "wt", encoding="utf-8"), True
+        else:
+            out, close = open(output, "w", encoding="utf-8"), True
+        counts = {}
+        try:
+            for record in export_records(sites=site, batch_size=batch_size):
+                out.write(json.dumps(record, ensure_ascii=False, default=_default) + "\n")
+                counts[record["type"]] = counts.get(record["type"], 0) + 1
+        finally:
+            if close:
+                out.close()
+        summary = ", ".join(f"{n} {kind}" for kind, n in counts.items()) or "nothing"
+        self.stderr.write(f"Exported {summary}.")
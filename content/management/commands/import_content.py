@@ -0,0 +1,47 @@
+# content/management/commands/import_content.py
+from __future__ import annotations
+
+import gzip
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from content import search
+from content.transfer import Importer, TransferError
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a JSONL dump (export_content) with batched upserts on natural keys; "
+        "re-importing the same dump is a no-op."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", nargs="?", default="-", help="File to read (.gz decompresses); - for stdin.")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Processes rendering markdown; 0 renders inline.",
+        )
+        parser.add_argument("--no-reindex", action="store_true", help="Skip rebuilding the search index.")
+
+    def handle(self, *args, input="-", batch_size=500, workers=None, no_reindex=False, **options):
+        if input == "-":
+            lines, close = sys.stdin, None
+        elif input.endswith(".gz"):
+            lines = close = gzip.open(input, "rt", encoding="utf-8")
+        else:
+            lines = close = open(input, encoding="utf-8")
+        try:
+            stats = Importer(batch_size=batch_size, workers=workers).run(lines)
+        except TransferError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if close is not None:
+                close.close()
+        for key, n in sorted(stats.items()):
+            self.stdout.write(f"{key}: {n}")
+        # bulk writes send no signals, so the search index is rebuilt once at the end
+        if not no_reindex:
+            self.stdout.write(f"{search.rebuild()} search document(s) indexed.")
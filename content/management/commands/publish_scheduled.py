@@ -0,0 +1,65 @@
+# content/management/commands/publish_scheduled.py
+from __future__ import annotations
+
+import signal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content.revalidate import get_dispatcher
+from content.scheduling import Scheduler, due_posts, next_due, publish_due
+
+
+def _when(value) -> str:
+    return f"{timezone.localtime(value):%Y-%m-%d %H:%M %Z}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish scheduled posts whose published_at has passed. With --loop, keep "
+        "running and sleep until the next scheduled post is due."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Run until interrupted (SIGTERM / Ctrl-C).")
+        parser.add_argument(
+            "--max-sleep", type=float, default=300.0,
+            help="Longest sleep in seconds; bounds how late a post scheduled meanwhile is picked up.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="List due posts without publishing them.")
+
+    def handle(self, *args, loop=False, max_sleep=300.0, dry_run=False, **options):
+        if dry_run:
+            due = due_posts()
+            for post in due:
+                self.stdout.write(f"would publish [{post['site']}] {post['slug']} (due {_when(post['published_at'])})")
+            upcoming = next_due()
+            self.stdout.write(f"{len(due)} post(s) due." + (f" Next at {_when(upcoming)}." if upcoming else ""))
+            return
+        if not loop:
+            self.report(publish_due())
+            self.flush()
+            return
+
+        scheduler = Scheduler(max_sleep=max_sleep)
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+        signal.signal(signal.SIGHUP, lambda *_: scheduler.wake())  # re-check now
+        self.stdout.write("Scheduler running.")
+        try:
+            scheduler.run_forever(on_publish=self.report)
+        except KeyboardInterrupt:
+            pass
+        self.flush()
+        self.stdout.write("Scheduler stopped.")
+
+    def report(self, published: list[dict]) -> None:
+        for post in published:
+            self.stdout.write(f"published [{post['site']}] {post['slug']}")
+        self.stdout.write(f"{len(published)} post(s) published.")
+
+    def flush(self) -> None:
+        # revalidation is sent from a daemon thread after REVALIDATE_WINDOW;
+        # without waiting for it, exiting drops the batch
+        dispatcher = get_dispatcher()
+        if dispatcher is not None and not dispatcher.flush(timeout=30.0):
+            self.stderr.write("Revalidation not sent before exit.")
@@ -0,0 +1,51 @@
+# content/management/commands/reading_stats.py
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from content.markdown import refresh_body_html
+from content.models import Post
+from content.reading import refresh_reading_stats, sync_post_reading_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute per-language word counts / reading times for all posts, in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size=500, **options):
+        tr_model = Post._parler_meta.root_model
+        default_lang = settings.PARLER_DEFAULT_LANGUAGE
+        # stream translations by primary key; only one chunk is held in memory
+        qs = tr_model.objects.order_by("pk")
+        last_pk, total = 0, 0
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            for tr in chunk:
+                # counted from the HTML: render rows whose markdown changed or was never rendered
+                refresh_body_html(tr)
+                refresh_reading_stats(tr)
+            with transaction.atomic():
+                tr_model.objects.bulk_update(
+                    chunk, ["body_html", "body_hash", "body_word_count", "body_reading_time_min"]
+                )
+                masters = [
+                    Post(pk=tr.master_id, word_count=tr.body_word_count,
+                         reading_time_min=tr.body_reading_time_min)
+                    for tr in chunk
+                    if tr.language_code == default_lang
+                ]
+                Post.objects.bulk_update(masters, ["word_count", "reading_time_min"])
+            total += len(chunk)
+            self.stdout.write(f"{total} translations updated")
+
+        # posts without a default-language translation take any language's stats
+        orphans = Post.objects.exclude(translations__language_code=default_lang)
+        for post_id in orphans.values_list("pk", flat=True).iterator(chunk_size=batch_size):
+            sync_post_reading_stats(post_id)
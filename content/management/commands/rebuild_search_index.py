@@ -0,0 +1,18 @@
+# content/management/commands/rebuild_search_index.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from content import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from every public post and page translation."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size=500, **options):
+        backend = search.get_backend()
+        total = search.rebuild(chunk_size=batch_size)
+        self.stdout.write(f"Indexed {total} translations ({backend.name}).")
@@ -0,0 +1,38 @@
+# content/management/commands/render_markdown.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from content.markdown import refresh_body_html
+from content.models import Post, Page
+
+
+class Command(BaseCommand):
+    help = "Backfill / re-render the stored body_html of Post and Page translations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render every row, even when body_md is unchanged.",
+        )
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, force=False, batch_size=200, **options):
+        for model in (Post, Page):
+            tr_model = model._parler_meta.root_model
+            # full rows: parler reads every translated field on init, so .only() would N+1
+            qs = tr_model.objects.order_by("pk")
+            batch, seen, changed = [], 0, 0
+            for tr in qs.iterator(chunk_size=batch_size):
+                seen += 1
+                if refresh_body_html(tr, force=force):
+                    batch.append(tr)
+                if len(batch) >= batch_size:
+                    tr_model.objects.bulk_update(batch, ["body_html", "body_hash"])
+                    changed += len(batch)
+                    batch = []
+            if batch:
+                tr_model.objects.bulk_update(batch, ["body_html", "body_hash"])
+                changed += len(batch)
+            self.stdout.write(f"{model.__name__}: {changed}/{seen} translations rendered")
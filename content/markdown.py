@@ -1,11 +1,33 @@
 # content/markdown.py
 from __future__ import annotations
 
+import hashlib
+
 from markdown_it import MarkdownIt
 
+from core.metrics import timed_method
+
 # CommonMark + useful extras
 _md = MarkdownIt("commonmark").enable("table").enable("strikethrough")
 
 
+@timed_method("markdown")
 def md_to_html(md_text: str | None) -> str:
     return _md.render(md_text or "")
+
+
+def md_hash(md_text: str | None) -> str:
+    return hashlib.sha256((md_text or "").encode("utf-8")).hexdigest()
+
+
+def refresh_body_html(translation, force: bool = False) -> bool:
+    """
+    Re-render translation.body_html when body_md changed since the last render.
+    The stored body_hash is the cache key; returns True if the HTML was rebuilt.
+    """
+    digest = md_hash(translation.body_md)
+    if not force and translation.body_hash == digest:
+        return False
+    translation.body_html = md_to_html(translation.body_md)
+    translation.body_hash = digest
+    return True
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+def render_bodies(apps, schema_editor):
+    # same render as content.signals, so existing rows don't serve an empty body_html
+    from content.markdown import md_hash, md_to_html
+
+    for model in ("PostTranslation", "PageTranslation"):
+        Translation = apps.get_model("content", model)
+        batch = []
+        # values, not instances: parler's translation model reads every field on init
+        for pk, body_md in Translation.objects.values_list("pk", "body_md").iterator(chunk_size=500):
+            batch.append(Translation(pk=pk, body_html=md_to_html(body_md), body_hash=md_hash(body_md)))
+            if len(batch) >= 500:
+                Translation.objects.bulk_update(batch, ["body_html", "body_hash"])
+                batch = []
+        Translation.objects.bulk_update(batch, ["body_html", "body_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pagetranslation',
+            name='body_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='pagetranslation',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='posttranslation',
+            name='body_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='posttranslation',
+            name='body_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(render_bodies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_translation_body_html'),
+        ('core', '0001_initial'),
+        ('taxonomy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'published'), ('unlisted', False)), fields=['site', 'published_at', 'id'], name='post_feed_idx'),
+        ),
+    ]
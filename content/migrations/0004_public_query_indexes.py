@@ -0,0 +1,26 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_post_feed_index'),
+        ('core', '0002_public_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='page',
+            index=models.Index(condition=models.Q(('is_home', True)), fields=['site'], name='page_home_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagetranslation',
+            index=models.Index(fields=['master', 'language_code'], name='page_tr_master_lang_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posttranslation',
+            index=models.Index(fields=['master', 'language_code'], name='post_tr_master_lang_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_reading_stats(apps, schema_editor):
+    # the values content.reading computes on save; Post mirrors the default language
+    from content.markdown import md_to_html
+    from content.reading import count_words, reading_time_min
+
+    PostTranslation = apps.get_model("content", "PostTranslation")
+    Post = apps.get_model("content", "Post")
+    default_lang = settings.PARLER_DEFAULT_LANGUAGE
+    stats = {}  # post id -> (words, minutes) of the translation the Post mirrors
+    batch = []
+    rows = PostTranslation.objects.values_list("pk", "master_id", "language_code", "body_html", "body_md")
+    for pk, master_id, lang, body_html, body_md in rows.iterator(chunk_size=500):
+        words = count_words(body_html or md_to_html(body_md))
+        minutes = reading_time_min(words, lang)
+        batch.append(PostTranslation(pk=pk, body_word_count=words, body_reading_time_min=minutes))
+        if master_id not in stats or lang == default_lang:
+            stats[master_id] = (words, minutes)
+        if len(batch) >= 500:
+            PostTranslation.objects.bulk_update(batch, ["body_word_count", "body_reading_time_min"])
+            batch = []
+    PostTranslation.objects.bulk_update(batch, ["body_word_count", "body_reading_time_min"])
+    Post.objects.bulk_update(
+        [Post(pk=pk, word_count=words, reading_time_min=minutes) for pk, (words, minutes) in stats.items()],
+        ["word_count", "reading_time_min"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_public_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posttranslation',
+            name='body_reading_time_min',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='posttranslation',
+            name='body_word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_reading_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_post_translation_reading_stats'),
+        ('core', '0004_mediaasset_checksum_index'),
+        ('taxonomy', '0003_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_at'], name='post_status_published_idx'),
+        ),
+    ]
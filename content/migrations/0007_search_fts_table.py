@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 16:10
+
+from django.db import migrations
+
+FTS_TABLE = "content_search_fts"
+
+
+def create_fts_table(apps, schema_editor):
+    # SQLite with FTS5 only; elsewhere content.search uses its Python index
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, site UNINDEXED, lang UNINDEXED, "
+        "slug UNINDEXED, title, summary, body, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_post_status_published_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -30,13 +30,33 @@ class Post(TranslatableModel, TimeStamped):
         title = models.CharField(max_length=200),
         summary = models.CharField(max_length=350, blank=True),
         body_md = models.TextField(),
+        # render cache, filled from body_md on save (see content.signals)
+        body_html = models.TextField(blank=True, default="", editable=False),
+        body_hash = models.CharField(max_length=64, blank=True, default="", editable=False),
+        # per-language reading stats, computed from body_html (see content.reading);
+        # Post.word_count / reading_time_min mirror the default language
+        body_word_count = models.PositiveIntegerField(default=0, editable=False),
+        body_reading_time_min = models.PositiveSmallIntegerField(default=0, editable=False),
         seo_title = models.CharField(max_length=200, blank=True),
         seo_desc  = models.CharField(max_length=160, blank=True),
+        meta = {"indexes": [models.Index(fields=["master", "language_code"], name="post_tr_master_lang_idx")]},
     )
 
     class Meta:
         unique_together = [("site","slug")]
         ordering = ["-published_at"]
+        indexes = [
+            # public feed + keyset pagination: (published_at, id) order within a site.
+            # Partial on the public filter: `unlisted=False` compiles to `NOT unlisted`,
+            # which SQLite cannot use as an equality column of a plain composite index.
+            models.Index(
+                fields=["site", "published_at", "id"],
+                condition=models.Q(status=PublishStatus.PUBL, unlisted=False),
+                name="post_feed_idx",
+            ),
+            # scheduled publishing (content.scheduling): due and next-due lookups
+            models.Index(fields=["status", "published_at"], name="post_status_published_idx"),
+        ]
 
 class Page(TranslatableModel, TimeStamped):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -49,9 +69,16 @@ class Page(TranslatableModel, TimeStamped):
     translations = TranslatedFields(
         title = models.CharField(max_length=200),
         body_md = models.TextField(),
+        # render cache, filled from body_md on save (see content.signals)
+        body_html = models.TextField(blank=True, default="", editable=False),
+        body_hash = models.CharField(max_length=64, blank=True, default="", editable=False),
         seo_title = models.CharField(max_length=200, blank=True),
         seo_desc  = models.CharField(max_length=160, blank=True),
+        meta = {"indexes": [models.Index(fields=["master", "language_code"], name="page_tr_master_lang_idx")]},
     )
 
     class Meta:
         unique_together = [("site","slug")]
+        indexes = [
+            models.Index(fields=["site"], condition=models.Q(is_home=True), name="page_home_idx"),
+        ]
@@ -0,0 +1,82 @@
+# content/pagination.py
+from __future__ import annotations
+
+import base64
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PostKeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on (published_at, id), newest first.
+
+    Each page is `WHERE (published_at, id) < cursor ORDER BY published_at DESC,
+    id DESC LIMIT n+1` — one range scan of post_feed_idx whatever the depth,
+    and no COUNT(*). Opt in with ?cursor= (empty for the first page); the
+    response's `next` carries the opaque cursor of the following page.
+    """
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 12)
+        self.next_position = None
+
+    @staticmethod
+    def encode_cursor(published_at: datetime, pk) -> str:
+        raw = f"{published_at.isoformat()}|{pk}".encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, value: str):
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode("utf-8")
+            ts, pk = raw.split("|", 1)
+            return datetime.fromisoformat(ts), uuid.UUID(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        qs = queryset.order_by("-published_at", "-pk")
+        value = request.query_params.get(self.cursor_query_param)
+        if value:
+            published_at, pk = self.decode_cursor(value)
+            # the redundant upper bound gives the planner a range to seek on
+            qs = qs.filter(published_at__lte=published_at).filter(
+                Q(published_at__lt=published_at) | Q(published_at=published_at, pk__lt=pk)
+            )
+        items = list(qs[: self.page_size + 1])
+        if len(items) > self.page_size:
+            items = items[: self.page_size]
+            last = items[-1]
+            if isinstance(last, dict):  # values() rows (content.fast)
+                self.next_position = self.encode_cursor(last["published_at"], last["id"])
+            else:
+                self.next_position = self.encode_cursor(last.published_at, last.pk)
+        return items
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_position)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,63 @@
+# content/reading.py
+from __future__ import annotations
+
+import html
+import math
+import re
+
+from django.conf import settings
+
+from .models import Post
+from .utils import DEFAULT_LANG
+
+# Words per minute by language. Ethiopic (Tigrinya) is an abugida: every
+# character is a syllable, so fewer, longer words are read per minute.
+READING_WPM = {
+    "en": 230,
+    "sv": 220,
+    "ti-et": 170,
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_CODE_RE = re.compile(r"<pre\b.*?</pre>", re.S | re.I)
+# \w is Unicode-aware, so Ethiopic syllables (U+1200-U+139F) are word characters,
+# while the Ethiopic wordspace "፡" and full stop "።" (punctuation) separate words
+# even when no ASCII space is used.
+_WORD_RE = re.compile(r"\w+(?:['’\-]\w+)*")
+
+
+def html_text(body_html: str | None) -> str:
+    text = _CODE_RE.sub(" ", body_html or "")
+    return html.unescape(_TAG_RE.sub(" ", text))
+
+
+def count_words(body_html: str | None) -> int:
+    return sum(1 for _ in _WORD_RE.finditer(html_text(body_html)))
+
+
+def reading_time_min(word_count: int, lang: str = DEFAULT_LANG) -> int:
+    if word_count <= 0:
+        return 0
+    wpm = READING_WPM.get(lang, READING_WPM[DEFAULT_LANG])
+    return max(1, math.ceil(word_count / wpm))
+
+
+def refresh_reading_stats(translation) -> None:
+    """Set the body_word_count / body_reading_time_min of a post translation from its body_html."""
+    words = count_words(translation.body_html)
+    translation.body_word_count = words
+    translation.body_reading_time_min = reading_time_min(words, translation.language_code)
+
+
+def sync_post_reading_stats(post_id) -> None:
+    """Copy the default-language (else any) translation's stats onto the Post row."""
+    rows = {
+        code: (words, minutes)
+        for code, words, minutes in Post._parler_meta.root_model.objects.filter(
+            master_id=post_id
+        ).values_list("language_code", "body_word_count", "body_reading_time_min")
+    }
+    if not rows:
+        return
+    words, minutes = rows.get(settings.PARLER_DEFAULT_LANGUAGE) or next(iter(rows.values()))
+    Post.objects.filter(pk=post_id).update(word_count=words, reading_time_min=minutes)
@@ -0,0 +1,181 @@
+# content/revalidate.py
+"""
+Batched, non-blocking notifications to the frontends' revalidate endpoint.
+
+Signal receivers call notify(); the event is queued only once the current
+transaction commits. A daemon worker thread collapses duplicate
+(type, site, slug) events arriving within REVALIDATE_WINDOW seconds and
+POSTs them as one {"events": [...]} payload over a pooled session,
+retrying with exponential backoff.
+
+The outbox lives in process memory. An atexit hook flushes it for up to
+REVALIDATE_EXIT_TIMEOUT seconds on a normal interpreter exit, so queued
+events survive a worker restart; a crash or SIGKILL still loses them, and
+the frontends then catch up on their ISR timers.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+import requests
+from django.db import transaction
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+REVALIDATE_URL = os.environ.get("REVALIDATE_URL")
+REVALIDATE_SECRET = os.environ.get("REVALIDATE_SECRET")
+REVALIDATE_WINDOW = float(os.environ.get("REVALIDATE_WINDOW", "1.0"))
+REVALIDATE_EXIT_TIMEOUT = float(os.environ.get("REVALIDATE_EXIT_TIMEOUT", "10.0"))
+
+
+def _event_key(event: dict) -> tuple:
+    return (event.get("type"), event.get("site"), event.get("slug"))
+
+
+class RevalidationDispatcher:
+    def __init__(
+        self,
+        url: str,
+        secret: str,
+        window: float = 1.0,
+        batch_size: int = 50,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 4.0,
+    ):
+        self.url = url
+        self.secret = secret
+        self.window = window
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        # outbox: insertion-ordered, keyed so duplicates collapse
+        self._outbox: dict[tuple, dict] = {}
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._thread: threading.Thread | None = None
+
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+    # producer side
+    def enqueue(self, event: dict) -> None:
+        with self._cond:
+            self._outbox[_event_key(event)] = event
+            self._ensure_worker()
+            self._cond.notify()
+
+    def enqueue_many(self, events: list[dict]) -> None:
+        with self._cond:
+            for event in events:
+                self._outbox[_event_key(event)] = event
+            self._ensure_worker()
+            self._cond.notify()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until the outbox is drained and sent (tests / shutdown)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._outbox or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    # worker side
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="revalidate-dispatcher", daemon=True
+            )
+            self._thread.start()
+
+    def _take_batch(self) -> list[dict]:
+        with self._cond:
+            while not self._outbox:
+                self._cond.wait()
+        # let a burst of saves (bulk edit) settle so duplicates collapse
+        time.sleep(self.window)
+        with self._cond:
+            keys = list(self._outbox)[: self.batch_size]
+            batch = [self._outbox.pop(k) for k in keys]
+            self._in_flight += 1
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            try:
+                self._send(batch)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _send(self, batch: list[dict]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = self.session.post(
+                    self.url,
+                    params={"secret": self.secret},
+                    json={"events": batch},
+                    timeout=self.timeout,
+                )
+                if resp.status_code < 500:
+                    return True
+            except requests.RequestException:
+                pass
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        # keep failures quiet; site will still update on ISR timers
+        logger.warning("revalidate: giving up on %d event(s)", len(batch))
+        return False
+
+
+_dispatcher: RevalidationDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> RevalidationDispatcher | None:
+    global _dispatcher
+    if not (REVALIDATE_URL and REVALIDATE_SECRET):
+        return None
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = RevalidationDispatcher(
+                REVALIDATE_URL, REVALIDATE_SECRET, window=REVALIDATE_WINDOW
+            )
+            atexit.register(_flush_at_exit)
+        return _dispatcher
+
+
+def _flush_at_exit() -> None:
+    """Send what is still queued; the daemon worker dies with the interpreter."""
+    dispatcher = _dispatcher
+    if dispatcher is not None and not dispatcher.flush(timeout=REVALIDATE_EXIT_TIMEOUT):
+        logger.warning("revalidate: exiting with %d event(s) unsent", len(dispatcher._outbox))
+
+
+def notify(event: dict) -> None:
+    """Queue a revalidation event once the surrounding transaction commits."""
+    dispatcher = get_dispatcher()
+    if dispatcher is None:
+        return
+    transaction.on_commit(lambda: dispatcher.enqueue(event))
+
+
+def notify_many(events: list[dict]) -> None:
+    """Queue several events at once (one batch) once the transaction commits."""
+    dispatcher = get_dispatcher()
+    if dispatcher is None or not events:
+        return
+    transaction.on_commit(lambda: dispatcher.enqueue_many(events))
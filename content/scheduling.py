@@ -0,0 +1,124 @@
+# content/scheduling.py
+"""
+Scheduled publishing: PublishStatus.SCHED posts become PUBL once their
+published_at has passed (manage.py publish_scheduled).
+
+  - lookups:       due posts and the next due time are both range reads of
+                   post_status_published_idx (status, published_at)
+  - publishing:    one transaction, one UPDATE for every due post; update()
+                   sends no post_save, so the side effects of a save run
+                   here instead: archive cache, search index, and one
+                   batched revalidation for all affected slugs. The
+                   archive invalidation only reaches the web workers
+                   through a shared cache (API_ARCHIVE_CACHE_TIMEOUT bounds
+                   the staleness otherwise); the revalidation is sent from
+                   a background thread, so publish_scheduled flushes it
+                   before exiting
+  - the loop:      sleeps until the next due time (capped at max_sleep, so
+                   posts scheduled meanwhile by another process are picked
+                   up) instead of polling
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.cache import archive_cache
+from core.signals import invalidate_after_commit
+from .models import Post, PublishStatus
+from .revalidate import notify_many
+from .search import schedule_reindex
+
+logger = logging.getLogger(__name__)
+
+
+def scheduled():
+    return Post.objects.filter(status=PublishStatus.SCHED)
+
+
+def due_posts(now: datetime | None = None) -> list[dict]:
+    """[{id, site, slug, published_at}] of the scheduled posts due at `now`."""
+    now = now or timezone.now()
+    return list(
+        scheduled().filter(published_at__lte=now)
+        .order_by("published_at")
+        .values("id", "site", "slug", "published_at")
+    )
+
+
+def next_due(now: datetime | None = None) -> datetime | None:
+    now = now or timezone.now()
+    return (
+        scheduled().filter(published_at__gt=now)
+        .order_by("published_at")
+        .values_list("published_at", flat=True)
+        .first()
+    )
+
+
+def publish_due(now: datetime | None = None) -> list[dict]:
+    """Publish every due post in one transaction; returns the posts published."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        qs = scheduled().filter(published_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            # a second scheduler skips rows this one is flipping
+            qs = qs.select_for_update(skip_locked=True)
+        posts = list(qs.order_by("published_at").values("id", "site", "slug", "unlisted"))
+        if not posts:
+            return []
+        ids = [p["id"] for p in posts]
+        Post.objects.filter(pk__in=ids, status=PublishStatus.SCHED).update(
+            status=PublishStatus.PUBL, updated_at=now
+        )
+        invalidate_after_commit(archive_cache, [(p["site"],) for p in posts])
+        for pk in ids:
+            schedule_reindex(Post, pk)
+        notify_many([
+            {"type": "post", "site": p["site"], "slug": p["slug"]}
+            for p in posts if not p["unlisted"]
+        ])
+    logger.info("published %d scheduled post(s)", len(posts))
+    return posts
+
+
+class Scheduler:
+    """publish_due() whenever something is due; stop() ends run_forever()."""
+
+    def __init__(self, max_sleep: float = 300.0):
+        self.max_sleep = max_sleep
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def seconds_until_next(self, now: datetime | None = None) -> float:
+        now = now or timezone.now()
+        upcoming = next_due(now)
+        if upcoming is None:
+            return self.max_sleep
+        return min(self.max_sleep, max(0.0, (upcoming - now).total_seconds()))
+
+    def run_once(self) -> tuple[list[dict], float]:
+        """(posts published now, seconds to sleep before the next run)."""
+        now = timezone.now()
+        published = publish_due(now)
+        return published, self.seconds_until_next(now)
+
+    def run_forever(self, on_publish=None) -> None:
+        while not self._stopped:
+            published, delay = self.run_once()
+            if published and on_publish:
+                on_publish(published)
+            connection.close()  # no idle connection held across long sleeps
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
@@ -0,0 +1,530 @@
+# content/search.py
+"""
+Full-text search over Post/Page translations.
+
+Two interchangeable backends share one document shape (one document per
+translation: kind, object id, site, lang, slug, title, summary, body text):
+
+  - Fts5Backend:   an FTS5 virtual table in the SQLite database, ranked by
+                   bm25() with snippet() highlighting.
+  - PythonBackend: a pure-Python inverted index with BM25 ranking, a
+                   pickled snapshot plus an append-only journal at
+                   SEARCH_INDEX_PATH (used when FTS5 is missing, e.g. on
+                   PostgreSQL, or when SEARCH_BACKEND = "python").
+
+The index is kept current by content.signals (reindex_object / remove_object
+after commit); `manage.py rebuild_search_index` rebuilds it from scratch.
+"""
+from __future__ import annotations
+
+import heapq
+import html
+import logging
+import math
+import os
+import pickle
+import re
+import struct
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Page, Post, PublishStatus
+from .reading import html_text
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock file, so one process per index
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "content_search_fts"
+INDEX_VERSION = 2
+_TOKEN_RE = re.compile(r"\w+", re.U)
+MIN_PREFIX_LENGTH = 3
+# snippet() highlight markers, swapped for <mark> after the text is escaped
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+# bm25 column weights: title > summary > body
+TITLE_WEIGHT, SUMMARY_WEIGHT, BODY_WEIGHT = 10.0, 4.0, 1.0
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    slug: str
+    title: str
+    snippet: str
+    score: float
+
+    def as_dict(self) -> dict:
+        return {
+            "type": self.kind,
+            "slug": self.slug,
+            "title": self.title,
+            "snippet": self.snippet,
+            "score": round(self.score, 4),
+        }
+
+
+def _highlight(snippet: str) -> str:
+    return html.escape(snippet).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def tokenize(text: str) -> list[str]:
+    return [t.casefold() for t in _TOKEN_RE.findall(text or "")]
+
+
+def is_prefix_term(terms: list[str], i: int) -> bool:
+    # the last term is matched as a prefix (search-as-you-type), but only once
+    # it is long enough not to expand to most of the vocabulary
+    return i == len(terms) - 1 and len(terms[i]) >= MIN_PREFIX_LENGTH
+
+
+def _kind(model) -> str:
+    return "post" if issubclass(model, Post) else "page"
+
+
+def _documents(model, masters: list) -> list[dict]:
+    """Search documents for `masters`, one per translation (one query)."""
+    if not masters:
+        return []
+    fields = ["master_id", "language_code", "title", "body_html"]
+    if model is Post:
+        fields.append("summary")
+    by_pk = {m.pk: m for m in masters}
+    rows = model._parler_meta.root_model.objects.filter(master_id__in=by_pk).values(*fields)
+    kind = _kind(model)
+    docs = []
+    for row in rows:
+        obj = by_pk[row["master_id"]]
+        docs.append({
+            "kind": kind,
+            "object_id": str(obj.pk),
+            "site": obj.site,
+            "lang": row["language_code"],
+            "slug": obj.slug,
+            "title": row["title"] or "",
+            "summary": row.get("summary") or "",
+            "body": " ".join(html_text(row["body_html"] or "").split()),
+        })
+    return docs
+
+
+def is_searchable(obj) -> bool:
+    if isinstance(obj, Post):
+        return obj.status == PublishStatus.PUBL and not obj.unlisted
+    return True
+
+
+def documents_for(obj) -> list[dict]:
+    """One search document per translation of a public Post or any Page."""
+    if not is_searchable(obj):
+        return []
+    return _documents(type(obj), [obj])
+
+
+def iter_all_documents(chunk_size: int = 500):
+    querysets = (
+        Post.objects.filter(status=PublishStatus.PUBL, unlisted=False).only("id", "site", "slug"),
+        Page.objects.only("id", "site", "slug"),
+    )
+    for qs in querysets:
+        chunk = []
+        for obj in qs.order_by("pk").iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                yield from _documents(qs.model, chunk)
+                chunk = []
+        yield from _documents(qs.model, chunk)
+
+
+# ---------- SQLite FTS5 ----------
+
+class Fts5Backend:
+    """The FTS5 table is created by migration content 0007 (SQLite builds with FTS5 only)."""
+    name = "fts5"
+
+    @staticmethod
+    def available() -> bool:
+        if connection.vendor != "sqlite":
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            return cursor.fetchone() is not None
+
+    def remove(self, object_id: str) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE object_id = %s", [object_id])
+
+    def add(self, docs: list[dict]) -> None:
+        if not docs:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (kind, object_id, site, lang, slug, title, summary, body) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [
+                    (d["kind"], d["object_id"], d["site"], d["lang"], d["slug"],
+                     d["title"], d["summary"], d["body"])
+                    for d in docs
+                ],
+            )
+
+    def replace(self, object_id: str, docs: list[dict]) -> None:
+        with transaction.atomic():
+            self.remove(object_id)
+            self.add(docs)
+
+    def rebuild(self, docs, batch_size: int = 500) -> int:
+        total, batch = 0, []
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            for doc in docs:
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    self.add(batch)
+                    total, batch = total + len(batch), []
+            self.add(batch)
+            with connection.cursor() as cursor:
+                # merge the b-tree segments written by the batches
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        return total + len(batch)
+
+    @staticmethod
+    def _match_expr(terms: list[str]) -> str:
+        # every term must match
+        return " AND ".join(
+            '"%s"%s' % (t.replace('"', '""'), "*" if is_prefix_term(terms, i) else "")
+            for i, t in enumerate(terms)
+        )
+
+    def search(self, terms, site, lang, offset, limit) -> tuple[int, list[SearchHit]]:
+        where = f"{FTS_TABLE} MATCH %s AND site = %s AND lang = %s"
+        params = [self._match_expr(terms), site, lang]
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE {where}", params)
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT kind, slug, title, "
+                f"snippet({FTS_TABLE}, 7, char(2), char(3), '…', 16), "
+                f"bm25({FTS_TABLE}, 0, 0, 0, 0, 0, %s, %s, %s) AS rank "
+                f"FROM {FTS_TABLE} WHERE {where} ORDER BY rank LIMIT %s OFFSET %s",
+                [TITLE_WEIGHT, SUMMARY_WEIGHT, BODY_WEIGHT, *params, limit, offset],
+            )
+            hits = [
+                SearchHit(k, s, t, _highlight(snip), -rank)
+                for k, s, t, snip, rank in cursor.fetchall()
+            ]
+        return total, hits
+
+
+# ---------- pure-Python fallback ----------
+
+class PythonBackend:
+    """
+    Inverted index: term -> {doc id: weighted term frequency}, where the
+    frequency is already weighted per field (title > summary > body), plus a
+    doc store for filtering and snippets.
+
+    On disk: a pickled snapshot at SEARCH_INDEX_PATH and a journal next to it
+    (".log"). A change appends one record to the journal; every process
+    replays new records before reading, and reloads the snapshot when it was
+    replaced. Once the journal outgrows COMPACT_RATIO of the snapshot it is
+    folded into a new snapshot. Appends and compaction hold a lock file
+    exclusively, searches (which only replay) share it, so records apply in
+    the same order (and get the same doc ids) in every process.
+    """
+    name = "python"
+    K1, B = 1.2, 0.75
+    COMPACT_RATIO = 0.5
+    COMPACT_MIN_BYTES = 1 << 20
+    _HEADER = struct.Struct(">I")
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path or settings.SEARCH_INDEX_PATH)
+        self.journal = self.path.with_name(self.path.name + ".log")
+        self._lock = threading.RLock()
+        self._snapshot_id = None
+        self._offset = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.docs: dict[int, dict] = {}
+        self.objects: dict[str, dict[str, int]] = {}  # object id -> {lang: doc id}
+        self.postings: dict[str, dict[int, float]] = {}
+        self.next_id = 0
+        self.total_length = 0
+
+    # persistence
+    @contextmanager
+    def _locked(self, shared: bool = False):
+        # shared: searches in several workers only replay the journal, and run
+        # side by side; appends and compaction wait for them and exclude them
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_name(self.path.name + ".lock"), "a+b") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _state(self) -> dict:
+        return {
+            "version": INDEX_VERSION, "docs": self.docs, "objects": self.objects,
+            "postings": self.postings, "next_id": self.next_id, "total_length": self.total_length,
+        }
+
+    def _load(self) -> None:
+        """Catch up with the snapshot and journal on disk (under _locked())."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            stat = None
+        snapshot_id = (stat.st_ino, stat.st_mtime_ns) if stat else None
+        if snapshot_id != self._snapshot_id:
+            self._reset()
+            if stat is not None:
+                with self.path.open("rb") as f:
+                    state = pickle.load(f)
+                if isinstance(state, dict) and state.get("version") == INDEX_VERSION:
+                    self.docs, self.objects, self.postings = state["docs"], state["objects"], state["postings"]
+                    self.next_id, self.total_length = state["next_id"], state["total_length"]
+                else:
+                    logger.warning("search: %s has an old format; run rebuild_search_index", self.path)
+            self._snapshot_id, self._offset = snapshot_id, 0
+        try:
+            with self.journal.open("rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        pos = 0
+        while pos + self._HEADER.size <= len(data):
+            (size,) = self._HEADER.unpack_from(data, pos)
+            end = pos + self._HEADER.size + size
+            if end > len(data):
+                break  # a record still being written
+            self._apply(*pickle.loads(data[pos + self._HEADER.size:end]))
+            pos = end
+        self._offset += pos
+
+    def _append(self, op: str, *args) -> None:
+        """Journal one change and apply it (under _locked(), after _load())."""
+        payload = pickle.dumps((op, *args), protocol=pickle.HIGHEST_PROTOCOL)
+        with self.journal.open("ab") as f:
+            f.write(self._HEADER.pack(len(payload)) + payload)
+            self._offset = f.tell()
+        self._apply(op, *args)
+        snapshot_size = self.path.stat().st_size if self._snapshot_id else 0
+        if self._offset > max(self.COMPACT_MIN_BYTES, snapshot_size * self.COMPACT_RATIO):
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(self._state(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        # the journal is part of the snapshot now
+        self.journal.open("wb").close()
+        stat = self.path.stat()
+        self._snapshot_id, self._offset = (stat.st_ino, stat.st_mtime_ns), 0
+
+    # updates
+    @staticmethod
+    def _weighted_tf(doc: dict) -> Counter:
+        tf = Counter()
+        for field, weight in (("title", TITLE_WEIGHT), ("summary", SUMMARY_WEIGHT), ("body", BODY_WEIGHT)):
+            for term in tokenize(doc[field]):
+                tf[term] += weight
+        return tf
+
+    def _apply(self, op: str, *args) -> None:
+        if op == "remove":
+            self._remove_object(*args)
+        elif op == "replace":
+            object_id, docs = args
+            self._remove_object(object_id)
+            self._add_docs(docs)
+
+    def _remove_object(self, object_id: str) -> None:
+        for doc_id in self.objects.pop(object_id, {}).values():
+            self._remove_doc(doc_id)
+
+    def _remove_doc(self, doc_id: int) -> None:
+        doc = self.docs.pop(doc_id)
+        self.total_length -= doc["length"]
+        for term in self._weighted_tf(doc):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+
+    def _add_docs(self, docs) -> None:
+        for d in docs:
+            langs = self.objects.setdefault(d["object_id"], {})
+            if d["lang"] in langs:
+                self._remove_doc(langs[d["lang"]])
+            doc_id = self.next_id
+            self.next_id += 1
+            tf = self._weighted_tf(d)
+            for term, weight in tf.items():
+                self.postings.setdefault(term, {})[doc_id] = weight
+            length = sum(tf.values())
+            self.docs[doc_id] = {**d, "length": length}
+            langs[d["lang"]] = doc_id
+            self.total_length += length
+
+    def remove(self, object_id: str) -> None:
+        with self._locked():
+            self._load()
+            if object_id in self.objects:
+                self._append("remove", object_id)
+
+    def add(self, docs: list[dict]) -> None:
+        for object_id in dict.fromkeys(d["object_id"] for d in docs):
+            self.replace(object_id, [d for d in docs if d["object_id"] == object_id])
+
+    def replace(self, object_id: str, docs: list[dict]) -> None:
+        with self._locked():
+            self._load()
+            if docs or object_id in self.objects:
+                self._append("replace", object_id, docs)
+
+    def rebuild(self, docs, batch_size: int = 500) -> int:
+        with self._locked():
+            self._reset()
+            self._add_docs(docs)
+            self._compact()
+            return len(self.docs)
+
+    # queries
+    def _snippet(self, body: str, terms: list[str], width: int = 160) -> str:
+        lowered = body.casefold()
+        pos = min((p for p in (lowered.find(t) for t in terms) if p >= 0), default=0)
+        start = max(0, pos - width // 4)
+        out = html.escape(body[start:start + width])
+        for t in sorted(set(terms), key=len, reverse=True):
+            out = re.sub(r"(?i)(?<!\w)(%s\w*)" % re.escape(html.escape(t)), r"<mark>\1</mark>", out)
+        return ("…" if start else "") + out + ("…" if start + width < len(body) else "")
+
+    def _term_postings(self, term: str, prefix: bool) -> dict[int, float]:
+        if not prefix:
+            return self.postings.get(term, {})
+        merged: dict[int, float] = {}
+        for t, postings in self.postings.items():
+            if t.startswith(term):
+                for doc_id, weight in postings.items():
+                    merged[doc_id] = merged.get(doc_id, 0.0) + weight
+        return merged
+
+    def search(self, terms, site, lang, offset, limit) -> tuple[int, list[SearchHit]]:
+        with self._locked(shared=True):
+            self._load()
+            docs = self.docs
+            n_docs = max(1, len(docs))
+            avg_len = (self.total_length / n_docs) or 1.0
+            scores: dict[int, float] | None = None
+            # rarest term first, so the candidate set shrinks as fast as possible
+            by_term = [self._term_postings(t, is_prefix_term(terms, i)) for i, t in enumerate(terms)]
+            for postings in sorted(by_term, key=len):
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                candidates = postings if scores is None else (k for k in scores if k in postings)
+                term_scores = {}
+                for doc_id in candidates:
+                    doc = docs[doc_id]
+                    if doc["site"] != site or doc["lang"] != lang:
+                        continue
+                    tf = postings[doc_id]
+                    norm = self.K1 * (1 - self.B + self.B * doc["length"] / avg_len)
+                    term_scores[doc_id] = idf * tf * (self.K1 + 1) / (tf + norm)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {k: scores[k] + v for k, v in term_scores.items()}
+                if not scores:
+                    break
+            ranked = heapq.nlargest(offset + limit, (scores or {}).items(), key=lambda kv: kv[1])
+            hits = []
+            for doc_id, score in ranked[offset:]:
+                doc = docs[doc_id]
+                hits.append(SearchHit(doc["kind"], doc["slug"], doc["title"],
+                                      self._snippet(doc["body"], terms), score))
+            return len(scores or {}), hits
+
+
+# ---------- facade ----------
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            choice = getattr(settings, "SEARCH_BACKEND", "auto")
+            if choice == "fts5" or (choice == "auto" and Fts5Backend.available()):
+                _backend = Fts5Backend()
+            else:
+                _backend = PythonBackend()
+        return _backend
+
+
+def reindex_object(obj) -> None:
+    get_backend().replace(str(obj.pk), documents_for(obj))
+
+
+def remove_object(object_id) -> None:
+    get_backend().remove(str(object_id))
+
+
+_pending: set[tuple] = set()
+_pending_lock = threading.Lock()
+
+
+def _flush(model, pk) -> None:
+    with _pending_lock:
+        if (model, pk) not in _pending:
+            return  # already handled by an earlier callback of the same commit
+        _pending.discard((model, pk))
+    try:
+        obj = model.objects.filter(pk=pk).first()
+        if obj is None:
+            remove_object(pk)
+        else:
+            reindex_object(obj)
+    except Exception:  # the index must never break a save
+        logger.exception("search: could not reindex %s %s", model.__name__, pk)
+
+
+def schedule_reindex(model, pk) -> None:
+    """
+    Reindex (or drop) one Post/Page once the transaction commits. A master
+    save followed by its translation saves collapses into one reindex.
+    """
+    with _pending_lock:
+        _pending.add((model, pk))
+    transaction.on_commit(lambda: _flush(model, pk))
+
+
+def rebuild(chunk_size: int = 500) -> int:
+    return get_backend().rebuild(iter_all_documents(chunk_size), batch_size=chunk_size)
+
+
+def search(query: str, site: str, lang: str, offset: int = 0, limit: int = 12):
+    terms = tokenize(query)
+    if not terms:
+        return 0, []
+    return get_backend().search(terms, site, lang, offset, limit)
@@ -1,12 +1,13 @@
 # content/serializers.py
 from __future__ import annotations
 
+from django.db import models
 from rest_framework import serializers
-from parler.utils.context import switch_language
+from parler.appsettings import PARLER_LANGUAGES
 
 from .models import Post, Page
+from core.metrics import timed_method
 from core.models import MediaAsset, Author
-from .markdown import md_to_html
 from .utils import DEFAULT_LANG
 
 
@@ -19,8 +20,20 @@ def _media_url(asset: MediaAsset | None) -> str | None:
         return None
 
 
+def _media_srcset(asset: MediaAsset | None) -> list[dict]:
+    """[{url, width, height, format}, ...] of the asset's derivatives (core.images)."""
+    if not asset or not asset.derivatives:
+        return []
+    storage = asset.file.storage
+    return [
+        {"url": storage.url(d["path"]), "width": d["width"], "height": d["height"], "format": d["format"]}
+        for d in asset.derivatives
+    ]
+
+
 class MediaAssetMini(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = MediaAsset
@@ -28,6 +41,8 @@ class MediaAssetMini(serializers.ModelSerializer):
             "id",
             "kind",
             "url",
+            "srcset",
+            "lqip",
             "width",
             "height",
             "duration_ms",
@@ -39,17 +54,62 @@ class MediaAssetMini(serializers.ModelSerializer):
     def get_url(self, obj: MediaAsset) -> str | None:
         return _media_url(obj)
 
+    def get_srcset(self, obj: MediaAsset) -> list[dict]:
+        return _media_srcset(obj)
+
 
 class AuthorMini(serializers.ModelSerializer):
     avatar_url = serializers.SerializerMethodField()
+    avatar_srcset = serializers.SerializerMethodField()
+    avatar_lqip = serializers.SerializerMethodField()
 
     class Meta:
         model = Author
-        fields = ("id", "name", "slug", "url", "avatar_url")
+        fields = ("id", "name", "slug", "url", "avatar_url", "avatar_srcset", "avatar_lqip")
 
     def get_avatar_url(self, obj: Author) -> str | None:
         return _media_url(obj.avatar)
 
+    def get_avatar_srcset(self, obj: Author) -> list[dict]:
+        return _media_srcset(obj.avatar)
+
+    def get_avatar_lqip(self, obj: Author) -> str | None:
+        return (obj.avatar.lqip or None) if obj.avatar else None
+
+
+def attach_translations(objs, fields) -> None:
+    """
+    Load the given translated columns for all objs in one query and store
+    them on each object as obj._translation_rows = {language_code: row}.
+    Columns not listed (e.g. body_md) are never read from the database.
+    """
+    objs = [o for o in objs if getattr(o, "_translation_rows", None) is None]
+    if not objs:
+        return
+    tr_model = objs[0]._parler_meta.root_model
+    by_master = {o.pk: o for o in objs}
+    for o in objs:
+        o._translation_rows = {}
+    rows = tr_model.objects.filter(master_id__in=list(by_master)).values(
+        "master_id", "language_code", *fields
+    )
+    for row in rows:
+        by_master[row["master_id"]]._translation_rows[row["language_code"]] = row
+
+
+class TranslatedListSerializer(serializers.ListSerializer):
+    """
+    Batches the translation lookups of a whole page into a single query
+    (see attach_translations) before rendering the items.
+    """
+
+    @timed_method("serialize")
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        items = list(iterable)
+        attach_translations(items, self.child.translation_fields)
+        return [self.child.to_representation(item) for item in items]
+
 
 class BaseTranslatedSerializer(serializers.ModelSerializer):
     """
@@ -58,6 +118,9 @@ class BaseTranslatedSerializer(serializers.ModelSerializer):
     Also returns:
       - active_locale, available_locales
       - hero_image_data (mini)
+
+    Translations are read from obj._translation_rows (see attach_translations),
+    loaded once per page by TranslatedListSerializer, or once per object here.
     """
 
     # i18n/meta
@@ -74,45 +137,56 @@ class BaseTranslatedSerializer(serializers.ModelSerializer):
     # media
     hero_image_data = serializers.SerializerMethodField()
 
+    # translated columns loaded by attach_translations
+    translation_fields: tuple[str, ...] = ("title", "summary", "body_html", "seo_title", "seo_desc")
+
+    @timed_method("serialize")
+    def to_representation(self, instance):
+        attach_translations([instance], self.translation_fields)
+        return super().to_representation(instance)
+
     # helpers
     def _lang(self) -> str:
         return self.context.get("lang", DEFAULT_LANG)
 
-    def _with_lang(self, obj):
-        # parler context manager
-        return switch_language(obj, self._lang())
+    def _translation_row(self, obj) -> dict | None:
+        # active language first, then the parler fallbacks (same order parler uses)
+        rows = obj._translation_rows
+        lang = self._lang()
+        for code in [lang, *PARLER_LANGUAGES.get_fallback_languages(lang)]:
+            if code in rows:
+                return rows[code]
+        return None
+
+    def _translated(self, obj, field: str) -> str:
+        row = self._translation_row(obj)
+        return (row or {}).get(field) or ""
 
     # meta
     def get_active_locale(self, obj) -> str:
         return self._lang()
 
     def get_available_locales(self, obj) -> list[str]:
-        try:
-            return obj.get_available_languages()
-        except Exception:
-            return []
+        return sorted(obj._translation_rows)
 
     # flattened fields
     def get_title(self, obj) -> str:
-        with self._with_lang(obj):
-            return getattr(obj, "title", "") or getattr(obj, "slug", "")
+        return self._translated(obj, "title") or getattr(obj, "slug", "")
 
     def get_summary(self, obj) -> str:
         # For Page this returns "" because 'summary' doesn't exist there
-        with self._with_lang(obj):
-            return getattr(obj, "summary", "") or ""
+        return self._translated(obj, "summary")
 
     def get_body_html(self, obj) -> str:
-        with self._with_lang(obj):
-            return md_to_html(getattr(obj, "body_md", ""))
+        # pre-rendered on save (content.signals), backfilled by migration 0002;
+        # `manage.py render_markdown --force` re-renders after a renderer change
+        return self._translated(obj, "body_html")
 
     def get_seo_title(self, obj) -> str:
-        with self._with_lang(obj):
-            return getattr(obj, "seo_title", "") or self.get_title(obj)
+        return self._translated(obj, "seo_title") or self.get_title(obj)
 
     def get_seo_desc(self, obj) -> str:
-        with self._with_lang(obj):
-            return getattr(obj, "seo_desc", "") or ""
+        return self._translated(obj, "seo_desc")
 
     # media
     def get_hero_image_data(self, obj) -> dict | None:
@@ -124,6 +198,15 @@ class PublicPostSerializer(BaseTranslatedSerializer):
     author = AuthorMini(read_only=True)
     tags = serializers.SlugRelatedField(slug_field="slug", many=True, read_only=True)
     categories = serializers.SlugRelatedField(slug_field="slug", many=True, read_only=True)
+    # per active language (see content.reading); Post columns mirror the default language
+    reading_time_min = serializers.SerializerMethodField()
+    word_count = serializers.SerializerMethodField()
+
+    translation_fields = (
+        *BaseTranslatedSerializer.translation_fields,
+        "body_word_count",
+        "body_reading_time_min",
+    )
 
     class Meta:
         model = Post
@@ -153,9 +236,34 @@ class PublicPostSerializer(BaseTranslatedSerializer):
             # media
             "hero_image_data",
         )
+        list_serializer_class = TranslatedListSerializer
+
+    def get_reading_time_min(self, obj) -> int:
+        row = self._translation_row(obj)
+        return row["body_reading_time_min"] if row else obj.reading_time_min
+
+    def get_word_count(self, obj) -> int:
+        row = self._translation_row(obj)
+        return row["body_word_count"] if row else obj.word_count
+
+
+class PublicPostListSerializer(PublicPostSerializer):
+    """
+    Index representation: no body_html / meta, and body_md is never loaded.
+    """
+    translation_fields = (
+        "title", "summary", "seo_title", "seo_desc", "body_word_count", "body_reading_time_min",
+    )
+
+    class Meta(PublicPostSerializer.Meta):
+        fields = tuple(
+            f for f in PublicPostSerializer.Meta.fields if f not in ("body_html", "meta")
+        )
 
 
 class PublicPageSerializer(BaseTranslatedSerializer):
+    translation_fields = ("title", "body_html", "seo_title", "seo_desc")
+
     class Meta:
         model = Page
         fields = (
@@ -174,3 +282,13 @@ class PublicPageSerializer(BaseTranslatedSerializer):
             # media
             "hero_image_data",
         )
+        list_serializer_class = TranslatedListSerializer
+
+
+class PublicPageListSerializer(PublicPageSerializer):
+    translation_fields = ("title", "seo_title", "seo_desc")
+
+    class Meta(PublicPageSerializer.Meta):
+        fields = tuple(
+            f for f in PublicPageSerializer.Meta.fields if f not in ("body_html", "meta")
+        )
@@ -1,31 +1,109 @@
-import os, json, requests
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
+from parler.signals import pre_translation_save, post_translation_save, post_translation_delete
+from core.cache import archive_cache
+from core.signals import invalidate_after_commit
+from core.models import NavigationMenu, NavigationItem, Setting
+from .markdown import refresh_body_html
 from .models import Post, Page, PublishStatus
+from .reading import refresh_reading_stats, sync_post_reading_stats
+from .revalidate import notify
+from .search import schedule_reindex
+from taxonomy.models import Category, Tag
 
-REVALIDATE_URL = os.environ.get("REVALIDATE_URL")
-REVALIDATE_SECRET = os.environ.get("REVALIDATE_SECRET")
+@receiver(pre_translation_save, sender=Post)
+@receiver(pre_translation_save, sender=Page)
+def render_body_on_translation_save(sender, instance, **kwargs):
+    # translations are saved after the master row, so the HTML is rendered here
+    # rather than in post_save; unchanged markdown (same hash) is not re-rendered
+    rendered = refresh_body_html(instance)
+    instance._reading_stats_changed = False
+    if sender is Post and (rendered or not instance.body_word_count):
+        stats = (instance.body_word_count, instance.body_reading_time_min)
+        refresh_reading_stats(instance)
+        instance._reading_stats_changed = stats != (instance.body_word_count, instance.body_reading_time_min)
 
-def _notify(payload: dict):
-    if not (REVALIDATE_URL and REVALIDATE_SECRET):
+@receiver(post_translation_save, sender=Post)
+def sync_reading_stats_on_translation_save(sender, instance, **kwargs):
+    # only when the counts moved: most saves (title, SEO fields) cost no extra queries
+    if not getattr(instance, "_reading_stats_changed", False):
         return
-    try:
-        requests.post(
-            REVALIDATE_URL,
-            params={"secret": REVALIDATE_SECRET},
-            json=payload,
-            timeout=4.0,
+    if instance.language_code == settings.PARLER_DEFAULT_LANGUAGE:
+        Post.objects.filter(pk=instance.master_id).update(
+            word_count=instance.body_word_count, reading_time_min=instance.body_reading_time_min
         )
-    except Exception:
-        # keep failures silent; site will still update on ISR timers
-        pass
+    else:
+        sync_post_reading_stats(instance.master_id)
+
+@receiver(post_translation_save, sender=Post)
+@receiver(post_translation_save, sender=Page)
+@receiver(post_translation_delete, sender=Post)
+@receiver(post_translation_delete, sender=Page)
+def reindex_on_translation_change(sender, instance, **kwargs):
+    schedule_reindex(sender, instance.master_id)
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Page)
+def reindex_on_save(sender, instance, **kwargs):
+    # also drops posts that were unpublished or unlisted
+    schedule_reindex(sender, instance.pk)
+
+def touch_posts(posts) -> None:
+    # a post's ETag covers its own and its foreign keys' updated_at
+    # (content.conditional), not its tag/category slugs: bump the post instead
+    posts.update(updated_at=timezone.now())
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_posts_on_tag_change(sender, instance: Tag, **kwargs):
+    touch_posts(Post.objects.filter(tags=instance))
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_posts_on_category_change(sender, instance: Category, **kwargs):
+    touch_posts(Post.objects.filter(categories=instance))
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=Post.categories.through)
+def touch_posts_on_terms_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        touch_posts(Post.objects.filter(pk__in=pk_set) if reverse else Post.objects.filter(pk=instance.pk))
+    elif action == "pre_clear":
+        field = "tags" if sender is Post.tags.through else "categories"
+        touch_posts(Post.objects.filter(**{field: instance}) if reverse else Post.objects.filter(pk=instance.pk))
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_archive_on_post_change(sender, instance: Post, **kwargs):
+    invalidate_after_commit(archive_cache, [(instance.site,)])
 
 @receiver(post_save, sender=Post)
 def revalidate_on_post_save(sender, instance: Post, **kwargs):
     # only ping for published, public posts
     if instance.status == PublishStatus.PUBL and not instance.unlisted:
-        _notify({"type": "post", "site": instance.site, "slug": instance.slug})
+        notify({"type": "post", "site": instance.site, "slug": instance.slug})
 
 @receiver(post_save, sender=Page)
 def revalidate_on_page_save(sender, instance: Page, **kwargs):
-    _notify({"type": "page", "site": instance.site, "slug": instance.slug})
+    notify({"type": "page", "site": instance.site, "slug": instance.slug})
+
+@receiver(post_save, sender=NavigationMenu)
+@receiver(post_delete, sender=NavigationMenu)
+def revalidate_on_menu_change(sender, instance: NavigationMenu, **kwargs):
+    notify({"type": "nav", "site": instance.site, "slug": instance.slug})
+
+@receiver(post_save, sender=NavigationItem)
+@receiver(post_delete, sender=NavigationItem)
+def revalidate_on_menu_item_change(sender, instance: NavigationItem, **kwargs):
+    menu = NavigationMenu.objects.filter(pk=instance.menu_id).only("site", "slug").first()
+    if menu:
+        notify({"type": "nav", "site": menu.site, "slug": menu.slug})
+
+@receiver(post_save, sender=Setting)
+@receiver(post_delete, sender=Setting)
+def revalidate_on_setting_change(sender, instance: Setting, **kwargs):
+    notify({"type": "settings", "site": instance.site, "slug": instance.key})
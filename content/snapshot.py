@@ -0,0 +1,174 @@
+# content/snapshot.py
+"""
+Static JSON snapshot of the public API.
+
+Every site x language x endpoint is rendered through the real viewsets
+(same querysets, serializers and pagination as /api/v1/) and written to
+SNAPSHOT_ROOT as .json plus precompressed .json.gz / .json.br files:
+
+    <site>/navigation.json
+    <site>/settings.json
+    <site>/<lang>/posts/index/<n>.json     (list page n)
+    <site>/<lang>/posts/<slug>.json
+    <site>/<lang>/pages/index/<n>.json
+    <site>/<lang>/pages/<slug>.json
+
+Builds are incremental: _manifest.json remembers the source stamp
+(row count + max updated_at) of every file, and only files whose stamp
+changed are re-rendered; files whose source disappeared are removed.
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import math
+import os
+from pathlib import Path
+
+from django.conf import settings
+
+from core.models import NavigationItem, NavigationMenu, Setting
+from core.renderers import ORJSONRenderer
+from core.views import NavigationViewSet, SettingsViewSet
+from .conditional import queryset_state, row_stamp
+from .models import Page, Post, PublishStatus
+from .utils import SUPPORTED_LANGS, SUPPORTED_SITES, internal_request
+from .views import PublicPageViewSet, PublicPostViewSet
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz variants are written without it
+    brotli = None
+
+MANIFEST = "_manifest.json"
+
+
+def _stamp(state) -> str:
+    count, last = state
+    return f"{count}|{last.isoformat() if last else ''}"
+
+
+class SnapshotBuilder:
+    def __init__(self, root: Path | str | None = None, full: bool = False):
+        self.root = Path(root or settings.SNAPSHOT_ROOT)
+        self.full = full
+        self.renderer = ORJSONRenderer()
+        self.page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 12)
+        self.old_manifest = {} if full else self._read_manifest()
+        self.manifest: dict[str, str] = {}
+        self.written: list[str] = []
+        self.removed: list[str] = []
+
+    # manifest
+    def _read_manifest(self) -> dict:
+        try:
+            return json.loads((self.root / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _up_to_date(self, rel: str, stamp: str) -> bool:
+        self.manifest[rel] = stamp
+        return self.old_manifest.get(rel) == stamp and (self.root / rel).exists()
+
+    # output
+    def _write(self, rel: str, data) -> None:
+        body = self.renderer.render(data)
+        variants = {rel: body, rel + ".gz": gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            variants[rel + ".br"] = brotli.compress(body)
+        for name, payload in variants.items():
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        self.written.append(rel)
+
+    def _remove_stale(self, sites) -> None:
+        for rel in set(self.old_manifest) - set(self.manifest):
+            if rel.split("/", 1)[0] not in sites:
+                continue
+            for name in (rel, rel + ".gz", rel + ".br"):
+                try:
+                    (self.root / name).unlink()
+                except FileNotFoundError:
+                    pass
+            self.removed.append(rel)
+
+    # rendering through the public viewsets
+    def _get(self, viewset, actions: dict, url: str, **kwargs):
+        view = viewset.as_view(actions)
+        response = view(internal_request(url), **kwargs)
+        if response.status_code != 200:
+            return None
+        return response.data
+
+    def _paged(self, rel_dir: str, viewset, url: str, count: int, stamp: str) -> None:
+        pages = max(1, math.ceil(count / self.page_size))
+        for n in range(1, pages + 1):
+            # a directory, so no slug can collide with a list page
+            rel = f"{rel_dir}/index/{n}.json"
+            if self._up_to_date(rel, stamp):
+                continue
+            data = self._get(viewset, {"get": "list"}, f"{url}&page={n}")
+            if data is None:
+                continue
+            data = dict(data)
+            data["next"] = f"/{rel_dir}/index/{n + 1}.json" if n < pages else None
+            data["previous"] = f"/{rel_dir}/index/{n - 1}.json" if n > 1 else None
+            self._write(rel, data)
+
+    def _details(self, rel_dir: str, viewset, base: str, query: str, rows) -> None:
+        for slug, updated_at in rows:
+            rel = f"{rel_dir}/{slug}.json"
+            if self._up_to_date(rel, updated_at.isoformat()):
+                continue
+            data = self._get(viewset, {"get": "retrieve"}, f"{base}{slug}/{query}", slug=slug)
+            if data is not None:
+                self._write(rel, data)
+
+    def _single(self, rel: str, stamp: str, viewset, url: str) -> None:
+        if self._up_to_date(rel, stamp):
+            return
+        data = self._get(viewset, {"get": "list"}, url)
+        if data is not None:
+            self._write(rel, data)
+
+    def build_site(self, site: str) -> None:
+        menus = NavigationMenu.objects.filter(site=site)
+        n_menus, menus_last = queryset_state(menus)
+        n_items, items_last = queryset_state(NavigationItem.objects.filter(menu__in=menus))
+        nav_stamps = [t for t in (menus_last, items_last) if t]
+        nav_state = (n_menus + n_items, max(nav_stamps) if nav_stamps else None)
+        self._single(f"{site}/navigation.json", _stamp(nav_state),
+                     NavigationViewSet, f"/api/v1/navigation/?site={site}")
+        self._single(f"{site}/settings.json", _stamp(queryset_state(Setting.objects.filter(site=site))),
+                     SettingsViewSet, f"/api/v1/settings/?site={site}")
+
+        posts = Post.objects.filter(site=site, status=PublishStatus.PUBL, unlisted=False)
+        pages = Page.objects.filter(site=site)
+        post_related, page_related = PublicPostViewSet.conditional_related, PublicPageViewSet.conditional_related
+        post_state, page_state = queryset_state(posts, post_related), queryset_state(pages, page_related)
+        post_rows = list(posts.values_list("slug", row_stamp(post_related)))
+        page_rows = list(pages.values_list("slug", row_stamp(page_related)))
+
+        for lang in SUPPORTED_LANGS:
+            prefix = f"{site}/{lang}"
+            query = f"?site={site}&lang={lang}"
+            self._paged(f"{prefix}/posts", PublicPostViewSet, f"/api/v1/content/posts/{query}",
+                        post_state[0], _stamp(post_state))
+            self._details(f"{prefix}/posts", PublicPostViewSet, "/api/v1/content/posts/", query, post_rows)
+            self._paged(f"{prefix}/pages", PublicPageViewSet, f"/api/v1/content/pages/{query}",
+                        page_state[0], _stamp(page_state))
+            self._details(f"{prefix}/pages", PublicPageViewSet, "/api/v1/content/pages/", query, page_rows)
+
+    def build(self, sites=SUPPORTED_SITES) -> None:
+        for site in sites:
+            self.build_site(site)
+        self._remove_stale(sites)
+        # keep the entries of sites that were not part of this build
+        for rel, stamp in self.old_manifest.items():
+            if rel.split("/", 1)[0] not in sites:
+                self.manifest.setdefault(rel, stamp)
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / MANIFEST).write_text(json.dumps(self.manifest, indent=0, sort_keys=True))
@@ -0,0 +1,515 @@
+# content/transfer.py
+"""
+JSONL import / export of content (manage.py export_content / import_content).
+
+One JSON object per line, keyed by natural keys only (no database ids), so
+a dump moves between databases:
+
+    {"type": "author",   "slug", "name", "bio", "url", "site", "avatar"}
+    {"type": "media",    "file", "kind", "checksum", "width", "height", ...}
+    {"type": "tag",      "site", "slug", "name", "description"}
+    {"type": "category", "site", "slug", "name", "description", "parent"}
+    {"type": "page",     "site", "slug", "is_home", "hero_image", "meta",
+                         "translations": {lang: {title, body_md, ...}}}
+    {"type": "post",     "site", "slug", "status", "published_at", "unlisted",
+                         "author", "hero_image", "tags", "categories", "meta",
+                         "translations": {lang: {title, summary, body_md, ...}}}
+
+Media is referenced by stored file name; the files themselves are not
+copied. Export reads in primary-key chunks, import buffers one batch per
+record type, so memory stays flat whatever the archive size. Import
+upserts on the natural keys ((site, slug) for posts) and skips rows whose
+fields, translations and terms match the stored ones, so re-importing a
+dump changes nothing, updated_at (ETags, snapshots) included. body_html, body_hash and the reading stats are
+derived from body_md in a process pool.
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.cache import archive_cache
+from core.models import Author, MediaAsset
+from taxonomy.models import Category, Tag
+from .markdown import md_hash, md_to_html
+from .models import Page, Post, PublishStatus
+from .reading import count_words, reading_time_min
+
+MEDIA_FIELDS = (
+    "kind", "checksum", "width", "height", "duration_ms", "alt_text", "caption",
+    "meta", "derivatives", "lqip",
+)
+# translated fields carried in a dump (the rest is derived on import)
+TRANSLATED = {
+    Post: ("title", "summary", "body_md", "seo_title", "seo_desc"),
+    Page: ("title", "body_md", "seo_title", "seo_desc"),
+}
+
+
+def _chunks(qs, batch_size: int):
+    """values() rows of `qs` in primary-key order, batch_size at a time."""
+    last = None
+    while True:
+        page = qs.order_by("pk")
+        if last is not None:
+            page = page.filter(pk__gt=last)
+        rows = list(page[:batch_size])
+        if not rows:
+            return
+        last = rows[-1]["pk"]
+        yield rows
+
+
+# export
+
+def export_records(sites=None, batch_size: int = 500):
+    """Every record of the dump, dependencies (authors, media, taxonomy) first."""
+    def of_sites(qs):
+        return qs.filter(site__in=sites) if sites else qs
+
+    for rows in _chunks(MediaAsset.objects.values("pk", "file", *MEDIA_FIELDS), batch_size):
+        for row in rows:
+            yield {"type": "media", "file": row["file"], **{f: row[f] for f in MEDIA_FIELDS}}
+    for rows in _chunks(Author.objects.values("pk", "slug", "name", "bio", "url", "site", "avatar__file"), batch_size):
+        for row in rows:
+            yield {"type": "author", "slug": row["slug"], "name": row["name"], "bio": row["bio"],
+                   "url": row["url"], "site": row["site"], "avatar": row["avatar__file"]}
+    for rows in _chunks(of_sites(Tag.objects).values("pk", "site", "slug", "name", "description"), batch_size):
+        for row in rows:
+            yield {"type": "tag", **{k: v for k, v in row.items() if k != "pk"}}
+    # parents before children
+    categories = of_sites(Category.objects).order_by("depth", "path").values(
+        "site", "slug", "name", "description", "parent__slug"
+    )
+    for row in categories.iterator(chunk_size=batch_size):
+        parent = row.pop("parent__slug")
+        yield {"type": "category", **row, "parent": parent}
+    yield from _export_translatable(Page, of_sites(Page.objects), batch_size)
+    yield from _export_translatable(Post, of_sites(Post.objects), batch_size)
+
+
+def _export_translatable(model, qs, batch_size: int):
+    kind = model.__name__.lower()
+    columns = ("site", "slug", "meta", "hero_image__file") + (
+        ("status", "published_at", "unlisted", "author__slug") if model is Post else ("is_home",)
+    )
+    tr_model = model._parler_meta.root_model
+    for rows in _chunks(qs.values("pk", *columns), batch_size):
+        ids = [row["pk"] for row in rows]
+        translations = {pk: {} for pk in ids}
+        for tr in tr_model.objects.filter(master_id__in=ids).order_by("language_code").values(
+            "master_id", "language_code", *TRANSLATED[model]
+        ):
+            translations[tr.pop("master_id")][tr.pop("language_code")] = tr
+        related = {}
+        if model is Post:
+            for name, target in (("tags", "tag__slug"), ("categories", "category__slug")):
+                through = getattr(Post, name).through
+                slugs = {pk: [] for pk in ids}
+                for pk, slug in through.objects.filter(post_id__in=ids).order_by("pk").values_list("post_id", target):
+                    slugs[pk].append(slug)
+                related[name] = slugs
+        for row in rows:
+            pk = row.pop("pk")
+            record = {"type": kind, "site": row["site"], "slug": row["slug"]}
+            if model is Post:
+                record.update(
+                    status=row["status"],
+                    published_at=row["published_at"].isoformat(),
+                    unlisted=row["unlisted"],
+                    author=row["author__slug"],
+                    tags=related["tags"][pk],
+                    categories=related["categories"][pk],
+                )
+            else:
+                record["is_home"] = row["is_home"]
+            record.update(hero_image=row["hero_image__file"], meta=row["meta"], translations=translations[pk])
+            yield record
+
+
+# import
+
+def derive(job: tuple[str, str]) -> tuple[str, str, int, int]:
+    """(lang, body_md) -> (body_html, body_hash, word count, reading minutes); runs in the pool."""
+    lang, body_md = job
+    body_html = md_to_html(body_md)
+    words = count_words(body_html)
+    return body_html, md_hash(body_md), words, reading_time_min(words, lang)
+
+
+def _datetime(value: str | None) -> datetime:
+    if not value:
+        return timezone.now()
+    parsed = datetime.fromisoformat(value)
+    # naive times (hand-written archives) are in the site time zone
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _has_unique_key(model, fields) -> bool:
+    """Whether `fields` are a unique key an upsert can target on this database."""
+    if not connection.features.supports_update_conflicts_with_target:
+        return False
+    opts = model._meta
+    if len(fields) == 1 and opts.get_field(fields[0]).unique:
+        return True
+    return any(set(fields) == set(together) for together in opts.unique_together)
+
+
+class TransferError(ValueError):
+    """A record that cannot be imported."""
+
+
+class Importer:
+    def __init__(self, batch_size: int = 500, workers: int | None = None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.stats: Counter = Counter()
+        self.sites: set[str] = set()
+        self._pool: ProcessPoolExecutor | None = None
+        # natural key -> pk, filled as batches resolve them
+        self._authors: dict[str, uuid.UUID] = {}
+        self._media: dict[str, uuid.UUID] = {}
+        self._terms: dict[tuple, uuid.UUID] = {}
+
+    # driver
+    def run(self, lines) -> Counter:
+        handlers = {
+            "media": self._media_batch,
+            "author": self._author_batch,
+            "tag": self._tag_batch,
+            "category": self._category_batch,
+            "page": self._page_batch,
+            "post": self._post_batch,
+        }
+        kind, batch = None, []
+        try:
+            for lineno, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    raise TransferError(f"line {lineno}: invalid JSON ({exc})")
+                if record.get("type") not in handlers:
+                    raise TransferError(f"line {lineno}: unknown record type {record.get('type')!r}")
+                if record["type"] != kind or len(batch) >= self.batch_size:
+                    if batch:
+                        handlers[kind](batch)
+                    kind, batch = record["type"], []
+                batch.append(record)
+            if batch:
+                handlers[kind](batch)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+        for site in self.sites:
+            archive_cache.invalidate(site)
+        return self.stats
+
+    def _derive(self, jobs: list[tuple[str, str]]) -> list[tuple]:
+        if not self.workers or len(jobs) < 2:
+            return [derive(job) for job in jobs]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return list(self._pool.map(derive, jobs, chunksize=max(1, len(jobs) // (self.workers * 4))))
+
+    @staticmethod
+    def _dedupe(records, key) -> list[dict]:
+        # the last record of a key wins, as it would across separate imports
+        return list({key(r): r for r in records}.values())
+
+    def _upsert(self, model, records, key_fields, build, update_fields, touched=frozenset()):
+        """
+        Create or update rows by natural key; returns ({key: pk}, keys written)
+        for the batch. An existing row is only written, and its updated_at
+        moved, when one of update_fields differs or its key is in `touched`
+        (rows whose translations or terms changed).
+        """
+        attnames = [model._meta.get_field(f).attname for f in update_fields]
+        keys = [tuple(r[f] for f in key_fields) for r in records]
+        lookup = {f"{f}__in": {k[i] for k in keys} for i, f in enumerate(key_fields)}
+        existing, stored = {}, {}
+        width = len(key_fields)
+        for row in model.objects.filter(**lookup).values_list(*key_fields, "pk", *attnames):
+            existing[row[:width]] = row[width]
+            stored[row[:width]] = row[width + 1:]
+        writes, ids = [], {}
+        for key, record in zip(keys, records):
+            obj = build(record)
+            if key in existing:
+                ids[key] = existing[key]
+                if key not in touched and tuple(getattr(obj, a) for a in attnames) == stored[key]:
+                    continue
+            obj.pk = uuid.uuid4()
+            ids.setdefault(key, obj.pk)
+            writes.append((key, obj))
+        fields = [*update_fields, "updated_at"]
+        if _has_unique_key(model, key_fields):
+            # INSERT ... ON CONFLICT (key) DO UPDATE: an existing row keeps its pk
+            model.objects.bulk_create(
+                [obj for _, obj in writes], batch_size=self.batch_size,
+                update_conflicts=True, unique_fields=key_fields, update_fields=fields,
+            )
+        else:
+            now = timezone.now()
+            changed = []
+            for key, obj in writes:
+                if key in existing:
+                    obj.pk, obj.updated_at = existing[key], now
+                    changed.append(obj)
+            model.objects.bulk_create([o for k, o in writes if k not in existing], batch_size=self.batch_size)
+            model.objects.bulk_update(changed, fields, batch_size=self.batch_size)
+        written = {key for key, _ in writes}
+        updated = len(written & existing.keys())
+        name = model.__name__.lower()
+        self.stats[f"{name} created"] += len(written) - updated
+        self.stats[f"{name} updated"] += updated
+        self.stats[f"{name} unchanged"] += len(existing) - updated
+        return ids, written
+
+    # references
+    def _author_id(self, slug: str) -> uuid.UUID:
+        if slug not in self._authors:
+            author, _ = Author.objects.get_or_create(slug=slug, defaults={"name": slug})
+            self._authors[slug] = author.pk
+        return self._authors[slug]
+
+    def _media_id(self, name: str | None) -> uuid.UUID | None:
+        if not name:
+            return None
+        if name not in self._media:
+            self._media[name] = MediaAsset.objects.filter(file=name).values_list("pk", flat=True).first()
+            if self._media[name] is None:
+                self.stats["missing media"] += 1
+        return self._media[name]
+
+    def _term_ids(self, model, site: str, slugs: list[str]) -> list[uuid.UUID]:
+        missing = [s for s in slugs if (model, site, s) not in self._terms]
+        if missing:
+            found = dict(model.objects.filter(site=site, slug__in=missing).values_list("slug", "pk"))
+            for slug in missing:
+                if slug not in found:
+                    # unknown term: created with its slug as name (Category.save sets its path)
+                    found[slug] = model.objects.create(site=site, slug=slug, name=slug).pk
+                self._terms[(model, site, slug)] = found[slug]
+        return [self._terms[(model, site, s)] for s in slugs]
+
+    # record types
+    def _media_batch(self, records):
+        records = self._dedupe(records, lambda r: r["file"])
+        ids, _ = self._upsert(
+            MediaAsset, records, ("file",),
+            lambda r: MediaAsset(file=r["file"], **{f: r[f] for f in MEDIA_FIELDS if f in r}),
+            MEDIA_FIELDS,
+        )
+        self._media.update({key[0]: pk for key, pk in ids.items()})
+
+    def _author_batch(self, records):
+        records = self._dedupe(records, lambda r: r["slug"])
+        ids, _ = self._upsert(
+            Author, records, ("slug",),
+            lambda r: Author(
+                slug=r["slug"], name=r.get("name") or r["slug"], bio=r.get("bio") or "",
+                url=r.get("url") or "", site=r.get("site"), avatar_id=self._media_id(r.get("avatar")),
+            ),
+            ("name", "bio", "url", "site", "avatar"),
+        )
+        self._authors.update({key[0]: pk for key, pk in ids.items()})
+
+    def _tag_batch(self, records):
+        records = self._dedupe(records, lambda r: (r["site"], r["slug"]))
+        ids, _ = self._upsert(
+            Tag, records, ("site", "slug"),
+            lambda r: Tag(site=r["site"], slug=r["slug"], name=r.get("name") or r["slug"],
+                          description=r.get("description") or ""),
+            ("name", "description"),
+        )
+        self._terms.update({(Tag, *key): pk for key, pk in ids.items()})
+
+    def _category_batch(self, records):
+        # few rows, and save() maintains the materialized path, so one by one
+        with transaction.atomic():
+            for r in self._dedupe(records, lambda r: (r["site"], r["slug"])):
+                parent_id = self._term_ids(Category, r["site"], [r["parent"]])[0] if r.get("parent") else None
+                category, created = Category.objects.get_or_create(
+                    site=r["site"], slug=r["slug"], defaults={"name": r.get("name") or r["slug"]}
+                )
+                values = {"name": r.get("name") or r["slug"], "description": r.get("description") or "",
+                          "parent_id": parent_id}
+                self._terms[(Category, r["site"], r["slug"])] = category.pk
+                if not created and all(getattr(category, f) == v for f, v in values.items()):
+                    self.stats["category unchanged"] += 1
+                    continue
+                for field, value in values.items():
+                    setattr(category, field, value)
+                category.save()
+                self.stats[f"category {'created' if created else 'updated'}"] += 1
+
+    def _page_batch(self, records):
+        self._translatable_batch(
+            Page, records,
+            lambda r: Page(site=r["site"], slug=r["slug"], is_home=bool(r.get("is_home")),
+                           hero_image_id=self._media_id(r.get("hero_image")), meta=r.get("meta") or {}),
+            ("is_home", "hero_image", "meta"),
+        )
+
+    def _post_batch(self, records):
+        def build(r):
+            if not r.get("author"):
+                raise TransferError(f"post {r['site']}/{r['slug']}: missing author")
+            return Post(
+                site=r["site"], slug=r["slug"],
+                status=r.get("status") or PublishStatus.DRAFT,
+                published_at=_datetime(r.get("published_at")),
+                unlisted=bool(r.get("unlisted")),
+                author_id=self._author_id(r["author"]),
+                hero_image_id=self._media_id(r.get("hero_image")),
+                meta=r.get("meta") or {},
+            )
+
+        self._translatable_batch(
+            Post, records, build,
+            ("status", "published_at", "unlisted", "author", "hero_image", "meta", "word_count", "reading_time_min"),
+        )
+
+    def _derived_fields(self, model, records) -> dict[tuple, tuple]:
+        """
+        {(site, slug, lang): derive() result} for the batch. Markdown whose hash
+        matches the stored body_hash is not rendered again (re-imports).
+        """
+        tr_model = model._parler_meta.root_model
+        stored = {}
+        columns = ["body_html"] + (["body_word_count", "body_reading_time_min"] if model is Post else [])
+        for site, slug, lang, body_hash, *values in tr_model.objects.filter(
+            master__site__in={r["site"] for r in records}, master__slug__in={r["slug"] for r in records}
+        ).values_list("master__site", "master__slug", "language_code", "body_hash", *columns):
+            stored[(site, slug, lang, body_hash)] = values
+        result, jobs = {}, {}
+        for r in records:
+            for lang, tr in r["translations"].items():
+                body_md = tr.get("body_md") or ""
+                body_hash = md_hash(body_md)
+                values = stored.get((r["site"], r["slug"], lang, body_hash))
+                if values is None:
+                    jobs[(r["site"], r["slug"], lang)] = (lang, body_md)
+                else:
+                    body_html, words, minutes = (*values, 0, 0)[:3]
+                    result[(r["site"], r["slug"], lang)] = (body_html, body_hash, words, minutes)
+        result.update(zip(jobs, self._derive(list(jobs.values()))))
+        self.stats["markdown rendered"] += len(jobs)
+        return result
+
+    def _translatable_batch(self, model, records, build, update_fields):
+        records = self._dedupe(records, lambda r: (r["site"], r["slug"]))
+        tr_model = model._parler_meta.root_model
+        default_lang = settings.PARLER_DEFAULT_LANGUAGE
+        derived = self._derived_fields(model, records)
+        columns = [*TRANSLATED[model], "body_html", "body_hash"] + (
+            ["body_word_count", "body_reading_time_min"] if model is Post else []
+        )
+
+        with transaction.atomic():
+            # masters first (their reading stats come from the derived fields)
+            reading = {}
+            translations = {}  # (site, slug) -> {lang: values of `columns`}
+            for r in records:
+                key = (r["site"], r["slug"])
+                translations[key] = {}
+                for lang, tr in r["translations"].items():
+                    body_html, body_hash, words, minutes = derived[(*key, lang)]
+                    values = (*(tr.get(f) or "" for f in TRANSLATED[model]), body_html, body_hash)
+                    translations[key][lang] = values + ((words, minutes) if model is Post else ())
+                    if model is Post and (lang == default_lang or key not in reading):
+                        reading[key] = (words, minutes)
+            terms = self._post_terms(records) if model is Post else {}
+
+            def build_master(r):
+                obj = build(r)
+                if model is Post:
+                    obj.word_count, obj.reading_time_min = reading.get((r["site"], r["slug"]), (0, 0))
+                return obj
+
+            touched = self._touched(model, records, columns, translations, terms)
+            ids, written = self._upsert(model, records, ("site", "slug"), build_master, update_fields, touched)
+            # unchanged masters keep their translations and terms as they are
+            records = [r for r in records if (r["site"], r["slug"]) in written]
+            if not records:
+                return
+            self.sites.update(r["site"] for r in records)
+            masters = [ids[(r["site"], r["slug"])] for r in records]
+
+            # translations: upsert per (master, language), drop languages no longer in the record
+            rows, keep = [], set()
+            for r in records:
+                master_id = ids[(r["site"], r["slug"])]
+                for lang, values in translations[(r["site"], r["slug"])].items():
+                    rows.append(tr_model(master_id=master_id, language_code=lang, **dict(zip(columns, values))))
+                    keep.add((master_id, lang))
+            stale = [
+                pk for master_id, lang, pk in tr_model.objects.filter(master_id__in=masters)
+                .values_list("master_id", "language_code", "pk")
+                if (master_id, lang) not in keep
+            ]
+            if stale:
+                tr_model.objects.filter(pk__in=stale).delete()
+            if _has_unique_key(tr_model, ("language_code", "master")):
+                tr_model.objects.bulk_create(
+                    rows, batch_size=self.batch_size, update_conflicts=True,
+                    unique_fields=("language_code", "master"), update_fields=columns,
+                )
+            else:
+                # no upsert support: the translations of these masters are replaced
+                tr_model.objects.filter(master_id__in=masters).delete()
+                tr_model.objects.bulk_create(rows, batch_size=self.batch_size)
+            self.stats[f"{model.__name__.lower()} translations"] += len(rows)
+
+            if model is Post:
+                self._replace_m2m(records, ids, terms)
+
+    def _post_terms(self, records) -> dict[tuple, dict[str, list[uuid.UUID]]]:
+        """{(site, slug): {"tags": [pk, ...], "categories": [pk, ...]}} of the records; creates unknown terms."""
+        return {
+            (r["site"], r["slug"]): {
+                name: list(dict.fromkeys(self._term_ids(model, r["site"], r.get(name) or [])))
+                for name, model in (("tags", Tag), ("categories", Category))
+            }
+            for r in records
+        }
+
+    def _touched(self, model, records, columns, translations, terms) -> set[tuple]:
+        """Keys of the stored masters whose translations or terms differ from the records'."""
+        keys = {(r["site"], r["slug"]) for r in records}
+        masters = model.objects.filter(site__in={k[0] for k in keys}, slug__in={k[1] for k in keys})
+        stored = {}
+        for site, slug, lang, *values in model._parler_meta.root_model.objects.filter(master__in=masters).values_list(
+            "master__site", "master__slug", "language_code", *columns
+        ):
+            stored.setdefault((site, slug), {})[lang] = tuple(values)
+        touched = {key for key in keys if stored.get(key, {}) != translations[key]}
+        for name, column in (("tags", "tag_id"), ("categories", "category_id")) if model is Post else ():
+            current = {}
+            for site, slug, term_id in getattr(Post, name).through.objects.filter(post__in=masters).values_list(
+                "post__site", "post__slug", column
+            ):
+                current.setdefault((site, slug), set()).add(term_id)
+            touched |= {key for key in keys if current.get(key, set()) != set(terms[key][name])}
+        return touched
+
+    def _replace_m2m(self, records, ids, terms):
+        for name, column in (("tags", "tag_id"), ("categories", "category_id")):
+            through = getattr(Post, name).through
+            through.objects.filter(post_id__in=[ids[(r["site"], r["slug"])] for r in records]).delete()
+            rows = [
+                through(post_id=ids[(r["site"], r["slug"])], **{column: term_id})
+                for r in records
+                for term_id in terms[(r["site"], r["slug"])][name]
+            ]
+            through.objects.bulk_create(rows, batch_size=self.batch_size)
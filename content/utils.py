@@ -1,8 +1,12 @@
 # content/utils.py
 from __future__ import annotations
 
+from io import BytesIO
 from typing import Optional
 
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+
 # Supported languages (align with settings.LANGUAGES/PARLER_LANGUAGES)
 SUPPORTED_LANGS = ("en", "sv", "ti-et")
 DEFAULT_LANG = "en"
@@ -59,4 +63,37 @@ def request_site(request) -> str | None:
     s = (request.query_params.get("site") or "").strip().lower()
     if not s:
         return DEFAULT_SITE 
-    return s if s in SUPPORTED_SITES else None
\ No newline at end of file
+    return s if s in SUPPORTED_SITES else None
+
+def internal_host() -> str:
+    """A host the site accepts, for requests rendered in-process."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"  # allowed by an empty ALLOWED_HOSTS under DEBUG, and by "*"
+
+
+def internal_request(url: str) -> WSGIRequest:
+    """
+    A GET for `url` as a WSGI server would build it, for rendering the API
+    in-process (snapshots, explain_queries); absolute links use internal_host().
+    """
+    path, _, query = url.partition("?")
+    host = internal_host()
+    return WSGIRequest({
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": host,
+        "SERVER_PORT": "80",
+        "HTTP_HOST": host,
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": BytesIO(),
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": True,
+    })
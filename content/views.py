@@ -1,13 +1,32 @@
 # content/views.py
 from __future__ import annotations
 
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
 from rest_framework import viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from core.cache import archive_cache
+from core.db import ReplicaReadMixin
+from .conditional import ConditionalGetMixin, queryset_state
+from .fast import FastSerializerMixin
+from .filters import PostFilterBackend
 from .models import Post, Page, PublishStatus
-from .serializers import PublicPostSerializer, PublicPageSerializer
-from .utils import request_lang, request_site
+from .pagination import PostKeysetPagination
+from . import search
+from .serializers import (
+    PublicPostSerializer,
+    PublicPostListSerializer,
+    PublicPageSerializer,
+    PublicPageListSerializer,
+)
+from .utils import DEFAULT_LANG, request_lang, request_site
 
 
 LANG_PARAM = OpenApiParameter(
@@ -26,20 +45,45 @@ SITE_PARAM = OpenApiParameter(
     type=str,
 )
 
+CURSOR_PARAM = OpenApiParameter(
+    name="cursor",
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description="Opt into keyset pagination: empty for the first page, then the cursor from `next`.",
+    type=str,
+)
 
-@extend_schema(parameters=[LANG_PARAM, SITE_PARAM])
+QUERY_PARAM = OpenApiParameter(
+    name="q",
+    location=OpenApiParameter.QUERY,
+    required=True,
+    description="Search terms; every term must match, the last one as a prefix.",
+    type=str,
+)
+
+
+@extend_schema(parameters=[LANG_PARAM, SITE_PARAM, CURSOR_PARAM])
 class PublicPostViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FastSerializerMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
     """
-    GET /api/v1/content/posts/?site=amare&lang=sv     (paginated list)
+    GET /api/v1/content/posts/?site=amare&lang=sv     (paginated list, no body_html/meta)
+    GET /api/v1/content/posts/?site=amare&cursor=     (keyset pages, follow `next`)
+    GET /api/v1/content/posts/?site=amare&tag=a,b&match=all&category=x&author=y&year=2025&month=3
     GET /api/v1/content/posts/<slug>/?site=amare&lang=sv
+    GET /api/v1/content/posts/archive/?site=amare     (post counts per month)
     """
     serializer_class = PublicPostSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
+    filter_backends = [PostFilterBackend]
+    # foreign keys the payload embeds; their updated_at is part of the ETag
+    conditional_related = ("author", "author__avatar", "hero_image")
 
     def get_queryset(self):
         qs = (
@@ -48,9 +92,55 @@ class PublicPostViewSet(
             .prefetch_related("tags", "categories")
             .order_by("-published_at")
         )
+        if self.action == "list":
+            qs = qs.defer("meta")
         site = request_site(self.request)
         return qs.filter(site=site) if site else qs
 
+    @property
+    def paginator(self):
+        # page-number pagination stays the default; ?cursor= opts into keyset mode
+        if not hasattr(self, "_paginator"):
+            if "cursor" in self.request.query_params:
+                self._paginator = PostKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def conditional_queryset(self):
+        qs = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            qs = qs.filter(slug=self.kwargs[self.lookup_field])
+        return qs
+
+    def get_conditional_state(self):
+        return queryset_state(self.conditional_queryset(), self.conditional_related)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return PublicPostListSerializer
+        return PublicPostSerializer
+
+    @extend_schema(parameters=[SITE_PARAM])
+    @action(detail=False, pagination_class=None)
+    def archive(self, request, *args, **kwargs):
+        site = request_site(request)
+        if not site:
+            return Response({"detail": "Missing or invalid ?site parameter."}, status=400)
+        # kept until a post of the site is saved or deleted (content.signals)
+        months = archive_cache.get(site, None, DEFAULT_LANG)
+        if months is None:
+            rows = (
+                Post.objects.filter(site=site, status=PublishStatus.PUBL, unlisted=False)
+                .annotate(month=TruncMonth("published_at"))
+                .values("month")
+                .annotate(count=Count("pk"))
+                .order_by("-month")
+            )
+            months = [{"year": r["month"].year, "month": r["month"].month, "count": r["count"]} for r in rows]
+            archive_cache.set(site, None, DEFAULT_LANG, months)
+        return Response({"site": site, "months": months})
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["lang"] = request_lang(self.request)
@@ -59,24 +149,80 @@ class PublicPostViewSet(
 
 @extend_schema(parameters=[LANG_PARAM, SITE_PARAM])
 class PublicPageViewSet(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FastSerializerMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     viewsets.GenericViewSet,
 ):
     """
-    GET /api/v1/content/pages/?site=amare&lang=sv      (paginated list)
+    GET /api/v1/content/pages/?site=amare&lang=sv      (paginated list, no body_html/meta)
     GET /api/v1/content/pages/<slug>/?site=amare&lang=sv
     """
     serializer_class = PublicPageSerializer
     permission_classes = [AllowAny]
     lookup_field = "slug"
+    conditional_related = ("hero_image",)
 
     def get_queryset(self):
         qs = Page.objects.select_related("hero_image").order_by("slug")
+        if self.action == "list":
+            qs = qs.defer("meta")
         site = request_site(self.request)
         return qs.filter(site=site) if site else qs
 
+    def conditional_queryset(self):
+        qs = self.filter_queryset(self.get_queryset())
+        if self.action == "retrieve":
+            qs = qs.filter(slug=self.kwargs[self.lookup_field])
+        return qs
+
+    def get_conditional_state(self):
+        return queryset_state(self.conditional_queryset(), self.conditional_related)
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return PublicPageListSerializer
+        return PublicPageSerializer
+
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["lang"] = request_lang(self.request)
         return ctx
+
+
+@extend_schema(parameters=[QUERY_PARAM, LANG_PARAM, SITE_PARAM])
+class SearchViewSet(viewsets.ViewSet):
+    """
+    GET /api/v1/content/search/?q=climate&site=amare&lang=sv
+    Ranked hits over public posts and pages (title > summary > body), with
+    <mark>-highlighted snippets. Served from the index in content.search.
+    """
+    permission_classes = [AllowAny]
+
+    def list(self, request, *args, **kwargs):
+        site = request_site(request)
+        if not site:
+            return Response({"detail": "Missing or invalid ?site parameter."}, status=400)
+        query = request.query_params.get("q", "").strip()
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 12)
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+        except ValueError:
+            raise NotFound("Invalid page.")
+        count, hits = search.search(query, site, request_lang(request),
+                                    offset=(page - 1) * page_size, limit=page_size)
+        if page > 1 and not hits:
+            raise NotFound("Invalid page.")
+        url = request.build_absolute_uri()
+        return Response({
+            "count": count,
+            "next": replace_query_param(url, "page", page + 1) if page * page_size < count else None,
+            "previous": (
+                None if page == 1
+                else remove_query_param(url, "page") if page == 2
+                else replace_query_param(url, "page", page - 1)
+            ),
+            "results": [hit.as_dict() for hit in hits],
+        })
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Setting, MediaAsset, Author, NavigationMenu, NavigationItem
+from .models import Setting, MediaAsset, Author, NavigationMenu, NavigationItem, Redirect
 
 @admin.register(Setting)
 class SettingAdmin(admin.ModelAdmin):
@@ -9,12 +9,20 @@ class SettingAdmin(admin.ModelAdmin):
     ordering = ("site", "key")
 
 
+@admin.register(Redirect)
+class RedirectAdmin(admin.ModelAdmin):
+    list_display = ("site", "source_path", "target_url", "http_status", "is_active")
+    list_filter = ("site", "http_status", "is_active")
+    search_fields = ("source_path", "target_url")
+    ordering = ("site", "source_path")
+
+
 @admin.register(MediaAsset)
 class MediaAssetAdmin(admin.ModelAdmin):
     list_display = ("id", "kind", "file", "width", "height", "duration_ms", "alt_text")
     list_filter = ("kind",)
     search_fields = ("file", "alt_text", "caption", "checksum")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("created_at", "updated_at", "checksum", "derivatives")
     ordering = ("-created_at",)
 
 
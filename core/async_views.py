@@ -0,0 +1,301 @@
+# core/async_views.py
+"""
+Async read path for the public API (ASGI).
+
+Same bytes as the DRF views (checked by AsyncReadPathTests), built on the
+async ORM so a request waiting on the database holds no worker thread:
+
+  - AsyncAPIView:   GET-only base; renders with ORJSONRenderer and hands
+                    whatever it doesn't implement (the browsable API,
+                    ?format=, ...) to the DRF viewset in a thread
+  - concurrency:    independent lookups of one response (row count and
+                    page, translations and tag/category slugs, navigation
+                    and settings of a site) are awaited together with
+                    asyncio.gather
+  - caches:         navigation/settings share their SiteResponseCache
+                    entries and validators with the DRF views
+
+Django runs each async ORM call through sync_to_async on the request's own
+thread, so the queries of one request still run one after another on its
+connection; the gain is requests in flight per process, not latency per
+request. Cache calls stay synchronous: Django's async cache API is
+sync_to_async on every built-in backend.
+
+adapticus.urls_async puts these views in front of the DRF routes; asgi.py
+turns it on (API_ASYNC_VIEWS).
+"""
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from content.conditional import (
+    aqueryset_state,
+    combine_validators,
+    merge_states,
+    set_validators,
+    state_validators,
+)
+from content.fast import alist, compiled
+from content.serializers import PublicPageSerializer, PublicPostListSerializer
+from content.utils import request_lang, request_site
+from content.views import PublicPageViewSet, PublicPostViewSet
+from .cache import SiteResponseCache, navigation_cache, settings_cache
+from .db import replica_reads
+from .models import Setting
+from .renderers import ORJSONRenderer
+from .serializers import NavigationMenuSerializer, SiteSettingsSerializer
+from .views import NavigationViewSet, SettingsViewSet
+
+_renderer = ORJSONRenderer()
+
+
+@lru_cache(maxsize=None)
+def _drf_view(viewset, action):
+    return viewset.as_view({"get": action})
+
+
+class AsyncAPIView(View):
+    """
+    Subclasses implement read(); returning None hands the request to
+    `viewset` (as `action`), as does any of `delegated_params`.
+    """
+    http_method_names = ["get", "head", "options"]
+    viewset = None
+    action = "list"
+    delegated_params: tuple[str, ...] = ("format",)
+
+    async def get(self, request, *args, **kwargs):
+        api_request = Request(request)
+        if not self.delegate(api_request):
+            try:
+                with replica_reads():
+                    response = await self.read(api_request, **kwargs)
+            except Http404 as exc:
+                response = self.error(NotFound(*exc.args))
+            except APIException as exc:
+                response = self.error(exc)
+            if response is not None:
+                return response
+        return await sync_to_async(_drf_view(self.viewset, self.action))(request, *args, **kwargs)
+
+    def delegate(self, request) -> bool:
+        if self.viewset is None:
+            return False
+        if "text/html" in request.headers.get("Accept", ""):
+            return True  # browsable API
+        return any(param in request.query_params for param in self.delegated_params)
+
+    async def read(self, request, **kwargs) -> HttpResponse | None:
+        raise NotImplementedError
+
+    def shadow(self, request, kwargs):
+        """The DRF viewset instance this request would have got, for its querysets."""
+        return self.viewset(request=request, action=self.action, kwargs=kwargs, format_kwarg=None)
+
+    def respond(self, data, status=200, validators=None, headers=None) -> HttpResponse:
+        response = HttpResponse(_renderer.render(data), status=status, content_type="application/json")
+        for name, value in (headers or {}).items():
+            response[name] = value
+        return self.finish(response, validators)
+
+    def finish(self, response, validators=None) -> HttpResponse:
+        # the headers APIView.finalize_response and ConditionalGetMixin add
+        response["Allow"] = "GET, HEAD, OPTIONS"
+        patch_vary_headers(response, ("Accept",))
+        if validators and response.status_code in (200, 304):
+            set_validators(response, validators)
+        return response
+
+    def not_modified(self, request, validators) -> HttpResponse | None:
+        if not validators:
+            return None
+        etag, last_ts = validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_ts)
+        return self.finish(response, validators) if response is not None else None
+
+    def error(self, exc: APIException) -> HttpResponse:
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        return self.respond(data, status=exc.status_code)
+
+
+class AsyncSiteCachedView(AsyncAPIView):
+    """SiteCachedMixin on the async ORM."""
+    response_cache: SiteResponseCache
+    cache_slug_param: str | None = None
+
+    def cache_key(self, request) -> tuple:
+        slug = request.query_params.get(self.cache_slug_param) if self.cache_slug_param else None
+        return request_site(request), slug, request_lang(request)
+
+    async def state(self, request, kwargs):
+        raise NotImplementedError
+
+    async def build(self, request, kwargs):
+        raise NotImplementedError
+
+    async def read(self, request, **kwargs):
+        site, slug, lang = key = self.cache_key(request)
+        entry = self.response_cache.get(*key) if site else None
+        if entry is not None:
+            validators = entry["validators"]
+            return self.not_modified(request, validators) or self.respond(
+                entry["data"], validators=validators, headers={"X-Cache": "HIT"}
+            )
+        validators = await self.validators(request, kwargs)
+        not_modified = self.not_modified(request, validators)
+        if not_modified is not None:
+            return not_modified
+        data = await self.fill(request, kwargs, key, validators)
+        return self.respond(data, validators=validators, headers={"X-Cache": "MISS"})
+
+    async def load(self, request, **kwargs):
+        """(payload, validators) from the cache or the database, without the conditional-GET check."""
+        site, slug, lang = key = self.cache_key(request)
+        entry = self.response_cache.get(*key) if site else None
+        if entry is not None:
+            return entry["data"], entry["validators"]
+        validators = await self.validators(request, kwargs)
+        return await self.fill(request, kwargs, key, validators), validators
+
+    async def validators(self, request, kwargs):
+        state = await self.state(request, kwargs)
+        return state_validators(request, state, last_modified=False) if state is not None else None
+
+    async def fill(self, request, kwargs, key, validators):
+        data = await self.build(request, kwargs)
+        if key[0]:
+            self.response_cache.set(*key, {"data": data, "validators": validators})
+        return data
+
+
+class AsyncNavigationView(AsyncSiteCachedView):
+    """GET /api/v1/navigation/?site=amare&slug=main"""
+    viewset = NavigationViewSet
+    response_cache = navigation_cache
+    cache_slug_param = "slug"
+
+    async def state(self, request, kwargs):
+        states = await asyncio.gather(
+            *(aqueryset_state(qs) for qs in self.shadow(request, kwargs).conditional_querysets())
+        )
+        return merge_states(*states)
+
+    async def build(self, request, kwargs):
+        menus, items = self.shadow(request, kwargs).conditional_querysets()
+        # one query for every menu's items instead of one per menu
+        menus, items = await asyncio.gather(
+            alist(menus.order_by("slug")),
+            alist(items.order_by("order", "created_at", "id")),
+        )
+        by_menu = {}
+        for item in items:
+            by_menu.setdefault(item.menu_id, []).append(item)
+        for menu in menus:
+            menu._prefetched_items = by_menu.get(menu.pk, [])
+        return NavigationMenuSerializer(menus, many=True).data
+
+
+class AsyncSettingsView(AsyncSiteCachedView):
+    """GET /api/v1/settings/?site=amare"""
+    viewset = SettingsViewSet
+    response_cache = settings_cache
+
+    async def read(self, request, **kwargs):
+        if not request_site(request):
+            return self.respond({"detail": "Missing or invalid ?site parameter."}, status=400)
+        return await super().read(request, **kwargs)
+
+    async def state(self, request, kwargs):
+        return await aqueryset_state(Setting.objects.filter(site=request_site(request)))
+
+    async def build(self, request, kwargs):
+        site = request_site(request)
+        rows = await alist(Setting.objects.filter(site=site))
+        return SiteSettingsSerializer.from_queryset(site, rows).data
+
+
+class SiteView(AsyncAPIView):
+    """
+    GET /api/v1/site/?site=amare&lang=sv&posts=6
+    What a frontend render starts from, in one round trip:
+    {
+      "site": "amare", "lang": "sv",
+      "navigation": [<menu>, ...],       as /api/v1/navigation/
+      "settings": {"<key>": <json>, ...}, as /api/v1/settings/
+      "home": <page> | null,             as /api/v1/content/pages/<slug>/
+      "posts": [<post>, ...]             the latest ?posts= (default 6) list items
+    }
+    Navigation and settings come from their response caches; the home page
+    and posts from content.fast. The ETag combines the validators of all
+    four parts. Query count is fixed: 2 for a 304 and 8 for a 200 with warm
+    caches (14 cold), however many menus or posts there are.
+    """
+    latest_posts = 6
+
+    def posts_param(self, request) -> int:
+        limit = api_settings.PAGE_SIZE or self.latest_posts
+        raw = request.query_params.get("posts")
+        if raw in (None, ""):
+            return min(self.latest_posts, limit)
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValidationError({"posts": "Must be an integer."})
+        if not 0 <= value <= limit:
+            raise ValidationError({"posts": f"Must be between 0 and {limit}."})
+        return value
+
+    async def read(self, request, **kwargs):
+        site = request_site(request)
+        if not site:
+            return self.respond({"detail": "Missing or invalid ?site parameter."}, status=400)
+        count = self.posts_param(request)
+        lang = request_lang(request)
+        home = PublicPageViewSet(request=request, action="retrieve", kwargs={}, format_kwarg=None)
+        home = home.get_queryset().filter(is_home=True)
+        posts = PublicPostViewSet(request=request, action="list", kwargs={}, format_kwarg=None).get_queryset()
+        home_related, posts_related = PublicPageViewSet.conditional_related, PublicPostViewSet.conditional_related
+
+        (navigation, navigation_validators), (settings, settings_validators), home_state, posts_state = (
+            await asyncio.gather(
+                AsyncNavigationView().load(request),
+                AsyncSettingsView().load(request),
+                aqueryset_state(home, home_related),
+                aqueryset_state(posts, posts_related),
+            )
+        )
+        validators = combine_validators(
+            request,
+            navigation_validators,
+            settings_validators,
+            state_validators(request, home_state),
+            state_validators(request, posts_state, last_modified=False),
+        )
+        not_modified = self.not_modified(request, validators)
+        if not_modified is not None:
+            return not_modified
+
+        page_fast, post_fast = compiled(PublicPageSerializer), compiled(PublicPostListSerializer)
+        home_rows, post_rows = await asyncio.gather(
+            alist(page_fast.values(home)[:1]), alist(post_fast.values(posts)[:count])
+        )
+        home_data, post_data = await asyncio.gather(
+            page_fast.aserialize(home_rows, lang), post_fast.aserialize(post_rows, lang)
+        )
+        return self.respond({
+            "site": site,
+            "lang": lang,
+            "navigation": navigation,
+            "settings": settings["settings"],
+            "home": home_data[0] if home_data else None,
+            "posts": post_data,
+        }, validators=validators)
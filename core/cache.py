@@ -0,0 +1,68 @@
+# core/cache.py
+from __future__ import annotations
+
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from content.utils import SUPPORTED_LANGS
+
+
+class SiteResponseCache:
+    """
+    Per-(site, slug, lang) cache of final response payloads (plus their
+    conditional-GET validators). Entries live until the signals in
+    core.signals invalidate them; API_CACHE_TIMEOUT is only a safety net.
+    """
+
+    ALL = "*"
+
+    def __init__(self, prefix: str, timeout_setting: str = "API_CACHE_TIMEOUT"):
+        self.prefix = prefix
+        self.timeout_setting = timeout_setting
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "API_CACHE_ALIAS", "default")]
+
+    def key(self, site: str, slug: str | None, lang: str) -> str:
+        return f"api:{self.prefix}:{site}:{slug or self.ALL}:{lang}"
+
+    def get(self, site: str, slug: str | None, lang: str) -> dict | None:
+        entry = self.cache.get(self.key(site, slug, lang))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, site: str, slug: str | None, lang: str, entry: dict) -> None:
+        timeout = getattr(settings, self.timeout_setting, getattr(settings, "API_CACHE_TIMEOUT", 3600))
+        self.cache.set(self.key(site, slug, lang), entry, timeout)
+
+    def invalidate(self, site: str, slug: str | None = None) -> None:
+        # a slug-less ("all menus") entry always contains the changed slug
+        slugs = {None, slug}
+        self.cache.delete_many([self.key(site, s, lang) for s in slugs for lang in SUPPORTED_LANGS])
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+navigation_cache = SiteResponseCache("navigation")
+settings_cache = SiteResponseCache("settings")
+# per-month post counts of the posts archive (content.views), per site. Also
+# invalidated by publish_scheduled, which runs in its own process: that only
+# reaches the web workers through a shared cache, hence its own (short) timeout
+archive_cache = SiteResponseCache("archive", timeout_setting="API_ARCHIVE_CACHE_TIMEOUT")
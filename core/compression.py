@@ -0,0 +1,213 @@
+# core/compression.py
+"""
+gzip / brotli for API responses (WhiteNoise only covers static files).
+
+  - negotiation:  Accept-Encoding with q-values; br is preferred when the
+                  optional `brotli` package is installed, gzip otherwise
+  - threshold:    bodies under API_COMPRESSION_MIN_SIZE go out as they are
+  - cache:        a response with an ETag (ConditionalGetMixin) is compressed
+                  once per body: the compressed bytes are cached under
+                  (encoding, digest of the uncompressed body). Hashing is far
+                  cheaper than compressing, and unlike the ETag the digest
+                  cannot miss a change to something the body is built from
+  - streaming:    streaming responses, and bodies over
+                  API_COMPRESSION_STREAM_SIZE, are compressed chunk by chunk
+                  instead of being buffered or cached
+  - ASGI:         the middleware is async-capable; buffered bodies are
+                  compressed in a worker thread, not on the event loop
+
+As with Django's GZipMiddleware, a compressed response gets a weak ETag;
+If-None-Match is compared weakly, so 304s keep working.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .metrics import timed
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# one-off compression for the cache can afford a higher level than streaming
+CACHED_LEVEL = {"br": 9, "gzip": 9}
+STREAM_LEVEL = {"br": 4, "gzip": 6}
+
+
+def available_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, available=None) -> str | None:
+    """The best of `available` (in preference order) the client accepts, or None."""
+    available = available or available_encodings()
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    wildcard = accepted.get("*", 0.0)
+    ranked = [(accepted.get(c, wildcard), -i, c) for i, c in enumerate(available)]
+    q, _, coding = max(ranked)
+    return coding if q > 0 else None
+
+
+def compress(data: bytes, encoding: str, level: int | None = None) -> bytes:
+    level = CACHED_LEVEL[encoding] if level is None else level
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _stream_compressor(encoding: str):
+    """(process, finish) of a streaming compressor for `encoding`."""
+    level = STREAM_LEVEL[encoding]
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding: str):
+    """Compress an iterable of byte chunks lazily."""
+    process, finish = _stream_compressor(encoding)
+    for chunk in chunks:
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding: str):
+    """compress_stream() for the async iterators of async streaming responses."""
+    process, finish = _stream_compressor(encoding)
+    async for chunk in chunks:
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+def _slices(data: bytes, size: int = STREAM_CHUNK_SIZE):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _weak(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses under API_COMPRESSION_PATHS. Put it above every
+    middleware that reads or changes the response body.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, "API_COMPRESSION_PATHS", ("/api/",)))
+        self.min_size = getattr(settings, "API_COMPRESSION_MIN_SIZE", 1024)
+        self.stream_size = getattr(settings, "API_COMPRESSION_STREAM_SIZE", 512 * 1024)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, "API_CACHE_ALIAS", "default")]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self._encoding(request, response)
+        if encoding is None:
+            return response
+        return self._compress(response, encoding)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self._encoding(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self._compress(response, encoding)  # chunks are compressed as they are sent
+        # CPU-bound, and the cached copy is a blocking cache read: off the event loop
+        return await sync_to_async(self._compress)(response, encoding)
+
+    def _encoding(self, request, response) -> str | None:
+        """The encoding to compress `response` with, or None to send it as it is."""
+        if not request.path.startswith(self.paths):
+            return None
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if (
+            request.method != "GET"
+            or response.status_code != 200
+            or response.has_header("Content-Encoding")
+            or (not response.streaming and len(response.content) < self.min_size)
+        ):
+            return None
+        return negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+    def _compress(self, response, encoding: str):
+        with timed("compress"):
+            if response.streaming:
+                stream = acompress_stream if response.is_async else compress_stream
+                response.streaming_content = stream(response.streaming_content, encoding)
+                del response["Content-Length"]
+            else:
+                body = response.content
+                if len(body) > self.stream_size:
+                    # large pages: no full compressed copy in memory or in the cache
+                    response = self._to_streaming(response, compress_stream(_slices(body), encoding))
+                else:
+                    response.content = self._compressed(response, body, encoding)
+                    response["Content-Length"] = str(len(response.content))
+        if response.has_header("ETag"):
+            response["ETag"] = _weak(response["ETag"])
+        response["Content-Encoding"] = encoding
+        return response
+
+    def _compressed(self, response, body: bytes, encoding: str) -> bytes:
+        # only versioned (ETag) responses repeat often enough to be worth caching
+        if not response.has_header("ETag"):
+            return compress(body, encoding)
+        key = f"api:compressed:{encoding}:{hashlib.sha1(body).hexdigest()}"
+        data = self.cache.get(key)
+        if data is None:
+            data = compress(body, encoding)
+            self.cache.set(key, data, getattr(settings, "API_CACHE_TIMEOUT", 3600))
+        return data
+
+    @staticmethod
+    def _to_streaming(response, content):
+        streaming = StreamingHttpResponse(content, status=response.status_code)
+        for header, value in response.items():
+            if header.lower() != "content-length":
+                streaming[header] = value
+        for cookie in response.cookies.values():
+            streaming.cookies[cookie.key] = cookie
+        return streaming
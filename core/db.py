@@ -0,0 +1,259 @@
+# core/db.py
+"""
+Database configuration and primary/replica routing.
+
+  - config:     databases_from_env() builds DATABASES from DB_* variables,
+                SQLite by default or PostgreSQL (DB_ENGINE=postgres), plus
+                an optional read replica under the "replica" alias
+  - sqlite:     busy timeout, mmap and synchronous=NORMAL on every
+                connection; the WAL journal (so public reads don't wait on
+                admin saves) is a property of the file, switched on once per
+                database by `manage.py sqlite_wal` as a deploy step
+  - postgres:   persistent connections (DB_CONN_MAX_AGE) with health checks;
+                DB_POOL=psycopg uses psycopg's pool (needs psycopg[pool]),
+                DB_POOL=pgbouncer suits an external transaction pooler
+  - routing:    reads go to the replica only inside replica_reads(), which
+                the public read-only viewsets enter (ReplicaReadMixin);
+                writes always go to the primary
+  - stickiness: a request that writes a content model (an app in
+                DATABASE_REPLICA_PIN_APPS; not sessions, auth or the admin
+                log) gets a cookie that keeps that client's replica_reads()
+                on the primary for DATABASE_REPLICA_PIN_SECONDS, so an editor
+                reads their own writes (PrimaryPinMiddleware). Other clients
+                keep reading the replica and may see its lag
+
+Without a replica the router returns None everywhere and replica_reads()
+costs one dict lookup.
+"""
+from __future__ import annotations
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PRIMARY = "default"
+REPLICA = "replica"
+PIN_COOKIE = "db_primary_until"
+
+# per connection; journal_mode=WAL persists in the file, see enable_wal()
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def sqlite_database(name, busy_timeout: float = 20.0) -> dict:
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "OPTIONS": {
+            "timeout": busy_timeout,
+            "init_command": ";".join(SQLITE_PRAGMAS),
+            # take the write lock at BEGIN: no "database is locked" when a
+            # reader upgrades to a writer under WAL
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+
+
+def enable_wal(connection) -> str | None:
+    """Switch a SQLite database to the WAL journal; returns the journal mode now in effect."""
+    if connection.vendor != "sqlite":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        return cursor.fetchone()[0]
+
+
+def postgres_database(env) -> dict:
+    db = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("DB_NAME", "adapticus"),
+        "USER": env.get("DB_USER", ""),
+        "PASSWORD": env.get("DB_PASSWORD", ""),
+        "HOST": env.get("DB_HOST", ""),
+        "PORT": env.get("DB_PORT", ""),
+        "CONN_MAX_AGE": int(env.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {},
+    }
+    pool = env.get("DB_POOL", "")
+    if pool == "psycopg":
+        db["CONN_MAX_AGE"] = 0  # the pool owns connection lifetime
+        db["OPTIONS"]["pool"] = {
+            "min_size": int(env.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(env.get("DB_POOL_MAX_SIZE", "10")),
+        }
+    elif pool == "pgbouncer":
+        # transaction pooling can't hold a named cursor across statements
+        db["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return db
+
+
+def databases_from_env(base_dir, env=None) -> dict:
+    """DATABASES for settings.py; a replica is added when DB_REPLICA_HOST (or DB_REPLICA_NAME) is set."""
+    env = os.environ if env is None else env
+    if env.get("DB_ENGINE", "sqlite") == "postgres":
+        primary = postgres_database(env)
+        replica = {**primary, "HOST": env["DB_REPLICA_HOST"]} if env.get("DB_REPLICA_HOST") else None
+        if replica and env.get("DB_REPLICA_PORT"):
+            replica["PORT"] = env["DB_REPLICA_PORT"]
+    else:
+        primary = sqlite_database(env.get("DB_NAME") or base_dir / "db.sqlite3")
+        replica = sqlite_database(env["DB_REPLICA_NAME"]) if env.get("DB_REPLICA_NAME") else None
+    databases = {PRIMARY: primary}
+    if replica:
+        # the test runner points the replica at the test primary
+        databases[REPLICA] = {**replica, "TEST": {"MIRROR": PRIMARY}}
+    return databases
+
+
+# --- routing
+
+class _Reads:
+    __slots__ = ("active",)
+
+    def __init__(self, active: bool):
+        self.active = active
+
+
+_reads: ContextVar[_Reads | None] = ContextVar("replica_reads", default=None)
+
+
+class _Client:
+    """The requesting client's pin: until when (cookie), and whether this request wrote."""
+    __slots__ = ("pinned_until", "wrote")
+
+    def __init__(self, pinned_until: float = 0.0):
+        self.pinned_until = pinned_until
+        self.wrote = False
+
+
+_client: ContextVar[_Client | None] = ContextVar("primary_pin", default=None)
+
+
+def _pin_seconds() -> float:
+    return getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 10)
+
+
+def has_replica() -> bool:
+    return REPLICA in settings.DATABASES
+
+
+def pinned_to_primary() -> bool:
+    client = _client.get()
+    return client is not None and (client.wrote or client.pinned_until > time.time())
+
+
+def pins_primary(model) -> bool:
+    return model._meta.app_label in getattr(settings, "DATABASE_REPLICA_PIN_APPS", ("content", "taxonomy", "core"))
+
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block use the replica, unless this client's recent write pinned it to the primary."""
+    reads = _Reads(active=has_replica() and not pinned_to_primary())
+    token = _reads.set(reads)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def __init__(self, replica: str | None = None):
+        self.replica = replica or (REPLICA if has_replica() else None)
+
+    def db_for_read(self, model, **hints):
+        reads = _reads.get()
+        if self.replica and reads is not None and reads.active:
+            return self.replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        if self.replica:
+            client = _client.get()
+            if client is not None and pins_primary(model):
+                client.wrote = True
+            reads = _reads.get()
+            if reads is not None:
+                reads.active = False  # read back what this block wrote
+            # not None: an instance loaded from the replica would be saved back to it
+            return PRIMARY
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # both aliases hold the same data
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == REPLICA else None
+
+
+class ReplicaReadMixin:
+    """For read-only viewsets: the whole request reads from the replica when one is configured."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+
+class PrimaryPinMiddleware:
+    """
+    Read-your-writes for the client that wrote: sets PIN_COOKIE on responses
+    to requests that wrote a content model and honours it on the client's
+    next requests. Removes itself when no replica is configured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not has_replica():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        client = self.client(request)
+        token = _client.set(client)
+        try:
+            response = self.get_response(request)
+        finally:
+            _client.reset(token)
+        return self.pin(client, response)
+
+    async def __acall__(self, request):
+        # the _Client is shared with the sync_to_async threads the writes run in
+        client = self.client(request)
+        token = _client.set(client)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _client.reset(token)
+        return self.pin(client, response)
+
+    @staticmethod
+    def client(request) -> _Client:
+        try:
+            until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            until = 0.0
+        return _Client(until)
+
+    @staticmethod
+    def pin(client: _Client, response):
+        if client.wrote:
+            seconds = _pin_seconds()
+            response.set_cookie(
+                PIN_COOKIE, f"{time.time() + seconds:.3f}", max_age=int(seconds) + 1, httponly=True, samesite="Lax"
+            )
+        return response
@@ -0,0 +1,189 @@
+# core/images.py
+"""
+Responsive derivatives for image MediaAssets.
+
+Each original is resized to the width buckets below its own width and
+encoded as AVIF / WebP / JPEG, plus a ~16px wide LQIP placeholder (a data:
+URI small enough to inline in the API payload). Files are content-addressed:
+
+    MEDIA_ROOT/derivatives/<checksum[:2]>/<checksum>/<width>.<ext>
+
+so identical uploads share derivatives and an existing file is never
+re-encoded. Rendering is a pure function over file paths, which lets it run
+in a process pool; the results are stored on MediaAsset.derivatives / .lqip.
+"""
+from __future__ import annotations
+
+import base64
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .media import file_checksum
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = "derivatives"
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+# (format, extension, save options), best compression first
+ENCODERS = (
+    ("avif", "avif", {"quality": 55}),
+    ("webp", "webp", {"quality": 75, "method": 4}),
+    ("jpeg", "jpg", {"quality": 80, "optimize": True, "progressive": True}),
+)
+LQIP_WIDTH = 16
+
+
+def _conf(name, default):
+    return getattr(settings, "IMAGE_DERIVATIVES", {}).get(name, default)
+
+
+def available_encoders():
+    wanted = _conf("formats", [fmt for fmt, _, _ in ENCODERS])
+    return [e for e in ENCODERS if e[0] in wanted and (e[0] == "jpeg" or features.check(e[0]))]
+
+
+def _prepare(img: Image.Image, fmt: str) -> Image.Image:
+    if fmt == "jpeg":
+        if img.mode in ("RGBA", "LA", "P"):
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            rgba = img.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            return background
+        return img.convert("RGB")
+    return img.convert("RGBA") if img.mode in ("P", "LA") else img
+
+
+def render_derivatives(src: str, out_dir: str, widths, encoders) -> dict:
+    """
+    Resize/encode `src` into `out_dir`. Touches no Django state, so it can
+    run in a worker process. Returns {"items": [...], "lqip": data URI}.
+    """
+    items = []
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    with Image.open(src) as original:
+        img = ImageOps.exif_transpose(original)
+        img.load()
+    # buckets below the original, topped by the original width itself when a
+    # larger bucket was asked for (no upscaling)
+    buckets = {w for w in widths if w < img.width}
+    if any(w >= img.width for w in widths):
+        buckets.add(img.width)
+    buckets = sorted(buckets)
+    for width in buckets:
+        height = max(1, round(img.height * width / img.width))
+        resized = img if width == img.width else img.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, ext, options in encoders:
+            path = out / f"{width}.{ext}"
+            if not path.exists():
+                tmp = path.with_name(path.name + ".tmp")
+                _prepare(resized, fmt).save(tmp, format=fmt.upper(), **options)
+                os.replace(tmp, path)
+            items.append({"format": fmt, "width": width, "height": height, "name": path.name})
+
+    small = img.resize((LQIP_WIDTH, max(1, round(img.height * LQIP_WIDTH / img.width))), Image.Resampling.BILINEAR)
+    fmt = "webp" if features.check("webp") else "jpeg"
+    buffer = io.BytesIO()
+    _prepare(small, fmt).save(buffer, format=fmt.upper(), quality=30)
+    lqip = f"data:image/{fmt};base64,{base64.b64encode(buffer.getvalue()).decode('ascii')}"
+    return {"items": items, "lqip": lqip}
+
+
+def derivative_dir(checksum: str) -> str:
+    return f"{DERIVATIVES_DIR}/{checksum[:2]}/{checksum}"
+
+
+def _job(asset):
+    """(asset id, render_derivatives args, checksum), or None when there is nothing to render."""
+    if asset.kind != "image" or not asset.file:
+        return None
+    try:
+        src = asset.file.path
+    except NotImplementedError:  # non-filesystem storage
+        return None
+    if not os.path.exists(src):
+        return None
+    if not asset.checksum:
+        with open(src, "rb") as f:
+            asset.checksum = file_checksum(f)
+    out_dir = Path(settings.MEDIA_ROOT) / derivative_dir(asset.checksum)
+    encoders = available_encoders()
+    return asset.pk, (src, str(out_dir), _conf("widths", DEFAULT_WIDTHS), encoders), asset.checksum
+
+
+def _store(asset_id, checksum: str, result: dict) -> None:
+    from .models import MediaAsset
+
+    base = derivative_dir(checksum)
+    derivatives = [
+        {**{k: v for k, v in item.items() if k != "name"}, "path": f"{base}/{item['name']}"}
+        for item in result["items"]
+    ]
+    # update(): no post_save, so storing the result does not queue another render;
+    # updated_at by hand (auto_now only applies on save) so ETags see the new srcset
+    MediaAsset.objects.filter(pk=asset_id).update(
+        checksum=checksum, derivatives=derivatives, lqip=result["lqip"], updated_at=timezone.now()
+    )
+
+
+def build_derivatives(assets, workers: int | None = None) -> int:
+    """Render derivatives for `assets` in a process pool; returns how many were stored."""
+    jobs = [job for job in map(_job, assets) if job]
+    workers = _conf("workers", os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(jobs) <= 1:
+        results = [render_derivatives(*args) for _, args, _ in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(render_derivatives, *zip(*(args for _, args, _ in jobs))))
+    for (asset_id, _, checksum), result in zip(jobs, results):
+        _store(asset_id, checksum, result)
+    return len(jobs)
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _pool_executor() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_conf("workers", os.cpu_count() or 1))
+    return _pool
+
+
+def _on_done(asset_id, checksum, future) -> None:
+    try:
+        _store(asset_id, checksum, future.result())
+    except Exception:
+        logger.exception("images: could not build derivatives for %s", asset_id)
+    finally:
+        connection.close()  # the callback thread's own connection
+
+
+def queue_derivatives(asset) -> None:
+    """
+    Render in the background after commit (upload-time path). With
+    IMAGE_DERIVATIVES["workers"] = 0 the render runs inline instead.
+    """
+    def submit():
+        try:
+            job = _job(asset)
+            if job is None:
+                return
+            asset_id, args, checksum = job
+            if _conf("workers", os.cpu_count() or 1) == 0:
+                _store(asset_id, checksum, render_derivatives(*args))
+                return
+            future = _pool_executor().submit(render_derivatives, *args)
+            future.add_done_callback(lambda f: _on_done(asset_id, checksum, f))
+        except Exception:  # an unreadable upload must not break the save
+            logger.exception("images: could not build derivatives for %s", asset.pk)
+
+    transaction.on_commit(submit)
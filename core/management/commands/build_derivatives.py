@@ -0,0 +1,30 @@
+# core/management/commands/build_derivatives.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from core.images import build_derivatives
+from core.models import MediaAsset
+
+
+class Command(BaseCommand):
+    help = "Render responsive image derivatives (srcset + LQIP) for image MediaAssets, in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render assets that already have derivatives.")
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, all=False, workers=None, batch_size=200, **options):
+        qs = MediaAsset.objects.filter(kind="image").exclude(file="").order_by("pk")
+        if not all:
+            qs = qs.filter(derivatives=[])
+        last_pk, total = None, 0
+        while True:
+            chunk = qs.filter(pk__gt=last_pk) if last_pk else qs
+            chunk = list(chunk[:batch_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            total += build_derivatives(chunk, workers=workers)
+            self.stdout.write(f"{total} assets rendered")
@@ -0,0 +1,120 @@
+# core/management/commands/dedupe_media.py
+from __future__ import annotations
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.media import file_checksum, image_dimensions
+from core.models import MediaAsset
+
+
+def _scan(asset: MediaAsset):
+    """(pk, checksum, (width, height) | None) read from storage, or (pk, None, None) if unreadable."""
+    try:
+        with asset.file.storage.open(asset.file.name, "rb") as f:
+            checksum = file_checksum(f)
+            dims = image_dimensions(f) if asset.kind == "image" else None
+    except OSError:
+        return asset.pk, None, None
+    return asset.pk, checksum, dims
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill checksum/width/height of MediaAssets (hashed in parallel) and "
+        "collapse assets with identical content onto one stored file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--rehash", action="store_true", help="Re-read files that already have a checksum.")
+        parser.add_argument(
+            "--merge-rows", action="store_true",
+            help="Also merge duplicate rows: references move to the oldest asset and the others are deleted.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, workers=8, rehash=False, merge_rows=False, dry_run=False, **options):
+        self.dry_run = dry_run
+        # in a dry run nothing is saved, so grouping uses the freshly read checksums
+        scanned = self.backfill(workers, rehash)
+        groups = defaultdict(list)
+        for asset in MediaAsset.objects.exclude(file="").order_by("created_at", "pk"):
+            checksum = scanned.get(asset.pk) or asset.checksum
+            if checksum:
+                groups[checksum].append(asset)
+        duplicates = [assets for assets in groups.values() if len(assets) > 1]
+        freed = 0
+        for canonical, *others in duplicates:
+            freed += self.share_file(canonical, others)
+            if merge_rows:
+                self.merge(canonical, others)
+        verb = "Would free" if dry_run else "Freed"
+        self.stdout.write(f"{len(duplicates)} duplicate group(s). {verb} {freed} file(s).")
+
+    def backfill(self, workers: int, rehash: bool) -> dict:
+        qs = MediaAsset.objects.exclude(file="")
+        if not rehash:
+            qs = qs.filter(checksum="")
+        assets = {a.pk: a for a in qs.only("id", "file", "kind", "checksum", "width", "height")}
+        if not assets:
+            return {}
+        # hashlib releases the GIL on large buffers, so threads overlap I/O and hashing
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan, assets.values()))
+        changed = []
+        for pk, checksum, dims in results:
+            asset = assets[pk]
+            if checksum is None:
+                self.stderr.write(f"unreadable: {asset.file.name}")
+                continue
+            asset.checksum = checksum
+            if dims:
+                asset.width, asset.height = dims
+            changed.append(asset)
+        self.stdout.write(f"{len(changed)} asset(s) hashed.")
+        if not self.dry_run:
+            MediaAsset.objects.bulk_update(changed, ["checksum", "width", "height"], batch_size=500)
+        return {a.pk: a.checksum for a in changed}
+
+    def share_file(self, canonical: MediaAsset, others: list[MediaAsset]) -> int:
+        """Point `others` at the canonical file; delete files nothing references any more."""
+        storage = canonical.file.storage
+        names = {a.file.name for a in others} - {canonical.file.name}
+        if self.dry_run or not names:
+            return len(names)
+        with transaction.atomic():
+            # update() skips auto_now: bump updated_at so ETags built on it move
+            MediaAsset.objects.filter(pk__in=[a.pk for a in others]).update(
+                file=canonical.file.name, derivatives=canonical.derivatives, lqip=canonical.lqip,
+                updated_at=timezone.now(),
+            )
+        for name in names:
+            if not MediaAsset.objects.filter(file=name).exists() and storage.exists(name):
+                storage.delete(name)
+        return len(names)
+
+    def merge(self, canonical: MediaAsset, others: list[MediaAsset]) -> None:
+        ids = [a.pk for a in others]
+        self.stdout.write(f"merge {len(ids)} row(s) into {canonical.pk}")
+        if self.dry_run:
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            for rel in MediaAsset._meta.related_objects:
+                if rel.one_to_many:  # ForeignKeys pointing at MediaAsset
+                    changes = {rel.field.name: canonical}
+                    if any(f.name == "updated_at" for f in rel.related_model._meta.concrete_fields):
+                        changes["updated_at"] = now  # the referencing row's payload changed
+                    rel.related_model._base_manager.filter(**{f"{rel.field.name}__in": ids}).update(**changes)
+            for field in ("alt_text", "caption"):
+                if not getattr(canonical, field):
+                    setattr(canonical, field, next((getattr(a, field) for a in others if getattr(a, field)), ""))
+            MediaAsset.objects.filter(pk=canonical.pk).update(
+                alt_text=canonical.alt_text, caption=canonical.caption, updated_at=now
+            )
+            MediaAsset.objects.filter(pk__in=ids).delete()
@@ -0,0 +1,24 @@
+# core/management/commands/sqlite_wal.py
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.db import enable_wal
+
+
+class Command(BaseCommand):
+    help = (
+        "Switch the SQLite databases to the WAL journal (once per database file, e.g. after "
+        "migrate on deploy). Other backends are skipped."
+    )
+
+    def handle(self, *args, **options):
+        for alias in connections:
+            mode = enable_wal(connections[alias])
+            if mode is None:
+                self.stdout.write(f"{alias}: not SQLite, skipped")
+            elif mode.lower() == "wal":
+                self.stdout.write(f"{alias}: WAL")
+            else:
+                self.stderr.write(f"{alias}: journal_mode is {mode}, WAL not available")
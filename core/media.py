@@ -0,0 +1,95 @@
+# core/media.py
+"""
+MediaAsset metadata and checksum-based deduplication.
+
+  - checksum:       streaming SHA-256 (1 MiB chunks; an upload is never held
+                    in memory as a whole)
+  - width/height:   read from the image header by Pillow's lazy open, without
+                    decoding pixels; EXIF-rotated images report display size
+  - deduplication:  an upload whose checksum matches an existing asset is not
+                    stored again; the new row points at the existing file
+                    (and shares its derivatives)
+"""
+from __future__ import annotations
+
+import hashlib
+
+from PIL import Image, UnidentifiedImageError
+
+CHUNK_SIZE = 1 << 20
+# EXIF orientations that swap width and height (90/270 degree rotations)
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+def file_checksum(fileobj, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 of a file object, read in chunks."""
+    digest = hashlib.sha256()
+    if hasattr(fileobj, "chunks"):  # Django File / UploadedFile
+        for chunk in fileobj.chunks(chunk_size):
+            digest.update(chunk)
+    else:
+        fileobj.seek(0)
+        for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+            digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def image_dimensions(fileobj) -> tuple[int, int] | None:
+    """(width, height) from the header only, or None for non-images."""
+    fileobj.seek(0)
+    try:
+        with Image.open(fileobj) as img:
+            width, height = img.size
+            orientation = img.getexif().get(0x0112)
+    except (UnidentifiedImageError, OSError):
+        return None
+    finally:
+        fileobj.seek(0)
+    if orientation in _TRANSPOSED:
+        width, height = height, width
+    return width, height
+
+
+def is_new_upload(asset) -> bool:
+    return bool(asset.file) and not asset.file._committed
+
+
+def extract_metadata(asset) -> None:
+    """Fill checksum (and width/height for images) from the asset's file."""
+    field_file = asset.file
+    if not field_file:
+        return
+    close = field_file.closed if not is_new_upload(asset) else False
+    try:
+        asset.checksum = file_checksum(field_file)
+        if asset.kind == "image":
+            dims = image_dimensions(field_file)
+            if dims:
+                asset.width, asset.height = dims
+    finally:
+        if close:
+            field_file.close()
+
+
+def reuse_existing_file(asset) -> bool:
+    """
+    Point a new upload at an already-stored file with the same checksum, so
+    the bytes are neither written nor served twice. Returns True if reused.
+    """
+    from .models import MediaAsset
+
+    if not asset.checksum:
+        return False
+    original = (
+        MediaAsset.objects.filter(checksum=asset.checksum)
+        .exclude(pk=asset.pk)
+        .exclude(file="")
+        .order_by("created_at")
+        .first()
+    )
+    if original is None or not original.file.storage.exists(original.file.name):
+        return False
+    asset.file = original.file.name
+    asset.derivatives, asset.lqip = original.derivatives, original.lqip
+    return True
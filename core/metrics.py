@@ -0,0 +1,248 @@
+# core/metrics.py
+"""
+Opt-in per-request instrumentation (METRICS_ENABLED).
+
+MetricsMiddleware measures, per request:
+  - app:        wall time of the whole request
+  - db:         number of SQL queries and their total time (execute_wrapper)
+  - serialize:  time spent in the API serializers, including the SQL they
+                trigger                             (timed("serialize"))
+  - markdown:   time spent rendering markdown       (timed("markdown"))
+  - compress:   time spent compressing the response (timed("compress"))
+
+and reports them three ways: a Server-Timing header, one JSON log line on
+the "adapticus.metrics" logger, and rolling per-view windows from which
+/api/v1/_metrics serves p50/p95/p99 in Prometheus text format.
+
+When disabled the middleware removes itself (MiddlewareNotUsed) and timed()
+costs one ContextVar lookup.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("adapticus.metrics")
+
+QUANTILES = (0.5, 0.95, 0.99)
+# name -> (Prometheus metric, unit divisor, help)
+SERIES = {
+    "app": ("adapticus_request_duration_seconds", 1000.0, "Wall time per request."),
+    "db": ("adapticus_sql_duration_seconds", 1000.0, "Total SQL time per request."),
+    "queries": ("adapticus_sql_queries", 1.0, "SQL queries per request."),
+    "serialize": ("adapticus_serializer_duration_seconds", 1000.0, "Serializer time per request."),
+    "markdown": ("adapticus_markdown_duration_seconds", 1000.0, "Markdown render time per request."),
+    "compress": ("adapticus_compression_duration_seconds", 1000.0, "Response compression time per request."),
+}
+
+_current: ContextVar["RequestMetrics | None"] = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.timings: dict[str, float] = {}  # name -> milliseconds
+        self.queries = 0
+        self._depth: dict[str, int] = {}
+
+    def add(self, name: str, ms: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + ms
+
+    def sql(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.add("db", (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def timed(name: str):
+    """Add the block's wall time to `name`; nested blocks of one name count once."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    depth = metrics._depth.get(name, 0)
+    metrics._depth[name] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth[name] = depth
+        if depth == 0:
+            metrics.add(name, (time.perf_counter() - start) * 1000)
+
+
+def timed_method(name: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with timed(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RollingWindow:
+    """The last `size` samples of one series, plus lifetime sum and count."""
+
+    def __init__(self, size: int):
+        self.samples = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+        self.total += value
+        self.count += 1
+
+    def quantiles(self) -> dict[float, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        last = len(ordered) - 1
+        return {q: ordered[min(last, round(q * last))] for q in QUANTILES}
+
+
+class MetricsRegistry:
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], RollingWindow] = {}
+
+    def observe(self, view: str, values: dict[str, float]) -> None:
+        with self._lock:
+            for name, value in values.items():
+                series = self._series.get((name, view))
+                if series is None:
+                    series = self._series[(name, view)] = RollingWindow(self.window)
+                series.add(value)
+
+    def snapshot(self) -> dict[tuple[str, str], tuple[dict, float, int]]:
+        with self._lock:
+            return {key: (s.quantiles(), s.total, s.count) for key, s in self._series.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+registry = MetricsRegistry(getattr(settings, "METRICS_WINDOW", 1024))
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(
+    counters: dict[str, dict[str, int]] | None = None,
+    gauges: dict[str, dict[str, float]] | None = None,
+) -> str:
+    """
+    Prometheus exposition (text format 0.0.4) of the registry, plus
+    `counters` (monotonic totals, named *_total) and `gauges`, both as
+    {metric: {labels: value}}.
+    """
+    lines = []
+    snapshot = registry.snapshot()
+    for name, (metric, divisor, help_text) in SERIES.items():
+        keys = sorted(k for k in snapshot if k[0] == name)
+        if not keys:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+        for _, view in keys:
+            quantiles, total, count = snapshot[(name, view)]
+            label = f'view="{_label(view)}"'
+            for q, value in quantiles.items():
+                lines.append(f'{metric}{{{label},quantile="{q}"}} {value / divisor:.6g}')
+            lines.append(f"{metric}_sum{{{label}}} {total / divisor:.6g}")
+            lines.append(f"{metric}_count{{{label}}} {count}")
+    for metric, samples in (counters or {}).items():
+        lines.append(f"# TYPE {metric} counter")
+        for labels, value in samples.items():
+            lines.append(f"{metric}{{{labels}}} {int(value)}")
+    for metric, samples in (gauges or {}).items():
+        lines.append(f"# TYPE {metric} gauge")
+        for labels, value in samples.items():
+            lines.append(f"{metric}{{{labels}}} {value:.6g}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Put first in MIDDLEWARE so `app` covers the whole stack."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics.sql))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.add("app", (time.perf_counter() - start) * 1000)
+        self.report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        # the context (metrics, connection wrappers) carries into sync_to_async
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(metrics.sql))
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.add("app", (time.perf_counter() - start) * 1000)
+        self.report(request, response, metrics)
+        return response
+
+    @staticmethod
+    def report(request, response, metrics: RequestMetrics) -> None:
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        timings = {name: round(ms, 2) for name, ms in metrics.timings.items()}
+        parts = [f"{name};dur={ms}" for name, ms in timings.items()]
+        parts.append(f'queries;desc="{metrics.queries} SQL queries"')
+        response["Server-Timing"] = ", ".join(parts)
+        logger.info(json.dumps({
+            "view": view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            **{f"{name}_ms": ms for name, ms in timings.items()},
+        }))
+        if not request.path.startswith("/static/"):
+            registry.observe(view, {**metrics.timings, "queries": metrics.queries})
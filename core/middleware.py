@@ -0,0 +1,55 @@
+# core/middleware.py
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponseRedirect, HttpResponsePermanentRedirect
+
+from .redirects import redirect_table
+
+
+class RedirectMiddleware:
+    """
+    Answers requests whose host maps to a site (settings.SITE_HOSTS) and whose
+    path matches a core.Redirect rule. Lookups use the in-memory table in
+    core.redirects, so no query runs on the request path.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.site_hosts = {h.lower(): site for h, site in getattr(settings, "SITE_HOSTS", {}).items()}
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        site = self.site(request)
+        if site:
+            match = redirect_table.resolve(site, request.path)
+            if match is not None:
+                return self.redirect(*match)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        site = self.site(request)
+        if site:
+            match = await redirect_table.aresolve(site, request.path)
+            if match is not None:
+                return self.redirect(*match)
+        return await self.get_response(request)
+
+    def site(self, request) -> str | None:
+        return self.site_hosts.get(request.get_host().split(":", 1)[0].lower())
+
+    @staticmethod
+    def redirect(rule, target):
+        if rule.http_status in (301, 308):
+            response = HttpResponsePermanentRedirect(target)
+        else:
+            response = HttpResponseRedirect(target)
+        response.status_code = rule.http_status
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='navigationitem',
+            index=models.Index(fields=['menu', 'order'], name='navitem_menu_order_idx'),
+        ),
+    ]
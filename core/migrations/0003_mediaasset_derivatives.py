@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_public_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaasset',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='mediaasset',
+            name='lqip',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
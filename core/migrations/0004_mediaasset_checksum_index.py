@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_mediaasset_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaasset',
+            index=models.Index(fields=['checksum'], name='mediaasset_checksum_idx'),
+        ),
+    ]
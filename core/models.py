@@ -25,6 +25,12 @@ class MediaAsset(TimeStamped):
     alt_text = models.CharField(max_length=200, blank=True, default="")
     caption  = models.CharField(max_length=300, blank=True, default="")
     meta = models.JSONField(default=dict, blank=True)
+    # responsive variants, filled by core.images: [{format, width, height, path}, ...]
+    derivatives = models.JSONField(default=list, blank=True, editable=False)
+    lqip = models.TextField(blank=True, default="", editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["checksum"], name="mediaasset_checksum_idx")]
 
 class Author(TimeStamped):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -51,6 +57,8 @@ class NavigationItem(TimeStamped):
     order = models.PositiveIntegerField(default=0)
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE)
     new_tab = models.BooleanField(default=False)
+    class Meta:
+        indexes = [models.Index(fields=["menu","order"], name="navitem_menu_order_idx")]
 
 class Redirect(TimeStamped):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
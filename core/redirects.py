@@ -0,0 +1,197 @@
+# core/redirects.py
+"""
+In-process redirect table built from core.Redirect.
+
+All rows are loaded once into per-site structures:
+  - exact rules:   dict source_path -> rule           (O(1))
+  - prefix rules:  source_path ending in "*", compiled into a segment trie;
+                   the longest matching prefix wins and a "*" in the target
+                   is replaced by the unmatched remainder of the path.
+
+Lookups never touch the database once a process has its first table. A
+Redirect save/delete bumps a version stored in the Django cache
+(core.signals) and drops the saving process's table, so its next lookup
+loads the new one at once. Other processes read the version at most every
+REDIRECTS_RECHECK_SECONDS; they only see the bump through a shared cache
+backend (Redis, Memcached, database), and with a per-process cache (LocMem)
+they rely on REDIRECTS_MAX_AGE, after which every table is rebuilt whatever
+the version says. Such a rebuild runs in a background thread while lookups
+keep answering from the stale table. aresolve() answers from memory on the
+event loop and only moves the version check to a thread.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .models import Redirect
+
+VERSION_KEY = "redirects:version"
+
+
+@dataclass(frozen=True)
+class RedirectRule:
+    source_path: str
+    target_url: str
+    http_status: int
+
+    @property
+    def is_prefix(self) -> bool:
+        return self.source_path.endswith("*")
+
+    def target_for(self, remainder: str = "") -> str:
+        return self.target_url.replace("*", remainder) if self.is_prefix else self.target_url
+
+    def as_dict(self) -> dict:
+        return {
+            "source_path": self.source_path,
+            "target_url": self.target_url,
+            "http_status": self.http_status,
+        }
+
+
+@dataclass
+class _TrieNode:
+    children: dict = field(default_factory=dict)
+    rule: RedirectRule | None = None
+
+
+def normalize_path(path: str) -> str:
+    path = "/" + path.strip().lstrip("/")
+    return path.rstrip("/") or "/"
+
+
+def _segments(path: str) -> list[str]:
+    return [s for s in path.split("/") if s]
+
+
+class SiteRedirects:
+    def __init__(self, rules: list[RedirectRule]):
+        self.rules = rules
+        self.exact: dict[str, RedirectRule] = {}
+        self.trie = _TrieNode()
+        for rule in rules:
+            if rule.is_prefix:
+                node = self.trie
+                for seg in _segments(rule.source_path[:-1]):
+                    node = node.children.setdefault(seg, _TrieNode())
+                node.rule = rule
+            else:
+                self.exact[normalize_path(rule.source_path)] = rule
+
+    def resolve(self, path: str) -> tuple[RedirectRule, str] | None:
+        """Return (rule, target_url) for path, or None."""
+        path = normalize_path(path)
+        rule = self.exact.get(path)
+        if rule is not None:
+            return rule, rule.target_url
+        segs = _segments(path)
+        node = self.trie
+        best = (node.rule, 0) if node.rule is not None else None
+        for i, seg in enumerate(segs, start=1):
+            node = node.children.get(seg)
+            if node is None:
+                break
+            if node.rule is not None:
+                best = (node.rule, i)
+        if best is None:
+            return None
+        rule, depth = best
+        return rule, rule.target_for("/".join(segs[depth:]))
+
+
+class RedirectTable:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: dict[str, SiteRedirects] | None = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._rebuilding = False
+
+    def _load(self) -> dict[str, SiteRedirects]:
+        by_site: dict[str, list[RedirectRule]] = {}
+        rows = Redirect.objects.filter(is_active=True).order_by("source_path").values_list(
+            "site", "source_path", "target_url", "http_status"
+        )
+        for site, source, target, status in rows:
+            by_site.setdefault(site, []).append(RedirectRule(source, target, status))
+        return {site: SiteRedirects(rules) for site, rules in by_site.items()}
+
+    def _fresh(self, version, now: float) -> bool:
+        max_age = getattr(settings, "REDIRECTS_MAX_AGE", 300)
+        return self._sites is not None and version == self._version and now - self._loaded_at < max_age
+
+    def _checked(self, sites, now: float) -> bool:
+        """Whether the version of `sites` was checked within REDIRECTS_RECHECK_SECONDS."""
+        return sites is not None and now - self._checked_at < getattr(settings, "REDIRECTS_RECHECK_SECONDS", 5)
+
+    def _install(self, sites, version, now: float) -> None:
+        # build fully, then swap the reference: readers never see a partial table
+        self._sites, self._version, self._loaded_at = sites, version, now
+        self._checked_at = now
+
+    def _rebuild(self, version, now: float) -> None:
+        try:
+            sites = self._load()
+            with self._lock:
+                # invalidate() dropped the table meanwhile: the next lookup loads a newer one
+                if self._sites is not None:
+                    self._install(sites, version, now)
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def _current(self) -> dict[str, SiteRedirects]:
+        now = time.monotonic()
+        sites = self._sites
+        if self._checked(sites, now):
+            return sites
+        version = cache.get(VERSION_KEY)
+        if self._fresh(version, now):
+            self._checked_at = now
+            return sites
+        if sites is None:
+            with self._lock:
+                if self._sites is None:
+                    self._install(self._load(), version, now)
+                return self._sites
+        with self._lock:
+            self._checked_at = now
+            if self._rebuilding:
+                return sites
+            self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild, args=(version, now), name="redirect-table", daemon=True
+        ).start()
+        return sites
+
+    def for_site(self, site: str) -> SiteRedirects:
+        return self._current().get(site) or SiteRedirects([])
+
+    def resolve(self, site: str, path: str):
+        return self.for_site(site).resolve(path)
+
+    async def aresolve(self, site: str, path: str):
+        sites = self._sites
+        if not self._checked(sites, time.monotonic()):
+            # the version check (cache) and the first load (database) block
+            return await sync_to_async(self.resolve)(site, path)
+        return (sites.get(site) or SiteRedirects([])).resolve(path)
+
+    def invalidate(self) -> None:
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+        # this process does not wait for the next cache read
+        self._sites = None
+
+
+redirect_table = RedirectTable()
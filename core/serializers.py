@@ -24,7 +24,8 @@ class NavigationMenuSerializer(serializers.ModelSerializer):
         fields = ("id", "site", "slug", "items")
 
     def get_items(self, obj: NavigationMenu):
-        items = list(getattr(obj, "_prefetched_items", None) or obj.items.all())
+        items = getattr(obj, "_prefetched_items", None)
+        items = list(obj.items.all() if items is None else items)
         children_map: Dict[str | None, List[NavigationItem]] = {}
         for it in items:
             children_map.setdefault(it.parent_id, []).append(it)
@@ -0,0 +1,78 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .cache import navigation_cache, settings_cache
+from .images import queue_derivatives
+from .media import extract_metadata, is_new_upload, reuse_existing_file
+from .models import MediaAsset, NavigationMenu, NavigationItem, Redirect, Setting
+from .redirects import redirect_table
+
+logger = logging.getLogger(__name__)
+
+def invalidate_after_commit(response_cache, keys) -> None:
+    # after commit: invalidating earlier lets a concurrent read cache the old
+    # rows again before the write is visible
+    keys = set(keys)
+    transaction.on_commit(lambda: [response_cache.invalidate(*key) for key in keys])
+
+def _menu_keys(menu_ids):
+    return NavigationMenu.objects.filter(pk__in=menu_ids).values_list("site", "slug")
+
+@receiver(pre_save, sender=NavigationMenu)
+def remember_menu_key(sender, instance: NavigationMenu, **kwargs):
+    # a renamed (or moved) menu must also drop the entries of its old slug
+    instance._previous_keys = [] if instance._state.adding else list(_menu_keys([instance.pk]))
+
+@receiver(post_save, sender=NavigationMenu)
+@receiver(post_delete, sender=NavigationMenu)
+def invalidate_menu_cache(sender, instance: NavigationMenu, **kwargs):
+    keys = [(instance.site, instance.slug), *getattr(instance, "_previous_keys", ())]
+    invalidate_after_commit(navigation_cache, keys)
+
+@receiver(pre_save, sender=NavigationItem)
+def remember_item_menu(sender, instance: NavigationItem, **kwargs):
+    instance._previous_menu_id = (
+        None if instance._state.adding
+        else NavigationItem.objects.filter(pk=instance.pk).values_list("menu_id", flat=True).first()
+    )
+
+@receiver(post_save, sender=NavigationItem)
+@receiver(post_delete, sender=NavigationItem)
+def invalidate_menu_item_cache(sender, instance: NavigationItem, **kwargs):
+    menu_ids = {instance.menu_id, getattr(instance, "_previous_menu_id", None)} - {None}
+    invalidate_after_commit(navigation_cache, _menu_keys(menu_ids))
+
+@receiver(post_save, sender=Setting)
+@receiver(post_delete, sender=Setting)
+def invalidate_settings_cache(sender, instance: Setting, **kwargs):
+    invalidate_after_commit(settings_cache, [(instance.site,)])
+
+@receiver(post_save, sender=Redirect)
+@receiver(post_delete, sender=Redirect)
+def rebuild_redirect_table(sender, instance: Redirect, **kwargs):
+    # after commit, so no process rebuilds from rows that may still roll back
+    transaction.on_commit(redirect_table.invalidate)
+
+@receiver(pre_save, sender=MediaAsset)
+def prepare_media_asset(sender, instance: MediaAsset, **kwargs):
+    if not instance._state.adding:
+        old_name = MediaAsset.objects.filter(pk=instance.pk).values_list("file", flat=True).first()
+        if old_name is not None and old_name != instance.file.name:
+            instance.checksum, instance.derivatives, instance.lqip = "", [], ""
+    new_upload = is_new_upload(instance)
+    if new_upload or (instance.file and not instance.checksum):
+        try:
+            extract_metadata(instance)
+        except OSError:
+            logger.warning("media: could not read %s", instance.file.name)
+            return
+        if new_upload:
+            # runs before FileField.pre_save, so a duplicate is never written
+            reuse_existing_file(instance)
+
+@receiver(post_save, sender=MediaAsset)
+def build_derivatives_on_upload(sender, instance: MediaAsset, **kwargs):
+    if instance.kind == "image" and instance.file and not instance.derivatives:
+        queue_derivatives(instance)
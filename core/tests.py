@@ -1,3 +1,502 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import logging
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import ConnectionHandler
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+
+from . import compression, db, images, redirects
+from .cache import navigation_cache
+from .metrics import registry
+from .middleware import RedirectMiddleware
+from .models import Author, MediaAsset, NavigationMenu, NavigationItem, Redirect, Setting
+from .redirects import RedirectTable, redirect_table
+
+
+class SiteResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.menu = NavigationMenu.objects.create(site="amare", slug="main")
+        NavigationItem.objects.create(menu=self.menu, label="Home", url="/")
+
+    def test_navigation_hit_skips_database_and_is_invalidated_on_item_save(self):
+        url = "/api/v1/navigation/"
+        self.assertEqual(self.client.get(url, {"site": "amare"})["X-Cache"], "MISS")
+        hits = navigation_cache.hits
+        with self.assertNumQueries(0):
+            resp = self.client.get(url, {"site": "amare"})
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertEqual(navigation_cache.hits, hits + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NavigationItem.objects.create(menu=self.menu, label="Blog", url="/blog")
+        resp = self.client.get(url, {"site": "amare"})
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(len(resp.json()[0]["items"]), 2)
+
+    def test_renamed_menu_drops_old_slug_after_commit(self):
+        url = "/api/v1/navigation/"
+        self.assertEqual(self.client.get(url, {"site": "amare", "slug": "main"})["X-Cache"], "MISS")
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.menu.slug = "primary"
+            self.menu.save()
+        # nothing is dropped before commit, so a concurrent read can't re-cache the old rows
+        self.assertEqual(self.client.get(url, {"site": "amare", "slug": "main"})["X-Cache"], "HIT")
+        for callback in callbacks:
+            callback()
+        resp = self.client.get(url, {"site": "amare", "slug": "main"})
+        self.assertEqual((resp["X-Cache"], resp.json()), ("MISS", []))
+
+    def test_settings_invalidated_on_delete(self):
+        row = Setting.objects.create(site="amare", key="site_title", value="Amare")
+        url = "/api/v1/settings/"
+        self.assertEqual(self.client.get(url, {"site": "amare"}).json()["settings"]["site_title"], "Amare")
+        with self.captureOnCommitCallbacks(execute=True):
+            row.delete()
+        resp = self.client.get(url, {"site": "amare"})
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.json()["settings"]["site_title"], "Amare Teklay")
+
+
+    def test_cached_responses_answer_conditional_requests(self):
+        Setting.objects.create(site="amare", key="site_title", value="Amare")
+        etags = {}
+        for url in ("/api/v1/navigation/", "/api/v1/settings/"):
+            with self.subTest(url=url):
+                etags[url] = self.client.get(url, {"site": "amare"})["ETag"]
+                with self.assertNumQueries(0):
+                    resp = self.client.get(url, {"site": "amare"}, headers={"if-none-match": etags[url]})
+                self.assertEqual(resp.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            NavigationItem.objects.create(menu=self.menu, label="Blog", url="/blog")
+            Setting.objects.filter(key="site_title").get().save()
+        for url, etag in etags.items():
+            resp = self.client.get(url, {"site": "amare"}, headers={"if-none-match": etag})
+            self.assertEqual(resp.status_code, 200)
+
+
+class RedirectTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        redirect_table.invalidate()
+        Redirect.objects.bulk_create([
+            Redirect(site="amare", source_path="/old-about/", target_url="/about", http_status=301),
+            Redirect(site="amare", source_path="/blog/*", target_url="/posts/*", http_status=302),
+            Redirect(site="amare", source_path="/blog/2019/*", target_url="/archive/2019", http_status=308),
+            Redirect(site="adapticus", source_path="/old-about", target_url="/elsewhere"),
+        ])
+
+    def test_exact_rules_and_longest_prefix(self):
+        table = RedirectTable()
+        self.assertEqual(table.resolve("amare", "/old-about")[1], "/about")
+        self.assertEqual(table.resolve("amare", "/blog/2024/notes/")[1], "/posts/2024/notes")
+        self.assertEqual(table.resolve("amare", "/blog/2019/x")[1], "/archive/2019")
+        self.assertEqual(table.resolve("amare", "/blog")[1], "/posts/")
+        self.assertIsNone(table.resolve("amare", "/blogs/x"))
+        self.assertIsNone(table.resolve("salon", "/old-about"))
+
+    @override_settings(ALLOWED_HOSTS=["localhost", ".amareteklay.com", "homoadapticus.com"])
+    def test_middleware_answers_site_hosts_without_queries(self):
+        self.client.get("/old-about", headers={"host": "amareteklay.com"})  # builds the table
+        with self.assertNumQueries(0):
+            resp = self.client.get("/blog/2019/x", headers={"host": "www.amareteklay.com"})
+        self.assertEqual((resp.status_code, resp["Location"]), (308, "/archive/2019"))
+        resp = self.client.get("/old-about", headers={"host": "homoadapticus.com"})
+        self.assertEqual((resp.status_code, resp["Location"]), (301, "/elsewhere"))
+        self.assertEqual(self.client.get("/old-about", headers={"host": "localhost"}).status_code, 404)
+
+    def _rebuild(self, thread):
+        """Run the background rebuild started through the patched Thread here."""
+        thread.assert_called_once()
+        with mock.patch.object(redirects, "connections"):  # the test's own connection stays open
+            thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+
+    @override_settings(REDIRECTS_RECHECK_SECONDS=0)
+    def test_other_processes_follow_the_cache_version(self):
+        other = RedirectTable()  # another worker's table
+        self.assertIsNone(other.resolve("amare", "/new"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Redirect.objects.create(site="amare", source_path="/new", target_url="/newer")
+        self.assertEqual(redirect_table.resolve("amare", "/new")[1], "/newer")
+        with mock.patch.object(redirects.threading, "Thread") as thread:
+            self.assertIsNone(other.resolve("amare", "/new"))  # stale until rebuilt
+        self._rebuild(thread)
+        self.assertEqual(other.resolve("amare", "/new")[1], "/newer")
+
+    def test_tables_expire_without_a_shared_cache(self):
+        other = RedirectTable()
+        self.assertIsNone(other.resolve("amare", "/new"))
+        Redirect.objects.create(site="amare", source_path="/new", target_url="/newer")
+        with override_settings(REDIRECTS_RECHECK_SECONDS=0):
+            self.assertIsNone(other.resolve("amare", "/new"))  # no version bump seen
+            with override_settings(REDIRECTS_MAX_AGE=0), \
+                    mock.patch.object(redirects.threading, "Thread") as thread, \
+                    self.assertNumQueries(0):
+                # the expired table keeps answering; one rebuild runs at a time
+                self.assertIsNone(other.resolve("amare", "/new"))
+                self.assertIsNone(other.resolve("amare", "/new"))
+            self._rebuild(thread)
+            self.assertEqual(other.resolve("amare", "/new")[1], "/newer")
+
+class MediaDerivativeTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        conf = {"widths": (320, 640, 1920), "formats": ("webp", "jpeg"), "workers": 0}
+        overrides = override_settings(MEDIA_ROOT=self.media.name, IMAGE_DERIVATIVES=conf)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def _upload(self, name):
+        buffer = io.BytesIO()
+        Image.new("RGB", (1000, 500), (200, 30, 30)).save(buffer, "PNG")
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = MediaAsset.objects.create(file=SimpleUploadedFile(name, buffer.getvalue()))
+        asset.refresh_from_db()
+        return asset
+
+    def test_upload_renders_width_buckets_and_lqip(self):
+        asset = self._upload("hero.png")
+        self.assertEqual(
+            [(d["format"], d["width"], d["height"]) for d in asset.derivatives],
+            [("webp", 320, 160), ("jpeg", 320, 160), ("webp", 640, 320), ("jpeg", 640, 320),
+             ("webp", 1000, 500), ("jpeg", 1000, 500)],
+        )
+        self.assertTrue(asset.lqip.startswith("data:image/"))
+        for d in asset.derivatives:
+            self.assertTrue((Path(self.media.name) / d["path"]).exists())
+
+        # a rebuild is a change of the asset: ETags built on updated_at must move
+        before = asset.updated_at
+        self.assertEqual(images.build_derivatives([asset], workers=0), 1)
+        asset.refresh_from_db()
+        self.assertGreater(asset.updated_at, before)
+
+    def test_identical_uploads_share_one_file(self):
+        first, second = self._upload("a.png"), self._upload("b.png")
+        self.assertEqual((second.width, second.height), (1000, 500))
+        self.assertEqual(first.checksum, second.checksum)
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(first.derivatives, second.derivatives)
+        self.assertEqual(sorted(p.name for p in (Path(self.media.name) / "media").iterdir()), ["a.png"])
+
+    def test_dedupe_moves_etag_state_of_assets_and_references(self):
+        first, second = self._upload("a.png"), self._upload("b.png")
+        media = Path(self.media.name)
+        (media / "media" / "copy.png").write_bytes((media / first.file.name).read_bytes())
+        MediaAsset.objects.filter(pk=second.pk).update(file="media/copy.png")
+        author = Author.objects.create(name="Amare", slug="amare", avatar=second)
+        before = {"second": MediaAsset.objects.get(pk=second.pk).updated_at, "first": first.updated_at,
+                  "author": author.updated_at}
+
+        call_command("dedupe_media", "--merge-rows", stdout=io.StringIO())
+        author.refresh_from_db()
+        first.refresh_from_db()
+        self.assertEqual(author.avatar_id, first.pk)
+        self.assertFalse((media / "media" / "copy.png").exists())
+        self.assertGreater(author.updated_at, before["author"])
+        self.assertGreater(first.updated_at, before["first"])
+
+    def test_dedupe_shared_file_bumps_the_asset(self):
+        first, second = self._upload("a.png"), self._upload("b.png")
+        media = Path(self.media.name)
+        (media / "media" / "copy.png").write_bytes((media / first.file.name).read_bytes())
+        MediaAsset.objects.filter(pk=second.pk).update(file="media/copy.png")
+        before = MediaAsset.objects.get(pk=second.pk).updated_at
+
+        call_command("dedupe_media", stdout=io.StringIO())
+        second.refresh_from_db()
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertGreater(second.updated_at, before)
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        Setting.objects.create(site="amare", key="site_title", value="Amare")
+
+    def test_server_timing_and_prometheus_summary(self):
+        resp = self.client.get("/api/v1/settings/", {"site": "amare"})
+        timing = resp["Server-Timing"]
+        self.assertIn("app;dur=", timing)
+        self.assertIn("db;dur=", timing)
+
+        self.assertEqual(self.client.get("/api/v1/_metrics").status_code, 401)
+        self.client.force_login(User.objects.create_user("staff", password="x", is_staff=True))
+        body = self.client.get("/api/v1/_metrics").content.decode()
+        self.assertIn('adapticus_request_duration_seconds{view="settings-list",quantile="0.95"}', body)
+        self.assertIn('adapticus_sql_queries_count{view="settings-list"} 1', body)
+        self.assertIn("# TYPE adapticus_response_cache_misses_total counter", body)
+        self.assertIn('adapticus_response_cache_misses_total{cache="settings"} ', body)
+        self.assertIn("# TYPE adapticus_response_cache_hit_ratio gauge", body)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled_middleware_adds_nothing(self):
+        resp = self.client.get("/api/v1/settings/", {"site": "amare"})
+        self.assertFalse(resp.has_header("Server-Timing"))
+
+
+class CompressionTests(TestCase):
+    url = "/api/v1/navigation/"
+
+    def setUp(self):
+        cache.clear()
+        menu = NavigationMenu.objects.create(site="amare", slug="main")
+        NavigationItem.objects.bulk_create([
+            NavigationItem(menu=menu, label=f"Item {i}", url=f"/item-{i}", order=i) for i in range(40)
+        ])
+
+    def get(self, **params):
+        return self.client.get(self.url, {"site": "amare", **params}, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate("gzip;q=0.5, br", ("br", "gzip")), "br")
+        self.assertEqual(compression.negotiate("br;q=0, *", ("br", "gzip")), "gzip")
+        self.assertIsNone(compression.negotiate("identity", ("br", "gzip")))
+        self.assertIsNone(compression.negotiate("gzip;q=0", ("gzip",)))
+
+    def test_compressed_once_per_version(self):
+        plain = self.client.get(self.url, {"site": "amare"})
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as spy:
+            first, second = self.get(), self.get()
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(second.content), plain.content)
+        self.assertEqual(first["ETag"], f"W/{plain['ETag']}")
+        self.assertEqual(
+            self.client.get(self.url, {"site": "amare"}, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304
+        )
+
+    def test_cache_follows_the_body_not_the_etag(self):
+        middleware = compression.CompressionMiddleware(lambda request: None)
+        for body in (b"Author 1 " * 300, b"RENAMED " * 300):
+            response = HttpResponse(body, headers={"ETag": '"same"'})
+            self.assertEqual(gzip.decompress(middleware._compressed(response, body, "gzip")), body)
+
+    def test_small_responses_are_not_compressed(self):
+        with self.settings(API_COMPRESSION_MIN_SIZE=10**6):
+            self.assertFalse(self.get().has_header("Content-Encoding"))
+
+    def test_large_responses_are_streamed(self):
+        with self.settings(API_COMPRESSION_STREAM_SIZE=100):
+            resp = self.get()
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(resp.streaming_content)),
+            self.client.get(self.url, {"site": "amare"}).content,
+        )
+
+
+class DatabaseConfigTests(TestCase):
+    def test_sqlite_default_and_replica_file(self):
+        dbs = db.databases_from_env(Path("/srv"), {"DB_REPLICA_NAME": "/srv/replica.sqlite3"})
+        self.assertEqual(dbs["default"]["NAME"], Path("/srv/db.sqlite3"))
+        # a connection must not rewrite the file's journal mode; `manage.py sqlite_wal` does that
+        self.assertNotIn("journal_mode", dbs["default"]["OPTIONS"]["init_command"])
+        self.assertEqual(dbs["replica"]["NAME"], "/srv/replica.sqlite3")
+        self.assertEqual(dbs["replica"]["TEST"], {"MIRROR": "default"})
+
+    def test_wal_is_switched_on_by_the_command_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "wal.sqlite3"
+            handler = ConnectionHandler({"default": db.sqlite_database(path)})
+            with mock.patch("core.management.commands.sqlite_wal.connections", handler):
+                with handler["default"].cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "delete")
+                out = io.StringIO()
+                call_command("sqlite_wal", stdout=out)
+            handler.close_all()
+            self.assertEqual(out.getvalue(), "default: WAL\n")
+            self.assertEqual(path.read_bytes()[18:20], b"\x02\x02")  # WAL in the file header
+
+    def test_postgres_pooling(self):
+        env = {"DB_ENGINE": "postgres", "DB_HOST": "primary", "DB_REPLICA_HOST": "replica"}
+        dbs = db.databases_from_env(Path("/srv"), env)
+        self.assertEqual(dbs["default"]["CONN_MAX_AGE"], 60)
+        self.assertTrue(dbs["default"]["CONN_HEALTH_CHECKS"])
+        self.assertEqual(dbs["replica"]["HOST"], "replica")
+
+        pooled = db.databases_from_env(Path("/srv"), {**env, "DB_POOL": "psycopg"})["default"]
+        self.assertEqual(pooled["CONN_MAX_AGE"], 0)
+        self.assertIn("pool", pooled["OPTIONS"])
+        bouncer = db.databases_from_env(Path("/srv"), {**env, "DB_POOL": "pgbouncer"})["default"]
+        self.assertTrue(bouncer["DISABLE_SERVER_SIDE_CURSORS"])
+
+
+@override_settings(DATABASE_REPLICA_PIN_SECONDS=10)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = db.PrimaryReplicaRouter(replica="replica")
+        patcher = mock.patch.object(db, "has_replica", return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_replica_reads_blocks_use_the_replica(self):
+        self.assertIsNone(self.router.db_for_read(Setting))
+        with db.replica_reads():
+            self.assertEqual(self.router.db_for_read(Setting), "replica")
+
+    def test_write_pins_reads_to_primary(self):
+        with db.replica_reads():
+            self.assertEqual(self.router.db_for_write(Setting), "default")
+            self.assertIsNone(self.router.db_for_read(Setting))  # read back what this block wrote
+        with db.replica_reads():
+            self.assertEqual(self.router.db_for_read(Setting), "replica")  # no client to pin
+
+    def _request(self, writes=(), cookie=None):
+        def view(request):
+            for model in writes:
+                self.router.db_for_write(model)
+            with db.replica_reads():
+                return HttpResponse(self.router.db_for_read(Setting) or "default")
+
+        request = RequestFactory().get("/")
+        if cookie is not None:
+            request.COOKIES[db.PIN_COOKIE] = cookie
+        return db.PrimaryPinMiddleware(view)(request)
+
+    def test_only_the_writing_client_is_pinned(self):
+        from django.contrib.sessions.models import Session
+
+        self.assertEqual(self._request().content, b"replica")
+        incidental = self._request(writes=[Session, User])  # session save, last_login
+        self.assertEqual((incidental.content, incidental.cookies.get(db.PIN_COOKIE)), (b"replica", None))
+
+        wrote = self._request(writes=[Setting])
+        self.assertEqual(wrote.content, b"default")
+        cookie = wrote.cookies[db.PIN_COOKIE].value
+        self.assertEqual(self._request(cookie=cookie).content, b"default")  # the editor's next read
+        self.assertEqual(self._request().content, b"replica")  # everybody else
+        later = db.time.time() + 11
+        with mock.patch.object(db.time, "time", return_value=later):
+            self.assertEqual(self._request(cookie=cookie).content, b"replica")
+        self.assertEqual(self._request(cookie="junk").content, b"replica")
+
+    async def test_async_writes_pin_the_client(self):
+        async def view(request):
+            await sync_to_async(self.router.db_for_write)(Setting)  # the ORM's thread
+            return HttpResponse()
+
+        resp = await db.PrimaryPinMiddleware(view)(RequestFactory().get("/"))
+        self.assertIn(db.PIN_COOKIE, resp.cookies)
+
+WSGI_MIDDLEWARE = list(settings.MIDDLEWARE)
+ASYNC_MIDDLEWARE = [m for m in WSGI_MIDDLEWARE if m != "whitenoise.middleware.WhiteNoiseMiddleware"]
+
+
+@override_settings(MIDDLEWARE=ASYNC_MIDDLEWARE, METRICS_ENABLED=True)
+class AsyncMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        redirect_table.invalidate()
+        Redirect.objects.create(site="amare", source_path="/old-about", target_url="/about", http_status=301)
+        menu = NavigationMenu.objects.create(site="amare", slug="main")
+        NavigationItem.objects.bulk_create([
+            NavigationItem(menu=menu, label=f"Item {i}", url=f"/item-{i}", order=i) for i in range(40)
+        ])
+
+    @override_settings(DEBUG=True)  # Django only logs the sync/async adaptations under DEBUG
+    def test_asgi_chain_needs_no_thread_hops(self):
+        def adapted(middleware):
+            with override_settings(MIDDLEWARE=middleware), self.assertLogs("django.request", "DEBUG") as logs:
+                logging.getLogger("django.request").debug("loading")
+                ASGIHandler()
+            return [line for line in logs.output if "handler adapted" in line]
+
+        self.assertEqual(adapted(ASYNC_MIDDLEWARE), [])
+        self.assertTrue(any("WhiteNoiseMiddleware" in line for line in adapted(WSGI_MIDDLEWARE)))
+
+    async def test_async_requests_are_compressed_and_timed(self):
+        resp = await self.async_client.get("/api/v1/navigation/", {"site": "amare"},
+                                           headers={"accept-encoding": "gzip"})
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(resp.content))[0]["slug"], "main")
+        self.assertIn("app;dur=", resp["Server-Timing"])
+
+    @override_settings(ALLOWED_HOSTS=["amareteklay.com"])
+    async def test_async_redirects_are_answered_from_memory(self):
+        async def view(request):
+            return HttpResponse("view")
+
+        middleware = RedirectMiddleware(view)
+        request = RequestFactory().get("/old-about", HTTP_HOST="amareteklay.com")
+        resp = await middleware(request)
+        self.assertEqual((resp.status_code, resp["Location"]), (301, "/about"))
+        with mock.patch.object(redirects, "sync_to_async") as thread_hop:
+            resp = await middleware(request)
+            other = await middleware(RequestFactory().get("/about", HTTP_HOST="amareteklay.com"))
+        self.assertEqual((resp.status_code, other.content), (301, b"view"))
+        thread_hop.assert_not_called()
+
+    async def test_async_streaming_responses_are_compressed(self):
+        async def chunks():
+            for _ in range(100):
+                yield b"chunk " * 20
+
+        async def view(request):
+            return StreamingHttpResponse(chunks())
+
+        middleware = compression.CompressionMiddleware(view)
+        request = RequestFactory().get("/api/v1/stream/", HTTP_ACCEPT_ENCODING="gzip")
+        resp = await middleware(request)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        self.assertEqual(gzip.decompress(body), b"chunk " * 2000)
+
+
+@override_settings(ROOT_URLCONF="adapticus.urls_async")
+class AsyncSiteViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        menu = NavigationMenu.objects.create(site="amare", slug="main")
+        parent = NavigationItem.objects.create(menu=menu, label="About", url="/about", order=1)
+        NavigationItem.objects.create(menu=menu, label="Team", url="/about/team", order=0, parent=parent)
+        NavigationMenu.objects.create(site="amare", slug="footer")
+        Setting.objects.create(site="amare", key="site_title", value="Amare")
+
+    async def test_site_view_fills_the_navigation_and_settings_caches(self):
+        resp = await self.async_client.get("/api/v1/site/", {"site": "amare"})
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual([m["slug"] for m in data["navigation"]], ["footer", "main"])
+        self.assertEqual(data["navigation"][1]["items"][0]["children_list"][0]["label"], "Team")
+
+        navigation = await self.async_client.get("/api/v1/navigation/", {"site": "amare"})
+        settings = await self.async_client.get("/api/v1/settings/", {"site": "amare"})
+        self.assertEqual((navigation["X-Cache"], settings["X-Cache"]), ("HIT", "HIT"))
+        self.assertEqual(navigation.json(), data["navigation"])
+        self.assertEqual(settings.json(), {"site": "amare", "settings": data["settings"]})
+
+        bad = await self.async_client.get("/api/v1/site/", {"site": "nope"})
+        self.assertEqual(bad.status_code, 400)
+
+    async def test_navigation_and_settings_match_the_drf_views(self):
+        for url in ("/api/v1/navigation/?site=amare", "/api/v1/navigation/?site=amare&slug=main",
+                    "/api/v1/settings/?site=amare", "/api/v1/settings/?site=nope"):
+            await sync_to_async(cache.clear)()
+            with override_settings(ROOT_URLCONF="adapticus.urls"):
+                drf = await sync_to_async(self.client.get)(url)
+            await sync_to_async(cache.clear)()
+            resp = await self.async_client.get(url)
+            self.assertEqual((resp.status_code, resp.content), (drf.status_code, drf.content), url)
+            self.assertEqual(resp.get("ETag"), drf.get("ETag"), url)
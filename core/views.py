@@ -2,14 +2,25 @@
 from __future__ import annotations
 
 from typing import Optional
+
+from django.http import HttpResponse
 from rest_framework import viewsets, mixins
-from rest_framework.permissions import AllowAny
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from .models import NavigationMenu, Setting
+from .cache import SiteResponseCache, archive_cache, navigation_cache, settings_cache
+from .db import ReplicaReadMixin
+from .metrics import prometheus_text
+from .models import NavigationMenu, NavigationItem, Setting
+from .redirects import redirect_table
 from .serializers import NavigationMenuSerializer, SiteSettingsSerializer
-from content.utils import request_site
+from content.conditional import ConditionalGetMixin, merge_states, queryset_state
+from content.utils import request_lang, request_site
 
 
 SITE_PARAM = OpenApiParameter(
@@ -20,6 +31,14 @@ SITE_PARAM = OpenApiParameter(
     type=str,
 )
 
+PATH_PARAM = OpenApiParameter(
+    name="path",
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description="Resolve a single path (e.g. '/old-about') instead of exporting every rule.",
+    type=str,
+)
+
 SLUG_PARAM = OpenApiParameter(
     name="slug",
     location=OpenApiParameter.QUERY,
@@ -29,10 +48,51 @@ SLUG_PARAM = OpenApiParameter(
 )
 
 
+class SiteCachedMixin(ConditionalGetMixin):
+    """
+    Serves list() from a SiteResponseCache keyed by (site, ?slug, lang).
+    The entry also holds the ETag/Last-Modified, so a hit (200 or 304)
+    never touches the database. X-Cache reports HIT / MISS.
+    """
+    response_cache: SiteResponseCache
+    cache_slug_param: Optional[str] = None
+
+    def _cache_args(self):
+        slug = self.request.query_params.get(self.cache_slug_param) if self.cache_slug_param else None
+        return request_site(self.request), slug, request_lang(self.request)
+
+    def get_validators(self, request):
+        site, slug, lang = self._cache_args()
+        self._cached_entry = self.response_cache.get(site, slug, lang) if site else None
+        if self._cached_entry is not None:
+            return self._cached_entry["validators"]
+        return super().get_validators(request)
+
+    def cached_response(self) -> Optional[Response]:
+        entry = getattr(self, "_cached_entry", None)
+        if entry is None:
+            return None
+        response = Response(entry["data"])
+        response["X-Cache"] = "HIT"
+        return response
+
+    def store_response(self, response: Response) -> Response:
+        site, slug, lang = self._cache_args()
+        if site and response.status_code == 200:
+            self.response_cache.set(site, slug, lang, {
+                "data": response.data,
+                "validators": getattr(self, "_conditional_validators", None),
+            })
+        response["X-Cache"] = "MISS"
+        return response
+
+
 @extend_schema(parameters=[SITE_PARAM, SLUG_PARAM])
-class NavigationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class NavigationViewSet(ReplicaReadMixin, SiteCachedMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     permission_classes = [AllowAny]
     serializer_class = NavigationMenuSerializer
+    response_cache = navigation_cache
+    cache_slug_param = "slug"
 
     def get_queryset(self):
         qs = NavigationMenu.objects.all()
@@ -45,18 +105,28 @@ class NavigationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
             qs = qs.filter(slug=slug)
         return qs
 
+    def conditional_querysets(self):
+        menus = self.get_queryset()
+        return menus, NavigationItem.objects.filter(menu__in=menus)
+
+    def get_conditional_state(self):
+        return merge_states(*(queryset_state(qs) for qs in self.conditional_querysets()))
+
     def list(self, request, *args, **kwargs):
+        cached = self.cached_response()
+        if cached is not None:
+            return cached
         qs = self.get_queryset().order_by("slug").prefetch_related("items")
         menus = list(qs)
         for m in menus:
             items = list(m.items.all().order_by("order", "created_at", "id"))
             setattr(m, "_prefetched_items", items)
         ser = self.get_serializer(menus, many=True)
-        return Response(ser.data)
+        return self.store_response(Response(ser.data))
 
 
 @extend_schema(parameters=[SITE_PARAM])
-class SettingsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class SettingsViewSet(ReplicaReadMixin, SiteCachedMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     GET /api/v1/settings/?site=amare
     returns:
@@ -66,11 +136,70 @@ class SettingsViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     }
     """
     permission_classes = [AllowAny]
+    response_cache = settings_cache
+
+    def get_conditional_state(self):
+        site = request_site(self.request)
+        if not site:
+            return None
+        return queryset_state(Setting.objects.filter(site=site))
 
     def list(self, request, *args, **kwargs):
         site = request_site(request)
         if not site:
             return Response({"detail": "Missing or invalid ?site parameter."}, status=400)
+        cached = self.cached_response()
+        if cached is not None:
+            return cached
         qs = Setting.objects.filter(site=site)
         ser = SiteSettingsSerializer.from_queryset(site, qs)
-        return Response(ser.data)
+        return self.store_response(Response(ser.data))
+
+
+@extend_schema(parameters=[SITE_PARAM, PATH_PARAM])
+class RedirectViewSet(viewsets.ViewSet):
+    """
+    GET /api/v1/redirects/?site=amare                 -> all rules for the site
+    GET /api/v1/redirects/?site=amare&path=/old-about -> {"source_path", "target_url", "http_status"}
+    Served from the in-memory table in core.redirects (no queries).
+    """
+    permission_classes = [AllowAny]
+
+    def list(self, request, *args, **kwargs):
+        site = request_site(request)
+        if not site:
+            return Response({"detail": "Missing or invalid ?site parameter."}, status=400)
+        table = redirect_table.for_site(site)
+        path = request.query_params.get("path")
+        if path is None:
+            return Response({"site": site, "redirects": [r.as_dict() for r in table.rules]})
+        match = table.resolve(path)
+        if match is None:
+            raise NotFound("No redirect for this path.")
+        rule, target = match
+        return Response({"source_path": rule.source_path, "target_url": target, "http_status": rule.http_status})
+
+
+class MetricsView(APIView):
+    """
+    GET /api/v1/_metrics  (staff only)
+    Rolling p50/p95/p99 per view from core.metrics plus the response-cache
+    counters, in Prometheus text format.
+    """
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+    schema = None
+
+    def get(self, request, *args, **kwargs):
+        # hits/misses only grow (per process): counters, so rate() works on them
+        counters = {"adapticus_response_cache_hits_total": {}, "adapticus_response_cache_misses_total": {}}
+        gauges = {"adapticus_response_cache_hit_ratio": {}}
+        for response_cache in (navigation_cache, settings_cache, archive_cache):
+            stats = response_cache.stats()
+            label = f'cache="{response_cache.prefix}"'
+            counters["adapticus_response_cache_hits_total"][label] = stats["hits"]
+            counters["adapticus_response_cache_misses_total"][label] = stats["misses"]
+            gauges["adapticus_response_cache_hit_ratio"][label] = stats["hit_ratio"]
+        return HttpResponse(
+            prometheus_text(counters, gauges), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
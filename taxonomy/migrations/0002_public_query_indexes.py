@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['site', 'parent', 'name'], name='category_site_parent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['site', 'name'], name='tag_site_name_idx'),
+        ),
+    ]
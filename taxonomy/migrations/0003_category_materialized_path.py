@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 14:17
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Category = apps.get_model("taxonomy", "Category")
+    rows = {pk: parent for pk, parent in Category.objects.values_list("pk", "parent_id")}
+    paths = {}
+
+    def path_of(pk):
+        if pk not in paths:
+            parent = rows[pk]
+            paths[pk] = (path_of(parent) if parent else "") + f"{pk.hex}/"
+        return paths[pk]
+
+    for pk in rows:
+        path = path_of(pk)
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count("/") - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0002_public_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
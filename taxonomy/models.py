@@ -1,5 +1,7 @@
 import uuid
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
 from core.models import TimeStamped, Site
 
 class Tag(TimeStamped):
@@ -10,6 +12,7 @@ class Tag(TimeStamped):
     description = models.CharField(max_length=200, blank=True, default="")
     class Meta:
         unique_together = [("site","slug")]
+        indexes = [models.Index(fields=["site","name"], name="tag_site_name_idx")]
 
 class Category(TimeStamped):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -18,5 +21,72 @@ class Category(TimeStamped):
     slug = models.SlugField(max_length=80)
     description = models.CharField(max_length=200, blank=True, default="")
     parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.CASCADE)
+    # materialized path: the hex ids of the ancestors and of this category,
+    # each followed by "/"; a subtree is one indexed lookup on path (subtree_q)
+    path = models.CharField(max_length=500, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(editable=False, default=0)
     class Meta:
         unique_together = [("site","slug")]
+        indexes = [
+            models.Index(fields=["site","parent","name"], name="category_site_parent_idx"),
+            models.Index(fields=["path"], name="category_path_idx", opclasses=["varchar_pattern_ops"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "parent" not in update_fields:
+            return super().save(*args, **kwargs)
+        parent_path = ""
+        if self.parent_id:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list("path", flat=True).get()
+            if self.pk.hex in parent_path.split("/"):
+                raise ValueError("A category cannot be moved below itself.")
+        old = Category.objects.filter(pk=self.pk).values_list("path", "depth").first()
+        self.path = f"{parent_path}{self.pk.hex}/"
+        self.depth = self.path.count("/") - 1
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "path", "depth"}
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old and old[0] and old[0] != self.path:
+                # re-root the whole subtree in one UPDATE
+                old_path, old_depth = old
+                Category.objects.filter(self.subtree_q(old_path)).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr("path", len(old_path) + 1)),
+                    depth=F("depth") + (self.depth - old_depth),
+                )
+
+    def ancestor_ids(self) -> list[uuid.UUID]:
+        return [uuid.UUID(h) for h in self.path.split("/")[:-2]]
+
+    def get_ancestors(self):
+        """Root first; one query by primary key."""
+        return Category.objects.filter(pk__in=self.ancestor_ids()).order_by("depth")
+
+    @staticmethod
+    def subtree_q(path: str, field: str = "path") -> Q:
+        """
+        Paths under `path` (itself included).
+
+        On SQLite a range, since LIKE 'path%' is not served from an index
+        there: ids are hex, so under SQLite's bytewise collation every such
+        path sorts below `path` with its trailing "/" -> "0". Elsewhere
+        LIKE 'path%', which category_path_idx (varchar_pattern_ops) serves
+        on PostgreSQL whatever the database collation; a range would depend
+        on that collation ordering "/" bytewise.
+        """
+        if not path:
+            return Q()
+        if connection.vendor == "sqlite":
+            return Q(**{f"{field}__gte": path, f"{field}__lt": path[:-1] + "0"})
+        return Q(**{f"{field}__startswith": path})
+
+    def get_descendants(self, include_self=False):
+        qs = Category.objects.filter(self.subtree_q(self.path))
+        return qs if include_self else qs.exclude(pk=self.pk)
+
+    def subtree_posts(self):
+        """Posts in this category or any subcategory."""
+        return self.posts.model.objects.filter(
+            pk__in=self.posts.through.objects.filter(self.subtree_q(self.path, "category__path")).values("post_id")
+        )
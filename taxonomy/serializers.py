@@ -0,0 +1,47 @@
+# taxonomy/serializers.py
+from __future__ import annotations
+
+from rest_framework import serializers
+
+from .models import Tag, Category
+
+
+class TagSerializer(serializers.ModelSerializer):
+    post_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Tag
+        fields = ("slug", "name", "description", "post_count")
+
+
+class CategoryNodeSerializer(serializers.ModelSerializer):
+    """
+    One category; `post_count` / `total_post_count` (this category plus its
+    subcategories) and `children` are attached by the view.
+    """
+    post_count = serializers.SerializerMethodField()
+    total_post_count = serializers.SerializerMethodField()
+    children = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Category
+        fields = ("slug", "name", "description", "depth", "post_count", "total_post_count", "children")
+
+    def get_post_count(self, obj: Category) -> int:
+        return self.context["post_counts"].get(obj.pk.hex, 0)
+
+    def get_total_post_count(self, obj: Category) -> int:
+        return self.context["total_post_counts"].get(obj.pk.hex, 0)
+
+    def get_children(self, obj: Category) -> list[dict]:
+        return CategoryNodeSerializer(obj._children, many=True, context=self.context).data
+
+
+class CategoryDetailSerializer(CategoryNodeSerializer):
+    ancestors = serializers.SerializerMethodField()
+
+    class Meta(CategoryNodeSerializer.Meta):
+        fields = CategoryNodeSerializer.Meta.fields + ("ancestors",)
+
+    def get_ancestors(self, obj: Category) -> list[dict]:
+        return [{"slug": c.slug, "name": c.name} for c in obj.get_ancestors()]
@@ -1,3 +1,64 @@
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from content.models import Post, PublishStatus
+from core.models import Author
+from .models import Category, Tag
+
+
+class CategoryTreeTests(TestCase):
+    def setUp(self):
+        self.root = Category.objects.create(site="amare", name="Root", slug="root")
+        self.child = Category.objects.create(site="amare", name="Child", slug="child", parent=self.root)
+        self.leaf = Category.objects.create(site="amare", name="Leaf", slug="leaf", parent=self.child)
+        self.other = Category.objects.create(site="amare", name="Other", slug="other")
+
+    def test_moving_a_category_reroots_its_subtree(self):
+        self.child.parent = self.other
+        self.child.save()
+        self.leaf.refresh_from_db()
+        self.assertTrue(self.leaf.path.startswith(self.other.path))
+        self.assertEqual(self.leaf.depth, 2)
+        self.assertEqual([c.slug for c in self.leaf.get_ancestors()], ["other", "child"])
+        self.assertFalse(self.root.get_descendants().exists())
+
+    def test_subtree_lookup_without_bytewise_ranges(self):
+        ranged = set(self.root.get_descendants(include_self=True))
+        self.assertEqual(ranged, {self.root, self.child, self.leaf})
+        # the LIKE form used on PostgreSQL, where pattern_ops serves it
+        with mock.patch("taxonomy.models.connection") as conn:
+            conn.vendor = "postgresql"
+            q = Category.subtree_q(self.root.path)
+            self.assertEqual(q.children, [("path__startswith", self.root.path)])
+            self.assertEqual(set(self.root.get_descendants(include_self=True)), ranged)
+
+    def test_cycles_are_rejected(self):
+        self.root.parent = self.leaf
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+    def test_tree_endpoint_counts_subtree_posts_once(self):
+        author = Author.objects.create(name="Amare", slug="amare")
+        tag = Tag.objects.create(site="amare", name="Tag", slug="tag")
+        for slug, categories in (("one", [self.child, self.leaf]), ("two", [self.root])):
+            post = Post.objects.create(site="amare", slug=slug, author=author, status=PublishStatus.PUBL)
+            post.categories.add(*categories)
+            post.tags.add(tag)
+        Post.objects.create(site="amare", slug="draft", author=author).categories.add(self.leaf)
+
+        with self.assertNumQueries(4):  # etag (2), categories, post links
+            tree = self.client.get("/api/v1/taxonomy/categories/", {"site": "amare"}).json()
+        root = next(node for node in tree if node["slug"] == "root")
+        self.assertEqual((root["post_count"], root["total_post_count"]), (1, 2))
+        child = root["children"][0]
+        self.assertEqual((child["post_count"], child["total_post_count"]), (1, 1))
+        self.assertEqual(child["children"][0]["slug"], "leaf")
+
+        detail = self.client.get("/api/v1/taxonomy/categories/leaf/", {"site": "amare"}).json()
+        self.assertEqual([a["slug"] for a in detail["ancestors"]], ["root", "child"])
+        self.assertEqual(list(self.root.subtree_posts().order_by("slug").values_list("slug", flat=True)),
+                         ["draft", "one", "two"])
+
+        tags = self.client.get("/api/v1/taxonomy/tags/", {"site": "amare"}).json()
+        self.assertEqual(tags, [{"slug": "tag", "name": "Tag", "description": "", "post_count": 2}])
@@ -1,3 +1,145 @@
-from django.shortcuts import render
+# taxonomy/views.py
+from __future__ import annotations
 
-# Create your views here.
+from collections import Counter
+
+from django.db.models import Count, Q
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework import viewsets, mixins
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.db import ReplicaReadMixin
+from content.conditional import ConditionalGetMixin, queryset_state
+from content.models import Post, PublishStatus
+from content.utils import request_site
+from .models import Tag, Category
+from .serializers import TagSerializer, CategoryNodeSerializer, CategoryDetailSerializer
+
+
+SITE_PARAM = OpenApiParameter(
+    name="site",
+    location=OpenApiParameter.QUERY,
+    required=False,
+    description="Filter by site: amare | adapticus.",
+    type=str,
+)
+
+
+def _public_posts(site):
+    return Post.objects.filter(site=site, status=PublishStatus.PUBL, unlisted=False)
+
+
+def _combined_state(*querysets):
+    states = [queryset_state(qs) for qs in querysets]
+    stamps = [last for _, last in states if last]
+    return sum(n for n, _ in states), max(stamps) if stamps else None
+
+
+def category_post_counts(site, path_prefix=""):
+    """
+    ({category hex: direct count}, {category hex: subtree count}) of the
+    site's public posts, from one query over the post/category links. A post
+    in two sibling categories counts once for their common ancestors.
+    """
+    links = Post.categories.through.objects.filter(
+        Category.subtree_q(path_prefix, "category__path"), post__in=_public_posts(site)
+    ).values_list("post_id", "category__path")
+    direct, per_post = Counter(), {}
+    for post_id, path in links:
+        ids = path.split("/")[:-1]
+        direct[ids[-1]] += 1
+        per_post.setdefault(post_id, set()).update(ids)
+    total = Counter(i for ids in per_post.values() for i in ids)
+    return direct, total
+
+
+def build_tree(categories, roots=None):
+    """Link categories into `_children` lists; returns the roots (sorted by name)."""
+    categories = sorted(categories, key=lambda c: c.name.lower())
+    by_id = {c.pk: c for c in categories}
+    for c in categories:
+        c._children = []
+    top = []
+    for c in categories:
+        if roots is not None and c.pk in roots:
+            top.append(c)
+        elif c.parent_id in by_id:
+            by_id[c.parent_id]._children.append(c)
+        elif roots is None and c.parent_id is None:
+            top.append(c)
+    return top
+
+
+@extend_schema(parameters=[SITE_PARAM])
+class TagViewSet(ReplicaReadMixin, ConditionalGetMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    GET /api/v1/taxonomy/tags/?site=amare
+    Every active tag with the number of published posts using it (one grouped query).
+    """
+    permission_classes = [AllowAny]
+    serializer_class = TagSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        site = request_site(self.request)
+        if not site:
+            return Tag.objects.none()
+        public = Q(posts__status=PublishStatus.PUBL, posts__unlisted=False)
+        return (
+            Tag.objects.filter(site=site, is_active=True)
+            .annotate(post_count=Count("posts", filter=public, distinct=True))
+            .order_by("name")
+        )
+
+    def get_conditional_state(self):
+        site = request_site(self.request)
+        if not site:
+            return None
+        return _combined_state(Tag.objects.filter(site=site), _public_posts(site))
+
+
+@extend_schema(parameters=[SITE_PARAM])
+class CategoryViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.GenericViewSet):
+    """
+    GET /api/v1/taxonomy/categories/?site=amare          -> the full category tree
+    GET /api/v1/taxonomy/categories/<slug>/?site=amare   -> one subtree, plus its ancestors
+    Counts are per category (`post_count`) and per subtree (`total_post_count`).
+    """
+    permission_classes = [AllowAny]
+    serializer_class = CategoryNodeSerializer
+    pagination_class = None
+    lookup_field = "slug"
+    last_modified_actions = ()  # a subtree carries post counts: a list, whatever the action
+
+    def get_queryset(self):
+        site = request_site(self.request)
+        if not site:
+            return Category.objects.none()
+        return Category.objects.filter(site=site, is_active=True)
+
+    def get_conditional_state(self):
+        site = request_site(self.request)
+        if not site:
+            return None
+        return _combined_state(Category.objects.filter(site=site), _public_posts(site))
+
+    def _context(self, path_prefix=""):
+        direct, total = category_post_counts(request_site(self.request), path_prefix)
+        return {**self.get_serializer_context(), "post_counts": direct, "total_post_counts": total}
+
+    def list(self, request, *args, **kwargs):
+        site = request_site(request)
+        if not site:
+            return Response({"detail": "Missing or invalid ?site parameter."}, status=400)
+        roots = build_tree(list(self.get_queryset()))
+        return Response(CategoryNodeSerializer(roots, many=True, context=self._context()).data)
+
+    def retrieve(self, request, *args, **kwargs):
+        category = self.get_queryset().filter(slug=kwargs[self.lookup_field]).first()
+        if category is None:
+            raise NotFound()
+        subtree = list(category.get_descendants(include_self=True).filter(is_active=True))
+        (root,) = build_tree(subtree, roots={category.pk})
+        return Response(CategoryDetailSerializer(root, context=self._context(category.path)).data)